@@ -0,0 +1,225 @@
+"""
+Control de admisión y descarte de carga por worker.
+
+Sin límite, un pico de tráfico acumula peticiones esperando una conexión del
+pool hasta que vence el timeout de gunicorn: la latencia de todas crece y el
+worker termina sin responder a ninguna. Aquí cada worker admite a lo sumo
+`limit` peticiones concurrentes; las demás esperan en una cola acotada y, si
+no consiguen lugar en ADMISSION_MAX_QUEUE_WAIT_SECONDS, reciben 503 con
+Retry-After para reintentar (o ir a otra instancia) en lugar de esperar.
+
+El límite es adaptativo (AIMD): crece de a uno por cada `limit` peticiones
+rápidas mientras se usa, y se reduce un 10% cuando la latencia supera
+ADMISSION_LATENCY_TARGET_SECONDS (a lo sumo una vez por intervalo objetivo,
+para no desplomarlo con las respuestas lentas de una misma ráfaga).
+
+Las escrituras tienen prioridad sobre las lecturas al liberarse un lugar:
+son pocas, no pueden servirse desde caché y el cliente no siempre puede
+reintentarlas; una lectura rechazada se reintenta sin efectos secundarios.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import (
+    ADMISSION_ENABLED,
+    ADMISSION_INITIAL_LIMIT,
+    ADMISSION_LATENCY_TARGET_SECONDS,
+    ADMISSION_MAX_LIMIT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_MAX_QUEUE_WAIT_SECONDS,
+    ADMISSION_MIN_LIMIT,
+    ADMISSION_RETRY_AFTER_SECONDS,
+)
+from app.metrics import ADMISSION_LIMIT, ADMISSION_QUEUE_WAIT, ADMISSION_QUEUED, ADMISSION_REJECTED
+from app.replicas import READ_ONLY_POST_PATHS, SAFE_METHODS
+from app.serialization import dumps
+
+WRITE = "write"
+READ = "read"
+
+# Sin control de admisión: sondeos del balanceador y de Prometheus
+EXEMPT_PREFIXES = ("/health", "/metrics")
+
+# Duran lo que dure la transferencia: ocupan un lugar, pero su latencia no
+# dice nada sobre la sobrecarga
+UNSAMPLED_PATHS = {"/productos/export", "/productos/import"}
+
+# Factor de reducción del límite cuando la latencia supera el objetivo
+BACKOFF_RATIO = 0.9
+
+
+class AdmissionController:
+    """Límite de concurrencia AIMD con cola acotada y dos prioridades"""
+
+    def __init__(
+        self,
+        initial_limit: int = ADMISSION_INITIAL_LIMIT,
+        min_limit: int = ADMISSION_MIN_LIMIT,
+        max_limit: int = ADMISSION_MAX_LIMIT,
+        latency_target: float = ADMISSION_LATENCY_TARGET_SECONDS,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        max_queue_wait: float = ADMISSION_MAX_QUEUE_WAIT_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_target = latency_target
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self._clock = clock
+        self.in_flight = 0
+        # Colas en orden de prioridad
+        self._queues: Dict[str, Deque[asyncio.Future]] = {WRITE: deque(), READ: deque()}
+        self._last_decrease = float("-inf")
+        self.admitted = 0
+        self.rejected = 0
+        ADMISSION_LIMIT.set(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, priority: str = READ) -> bool:
+        """
+        Espera un lugar. Retorna False si la cola está llena o la espera
+        supera `max_queue_wait`; con True, el llamador debe llamar a `release`.
+        """
+        if self.in_flight < int(self.limit) and not self.queued:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if self.queued >= self.max_queue:
+            return self._reject(priority)
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority]
+        queue.append(waiter)
+        ADMISSION_QUEUED.inc()
+        start = self._clock()
+        try:
+            await asyncio.wait_for(waiter, self.max_queue_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            handed_over = waiter.done() and not waiter.cancelled()
+            if not handed_over:
+                self._discard(queue, waiter)
+            if isinstance(e, asyncio.CancelledError):
+                if handed_over:
+                    self.release()
+                raise
+            if not handed_over:
+                return self._reject(priority)
+        finally:
+            ADMISSION_QUEUE_WAIT.observe(self._clock() - start)
+        # `release` ya contó este lugar en in_flight al entregarlo
+        self.admitted += 1
+        return True
+
+    def release(self, latency: Optional[float] = None) -> None:
+        """Libera un lugar y, con `latency`, ajusta el límite"""
+        if latency is not None:
+            self._adjust(latency)
+        self.in_flight -= 1
+        while self.in_flight < int(self.limit):
+            waiter = self._next_waiter()
+            if waiter is None:
+                break
+            self.in_flight += 1
+            waiter.set_result(True)
+
+    def _adjust(self, latency: float) -> None:
+        if latency > self.latency_target:
+            now = self._clock()
+            if now - self._last_decrease >= self.latency_target:
+                self.limit = max(float(self.min_limit), self.limit * BACKOFF_RATIO)
+                self._last_decrease = now
+        elif self.in_flight * 2 >= self.limit:
+            # Solo crece si el límite se está usando
+            self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        ADMISSION_LIMIT.set(self.limit)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        for queue in self._queues.values():
+            while queue:
+                waiter = queue.popleft()
+                ADMISSION_QUEUED.dec()
+                if not waiter.done():
+                    return waiter
+        return None
+
+    def _discard(self, queue: Deque[asyncio.Future], waiter: asyncio.Future) -> None:
+        try:
+            queue.remove(waiter)
+            ADMISSION_QUEUED.dec()
+        except ValueError:
+            pass
+
+    def _reject(self, priority: str) -> bool:
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(priority).inc()
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores para inspección/monitoreo"""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+def request_priority(scope: Scope) -> str:
+    if scope["method"] in SAFE_METHODS or scope["path"] in READ_ONLY_POST_PATHS:
+        return READ
+    return WRITE
+
+
+class AdmissionMiddleware:
+    """Middleware ASGI que aplica el control de admisión a cada petición"""
+
+    def __init__(
+        self, app: ASGIApp, controller: Optional[AdmissionController] = None,
+        retry_after: int = ADMISSION_RETRY_AFTER_SECONDS
+    ):
+        self.app = app
+        self.controller = controller or admission_controller
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.controller.acquire(request_priority(scope)):
+            await self._overloaded(send)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampled = scope["path"] not in UNSAMPLED_PATHS
+            self.controller.release(time.perf_counter() - start if sampled else None)
+
+    async def _overloaded(self, send: Send) -> None:
+        body = dumps({"detail": "Servicio sobrecargado, reintentar más tarde"})
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Controlador del worker (None si el control de admisión está desactivado)
+admission_controller: Optional[AdmissionController] = AdmissionController() if ADMISSION_ENABLED else None
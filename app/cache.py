@@ -0,0 +1,226 @@
+"""
+Caché en memoria LRU + TTL para lecturas de productos.
+
+Cada worker de gunicorn mantiene su propia instancia; las escrituras de la API
+la actualizan o invalidan para no servir datos obsoletos desde este proceso.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+from app.config import (
+    CATALOG_SNAPSHOT_CACHE_SIZE,
+    CATALOG_SNAPSHOT_TTL_SECONDS,
+    DATABASE_REPLICA_URLS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    PRODUCT_CACHE_MAXSIZE,
+    PRODUCT_CACHE_TTL_SECONDS,
+)
+from app.metrics import CACHE_EVICTIONS, CACHE_EXPIRATIONS, CACHE_HITS, CACHE_MISSES
+
+
+class _CacheMetrics(NamedTuple):
+    """Contadores Prometheus de una caché con nombre"""
+    hits: Any
+    misses: Any
+    evictions: Any
+    expirations: Any
+
+
+# Sellos de escritura que se conservan como mínimo aunque `maxsize` sea menor
+STAMP_MIN_KEYS = 1024
+
+
+class LRUTTLCache:
+    """
+    Caché acotada: expulsa la entrada menos usada al superar `maxsize` y
+    descarta las entradas con más de `ttl` segundos de antigüedad.
+    
+    No usa locks: todas las operaciones son síncronas y se ejecutan dentro
+    del event loop del worker.
+    
+    `stamp(key)` es la versión de escritura de una clave: cambia cuando esa
+    clave se invalida o se escribe con `set` sin sello (un valor nuevo), y en
+    `clear`. Una lectura que consultó la base de datos puede pasar el sello
+    observado antes de la consulta a `set`; si la clave se invalidó o
+    escribió mientras tanto, el valor (posiblemente obsoleto) no se guarda.
+    Las escrituras de otras claves no afectan al sello.
+    
+    Los sellos se guardan para las últimas `max(maxsize, STAMP_MIN_KEYS)`
+    claves escritas; las demás comparten `_floor`, el sello más alto
+    descartado. Al descartar uno el piso sube, así que una lectura en curso
+    sobre una clave sin sello propio se descarta (nunca se guarda un valor
+    obsoleto, a lo sumo se pierde un llenado).
+    
+    Los contadores se leen con `stats()`; con `name` además se exportan como
+    métricas Prometheus (cache_*_total{cache=name}).
+    
+    Con `write_window` > 0 además recuerda qué claves se escribieron o
+    invalidaron en los últimos `write_window` segundos (`recently_written`),
+    para leerlas del primario mientras las réplicas pueden no tenerlas aún.
+    """
+    
+    def __init__(
+        self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic,
+        write_window: float = 0, name: Optional[str] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.write_window = write_window
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Clave -> instante de su última escritura, en orden de escritura
+        self._writes: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._cleared_at: Optional[float] = None
+        # Clave -> sello de su última escritura, en orden de escritura
+        self._stamps: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._metrics = _CacheMetrics(
+            CACHE_HITS.labels(name), CACHE_MISSES.labels(name),
+            CACHE_EVICTIONS.labels(name), CACHE_EXPIRATIONS.labels(name)
+        ) if name else None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna el valor cacheado o None si no existe o expiró"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            if self._metrics:
+                self._metrics.misses.inc()
+            return None
+        
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            if self._metrics:
+                self._metrics.misses.inc()
+                self._metrics.expirations.inc()
+            return None
+        
+        self._data.move_to_end(key)
+        self.hits += 1
+        if self._metrics:
+            self._metrics.hits.inc()
+        return value
+    
+    def stamp(self, key: Hashable) -> int:
+        """Sello de escritura actual de `key` (ver `set`)"""
+        return self._stamps.get(key, self._floor)
+    
+    def set(self, key: Hashable, value: Any, stamp: Optional[int] = None) -> None:
+        """
+        Guarda un valor, expulsando la entrada menos usada si hace falta.
+        
+        Args:
+            key: Clave de la entrada
+            value: Valor a guardar
+            stamp: Sello de `key` leído antes de obtener `value`; si la clave
+                fue escrita o invalidada desde entonces, el valor se descarta.
+                Sin sello el valor es autoritativo (una escritura) y avanza el
+                sello de la clave
+        """
+        if stamp is None:
+            self._bump(key)
+            self._note_write(key)
+        elif stamp != self.stamp(key):
+            return
+        if not self.enabled:
+            return
+        self._data[key] = (value, self._clock() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+            if self._metrics:
+                self._metrics.evictions.inc()
+    
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        self._bump(key)
+        self._note_write(key)
+    
+    def clear(self) -> None:
+        self._data.clear()
+        self._stamps.clear()
+        self._counter += 1
+        self._floor = self._counter
+        if self.write_window > 0:
+            # Se desconoce qué cambió: todas las claves cuentan como escritas
+            self._writes.clear()
+            self._cleared_at = self._clock()
+    
+    def recently_written(self, key: Hashable) -> bool:
+        """True si `key` se escribió o invalidó hace menos de `write_window` segundos"""
+        if self.write_window <= 0:
+            return False
+        cutoff = self._clock() - self.write_window
+        self._prune_writes(cutoff)
+        if self._cleared_at is not None and self._cleared_at > cutoff:
+            return True
+        return key in self._writes
+    
+    def _bump(self, key: Hashable) -> None:
+        self._counter += 1
+        self._stamps[key] = self._counter
+        self._stamps.move_to_end(key)
+        while len(self._stamps) > max(self.maxsize, STAMP_MIN_KEYS):
+            _, dropped = self._stamps.popitem(last=False)
+            self._floor = max(self._floor, dropped)
+    
+    def _note_write(self, key: Hashable) -> None:
+        if self.write_window <= 0:
+            return
+        now = self._clock()
+        self._writes[key] = now
+        self._writes.move_to_end(key)
+        self._prune_writes(now - self.write_window)
+    
+    def _prune_writes(self, cutoff: float) -> None:
+        while self._writes:
+            key, written_at = next(iter(self._writes.items()))
+            if written_at > cutoff:
+                break
+            del self._writes[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        """Contadores para inspección/monitoreo"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Caché de productos por ID (Product ya validado junto con los datos de su ETag)
+# Con réplicas de lectura recuerda las escrituras recientes: una réplica sana
+# tiene como máximo DB_REPLICA_MAX_LAG_SECONDS de retraso
+product_cache = LRUTTLCache(
+    PRODUCT_CACHE_MAXSIZE, PRODUCT_CACHE_TTL_SECONDS,
+    write_window=DB_REPLICA_MAX_LAG_SECONDS if DATABASE_REPLICA_URLS else 0,
+    name="products"
+)
+
+# Cuerpos del catálogo completo (?all=true) por (ETag, codificación). El ETag
+# cambia con cada escritura, así que las entradas no necesitan invalidación.
+catalog_snapshots = LRUTTLCache(CATALOG_SNAPSHOT_CACHE_SIZE, CATALOG_SNAPSHOT_TTL_SECONDS, name="catalog_snapshots")
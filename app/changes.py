@@ -0,0 +1,128 @@
+"""
+Sincronización incremental del catálogo (GET /productos/changes).
+
+Cada alta o modificación asigna a la fila el siguiente valor de una secuencia
+global (`change_seq`); cada baja deja un tombstone con su propio valor de la
+misma secuencia. Un cliente guarda la posición (change_seq, id) del último
+cambio recibido y pide solo lo posterior.
+
+En PostgreSQL `nextval` no es transaccional: una transacción que tomó una
+secuencia menor puede confirmar después que otra con una mayor. Para no saltar
+esos cambios el token solo avanza sobre cambios cuya transacción empezó
+(`updated_at`/`deleted_at` son now(), el inicio de la transacción) antes de:
+
+    min(ahora, inicio de la escritura más antigua en curso) - CHANGES_SAFETY_LAG_SECONDS
+
+Las escrituras en curso se leen de pg_stat_activity, así que una transacción
+larga todavía abierta frena el token sin importar cuánto dure. El margen
+cubre la otra mitad: un cambio ya confirmado que empezó antes pero tomó su
+secuencia después. La garantía vale mientras ninguna transacción de escritura
+tome un change_seq más de CHANGES_SAFETY_LAG_SECONDS después de empezar (por
+defecto dos veces DB_STATEMENT_TIMEOUT_MS; la importación confirma por lote).
+El rol de la API debe poder ver las sesiones que escriben en products (el
+mismo rol, o pg_read_all_stats).
+
+Los cambios dentro del margen se entregan igual y se repiten en la siguiente
+consulta (aplicarlos dos veces es inocuo).
+"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import CHANGES_SAFETY_LAG_SECONDS
+from app.models.product import ProductDB, ProductTombstoneDB
+from app.serialization import PRODUCT_COLUMNS
+
+Position = Tuple[int, int]
+
+START = (0, 0)
+
+# Inicio de la transacción con escrituras (con xid asignado) más antigua en curso
+OLDEST_WRITE_SQL = text(
+    "SELECT min(xact_start) FROM pg_stat_activity "
+    "WHERE datname = current_database() AND backend_xid IS NOT NULL"
+)
+
+
+class ChangeSet(NamedTuple):
+    # Filas PRODUCT_COLUMNS + (change_seq, updated_at)
+    products: List[Sequence]
+    deleted: List[int]
+    position: Position
+    has_more: bool
+
+
+async def record_tombstones(db: AsyncSession, product_ids: Iterable[int]) -> None:
+    """Registra la baja de `product_ids`; llamar en la misma transacción del DELETE"""
+    ids = list(product_ids)
+    if not ids:
+        return
+    # Un ID reutilizado (SQLite) reemplaza su tombstone anterior
+    await db.execute(delete(ProductTombstoneDB).where(ProductTombstoneDB.id.in_(ids)))
+    await db.execute(insert(ProductTombstoneDB), [{"id": product_id} for product_id in ids])
+
+
+async def oldest_open_write(db: AsyncSession) -> Optional[datetime]:
+    """Inicio de la escritura en curso más antigua; None si no hay o fuera de PostgreSQL"""
+    if db.bind.dialect.name != "postgresql":
+        return None  # SQLite serializa las escrituras
+    return await db.scalar(OLDEST_WRITE_SQL)
+
+
+async def fetch_changes(db: AsyncSession, since: Position, limit: int) -> ChangeSet:
+    """
+    Hasta `limit` cambios posteriores a `since`, en orden (change_seq, id).
+
+    Returns:
+        ChangeSet con los productos vigentes, los IDs eliminados, la posición
+        hasta la que el cliente puede avanzar y si quedan más cambios
+    """
+    # Antes de leer los cambios: en READ COMMITTED cada consulta ve lo
+    # confirmado hasta ese momento, así que una escritura que no aparece aquí
+    # ya es visible abajo o toma su secuencia después de este punto
+    db_now = await db.scalar(select(func.now()))
+    oldest_write = await oldest_open_write(db)
+    horizon = min(db_now, oldest_write) if oldest_write is not None else db_now
+    products = (await db.execute(
+        select(*PRODUCT_COLUMNS, ProductDB.change_seq, ProductDB.updated_at)
+        .where(tuple_(ProductDB.change_seq, ProductDB.id) > since)
+        .order_by(ProductDB.change_seq, ProductDB.id)
+        .limit(limit + 1)
+    )).all()
+    # Un tombstone cuyo ID volvió a existir ya no aplica
+    tombstones = (await db.execute(
+        select(ProductTombstoneDB.change_seq, ProductTombstoneDB.id, ProductTombstoneDB.deleted_at)
+        .where(
+            tuple_(ProductTombstoneDB.change_seq, ProductTombstoneDB.id) > since,
+            ~select(ProductDB.id).where(ProductDB.id == ProductTombstoneDB.id).exists()
+        )
+        .order_by(ProductTombstoneDB.change_seq, ProductTombstoneDB.id)
+        .limit(limit + 1)
+    )).all()
+
+    changes = sorted(
+        [((p.change_seq, p.id), p.updated_at, p) for p in products]
+        + [((seq, product_id), deleted_at, None) for seq, product_id, deleted_at in tombstones],
+        key=lambda change: change[0]
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    cutoff = horizon - timedelta(seconds=CHANGES_SAFETY_LAG_SECONDS)
+    position = since
+    for key, changed_at, _ in changes:
+        if changed_at > cutoff:
+            # Cambios recientes: se entregan, pero se repetirán en la siguiente consulta
+            has_more = False
+            break
+        position = key
+
+    return ChangeSet(
+        products=[p for _, _, p in changes if p is not None],
+        deleted=[key[1] for key, _, p in changes if p is None],
+        position=position,
+        has_more=has_more,
+    )
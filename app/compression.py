@@ -0,0 +1,193 @@
+"""
+Compresión de respuestas HTTP con gzip o brotli según Accept-Encoding.
+
+`CompressionMiddleware` comprime las respuestas de tipos de texto/JSON que
+superan COMPRESSION_MIN_SIZE: los cuerpos completos de una vez (en un hilo si
+son grandes, para no bloquear el event loop) y las respuestas en streaming de
+forma incremental. Las respuestas que ya traen Content-Encoding (p. ej. los
+snapshots del catálogo, comprimidos una sola vez y guardados en caché) pasan
+sin cambios.
+
+Una respuesta comprimida lleva su ETag como débil (W/): el mismo ETag fuerte
+no puede identificar cuerpos distintos byte a byte.
+"""
+
+import gzip
+import zlib
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import COMPRESSION_BROTLI_QUALITY, COMPRESSION_GZIP_LEVEL, COMPRESSION_MIN_SIZE
+from app.etags import weak_etag
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli figura en requirements.txt
+    brotli = None
+
+# Preferencia ante igual q: brotli comprime mejor el JSON que gzip
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson")
+
+# Cuerpos mayores se comprimen fuera del event loop
+THREADPOOL_MIN_SIZE = 64 * 1024
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Codificación a usar según el encabezado Accept-Encoding (con valores q),
+    o None si el cliente no acepta ninguna de las soportadas.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Comprime `body` de una vez (`level` reemplaza el nivel configurado)"""
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY if level is None else level)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL if level is None else level, mtime=0)
+    raise ValueError(f"Codificación no soportada: {encoding}")
+
+
+def encode_body(body: bytes, encoding: Optional[str], level: Optional[int] = None) -> Tuple[bytes, Optional[str]]:
+    """
+    Cuerpo a enviar y su Content-Encoding: comprimido si el cliente lo acepta
+    y supera el tamaño mínimo; en otro caso, sin cambios y None.
+    """
+    if encoding is None or len(body) < COMPRESSION_MIN_SIZE:
+        return body, None
+    return compress(body, encoding, level), encoding
+
+
+class _StreamCompressor:
+    """Compresión incremental: cada trozo se vacía para que llegue al cliente"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compresión gzip/brotli con tamaño mínimo"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        responder = _CompressingResponder(encoding, self.minimum_size, send)
+        await self.app(scope, receive, responder.on_message)
+
+
+class _CompressingResponder:
+    """Estado de compresión de una respuesta"""
+
+    def __init__(self, encoding: Optional[str], minimum_size: int, send: Send):
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send = send
+        self.start: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def on_message(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if self.compressor is not None and message["type"] == "http.response.body":
+            await self._send_stream_chunk(message)
+            return
+        if self.passthrough or message["type"] != "http.response.body" or self.start is None:
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not _is_compressible(headers) or "content-encoding" in headers or start["status"] in (204, 304):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding is None or (not more_body and len(body) < self.minimum_size):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        if "etag" in headers:
+            headers["ETag"] = weak_etag(headers["etag"])
+        if not more_body:
+            if len(body) >= THREADPOOL_MIN_SIZE:
+                body = await run_in_threadpool(compress, body, self.encoding)
+            else:
+                body = compress(body, self.encoding)
+            headers["Content-Length"] = str(len(body))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        # Streaming: el tamaño final no se conoce
+        del headers["Content-Length"]
+        self.compressor = _StreamCompressor(self.encoding)
+        await self.send(start)
+        await self._send_stream_chunk(message)
+
+    async def _send_stream_chunk(self, message: Message) -> None:
+        more_body = message.get("more_body", False)
+        body = self.compressor.compress(message.get("body", b""))
+        if not more_body:
+            body += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
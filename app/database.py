@@ -1,36 +1,340 @@
 """
 Configuración de base de datos PostgreSQL.
+
+Expone dos caminos sobre la misma DATABASE_URL:
+- `engine` / `SessionLocal`: síncronos, para scripts.
+- `async_engine` / `AsyncSessionLocal`: asíncronos (asyncpg), usados por las
+  rutas para no bloquear el event loop de uvicorn durante cada consulta.
+
+Si se configuran réplicas de lectura (DATABASE_REPLICA_URLS), cada una tiene
+su engine asíncrono en `replica_engines`; el enrutamiento está en
+app/replicas.py.
 """
 
-from sqlalchemy import create_engine
+import logging
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.config import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from app.config import (
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_CONNECT_TIMEOUT,
+    DB_MAX_OVERFLOW,
+    DB_PGBOUNCER,
+    DB_POOL_MODE,
+    DB_POOL_PING_IDLE_SECONDS,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_SLOW_CHECKOUT_SECONDS,
+    DB_POOL_TIMEOUT,
+    DB_REPLICA_MAX_OVERFLOW,
+    DB_REPLICA_POOL_SIZE,
+    DB_STATEMENT_TIMEOUT_MS,
+    RATE_LIMIT_DB_POOL_SIZE,
+    RATE_LIMIT_DB_TIMEOUT_SECONDS,
+)
+from app.metrics import DB_POOL_CHECKOUT_WAIT
+
+logger = logging.getLogger(__name__)
+
+# Drivers asíncronos equivalentes a cada backend síncrono
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Límites (segundos) de los buckets del histograma de espera por conexión
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def to_async_url(url: str) -> str:
+    """
+    Convierte una DATABASE_URL síncrona a su equivalente asíncrona.
+
+    postgresql:// pasa a postgresql+asyncpg:// (traduciendo `sslmode` al
+    parámetro `ssl` que entiende asyncpg) y sqlite:// a sqlite+aiosqlite://.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return url
+
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == "postgresql" and "sslmode" in parsed.query:
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+class PoolWaitStats:
+    """
+    Tiempo de espera para obtener una conexión del pool (incluye abrir una
+    conexión nueva cuando el pool puede crecer). Sirve para dimensionar
+    DB_POOL_SIZE / DB_MAX_OVERFLOW con datos reales.
+    """
+
+    def __init__(self, buckets=POOL_WAIT_BUCKETS):
+        self.buckets = buckets
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.timeouts = 0
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, limit in enumerate(self.buckets):
+            if seconds <= limit:
+                self.bucket_counts[i] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+        if seconds >= DB_POOL_SLOW_CHECKOUT_SECONDS:
+            logger.warning(f"Espera de {seconds:.3f}s por una conexión del pool")
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores para inspección/monitoreo"""
+        return {
+            "checkouts": self.count,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": self.total,
+            "wait_seconds_max": self.max,
+            "wait_seconds_avg": self.total / self.count if self.count else 0.0,
+            "wait_buckets": {
+                **{f"le_{limit}": n for limit, n in zip(self.buckets, self.bucket_counts)},
+                "le_inf": self.bucket_counts[-1],
+            },
+        }
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Pool asíncrono que mide cuánto espera cada checkout"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_wait_stats.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_wait_stats.observe(waited)
+            DB_POOL_CHECKOUT_WAIT.observe(waited)
+
+
+def _is_postgresql(url: str) -> bool:
+    return make_url(url).get_backend_name() == "postgresql"
+
+
+def _pool_options(url: str, pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW) -> dict:
+    """Opciones de pool; SQLite (tests) usa el pool por defecto del dialecto"""
+    if not _is_postgresql(url):
+        return {}
+    return {
+        "pool_pre_ping": DB_POOL_PRE_PING == "always",
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
 
-# Crear engine con configuración de pool y timeouts
+def _async_pool_options(url: str, pool_size: int = DB_POOL_SIZE, max_overflow: int = DB_MAX_OVERFLOW) -> dict:
+    if _is_postgresql(url) and DB_POOL_MODE == "null":
+        # El pooler externo mantiene las conexiones; aquí se abren por uso
+        return {"poolclass": NullPool}
+    options = _pool_options(url, pool_size=pool_size, max_overflow=max_overflow)
+    if options:
+        options["poolclass"] = TimedAsyncQueuePool
+    return options
+
+
+def _sync_connect_args(url: str) -> dict:
+    if not _is_postgresql(url):
+        return {}
+    args: Dict[str, Any] = {"connect_timeout": DB_CONNECT_TIMEOUT}
+    if not DB_PGBOUNCER:
+        args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    return args
+
+
+def _async_connect_args(
+    url: str, connect_timeout: Optional[float] = None, statement_timeout_ms: Optional[int] = None
+) -> dict:
+    if not _is_postgresql(url):
+        return {}
+    args: Dict[str, Any] = {"timeout": DB_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout}
+    if DB_PGBOUNCER:
+        # En modo transacción cada sentencia puede ir a otra conexión del
+        # servidor: sin caché de sentencias preparadas y con nombres únicos
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    else:
+        if statement_timeout_ms is None:
+            statement_timeout_ms = DB_STATEMENT_TIMEOUT_MS
+        args["server_settings"] = {"statement_timeout": str(statement_timeout_ms)}
+    return args
+
+
+def install_idle_ping(engine, idle_seconds: float = DB_POOL_PING_IDLE_SECONDS) -> None:
+    """
+    Ping solo a las conexiones que estuvieron inactivas más de `idle_seconds`
+    (las que más probablemente cortó un firewall/NAT o un failover), en lugar
+    de un ida y vuelta extra en cada checkout como pool_pre_ping.
+    """
+    dialect = engine.dialect
+
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at: Optional[float] = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # El pool descarta la conexión y reintenta con una nueva
+            raise exc.DisconnectionError(f"Conexión inactiva descartada: {e}") from e
+
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+# Engine síncrono (scripts): una conexión por worker le alcanza (es la que
+# reserva DB_RESERVED_CONNECTIONS_PER_WORKER)
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Verifica conexiones antes de usarlas
-    pool_size=5,  # Número de conexiones en el pool
-    max_overflow=10,  # Conexiones adicionales permitidas
-    pool_recycle=3600,  # Reciclar conexiones cada hora
-    connect_args={
-        "connect_timeout": 10,  # Timeout de conexión en segundos
-        "options": "-c statement_timeout=30000"  # Timeout de queries en ms
-    }
+    connect_args=_sync_connect_args(DATABASE_URL),
+    **_pool_options(DATABASE_URL, pool_size=1, max_overflow=0)
 )
 
+# Engine asíncrono para las rutas de la API
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=_async_connect_args(DATABASE_URL),
+    **_async_pool_options(DATABASE_URL)
+)
+
+# Engine sin pool para el chequeo de salud en segundo plano: comprueba que la
+# base responde sin competir por conexiones con las peticiones
+health_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args=_async_connect_args(DATABASE_URL),
+    poolclass=NullPool
+)
+
+def create_rate_limit_engine(url: str = DATABASE_URL) -> AsyncEngine:
+    """
+    Engine propio del almacén de rate limit en PostgreSQL.
+
+    El middleware consulta el almacén antes del control de admisión: con el
+    pool de la API, una ráfaga de peticiones rechazables ocuparía las
+    conexiones de las ya admitidas. Aquí un pool fijo de
+    RATE_LIMIT_DB_POOL_SIZE conexiones con RATE_LIMIT_DB_TIMEOUT_SECONDS como
+    espera por conexión, conexión y statement_timeout (con PgBouncer este
+    último se configura en el rol).
+    """
+    timeout = RATE_LIMIT_DB_TIMEOUT_SECONDS
+    options: Dict[str, Any] = {}
+    if _is_postgresql(url):
+        options = {
+            "pool_size": RATE_LIMIT_DB_POOL_SIZE,
+            "max_overflow": 0,
+            "pool_timeout": timeout,
+            "pool_recycle": DB_POOL_RECYCLE,
+        }
+    return create_async_engine(
+        to_async_url(url),
+        connect_args=_async_connect_args(url, connect_timeout=timeout, statement_timeout_ms=int(timeout * 1000)),
+        **options
+    )
+
+
+# Engines de las réplicas de lectura, cada uno con su propio pool por worker
+# (fuera del presupuesto DB_MAX_CONNECTIONS del primario)
+replica_engines = [
+    create_async_engine(
+        to_async_url(url),
+        connect_args=_async_connect_args(url),
+        **_async_pool_options(url, pool_size=DB_REPLICA_POOL_SIZE, max_overflow=DB_REPLICA_MAX_OVERFLOW)
+    )
+    for url in DATABASE_REPLICA_URLS
+]
+
+if _is_postgresql(DATABASE_URL) and DB_POOL_PRE_PING == "idle":
+    install_idle_ping(engine)
+    if DB_POOL_MODE != "null":
+        install_idle_ping(async_engine.sync_engine)
+        for replica_engine in replica_engines:
+            install_idle_ping(replica_engine.sync_engine)
+
 # Crear sesión
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# expire_on_commit=False evita recargas implícitas (no permitidas en async)
+# al leer atributos después de commit
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 # Base para modelos
 Base = declarative_base()
 
 
-def get_db():
-    """Obtener sesión de base de datos"""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Obtener sesión asíncrona de base de datos"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_sessionmaker():
+    """
+    Fábrica de sesiones asíncronas, para código que abre sus propias sesiones
+    fuera del ciclo de vida de la petición (p. ej. respuestas en streaming).
+    """
+    return AsyncSessionLocal
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Estado del pool asíncrono y tiempos de espera por conexión"""
+    pool = async_engine.pool
+    stats: Dict[str, Any] = {"class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "checked_in": pool.checkedin(),
+        })
+    stats.update(pool_wait_stats.stats())
+    return stats
+
+
+def pool_saturation() -> Optional[float]:
+    """Fracción de la capacidad del pool asíncrono en uso (None sin pool propio)"""
+    pool = async_engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return None
+    capacity = pool.size() + max(DB_MAX_OVERFLOW, 0)
+    return pool.checkedout() / capacity if capacity > 0 else None
@@ -0,0 +1,141 @@
+"""
+ETags y peticiones condicionales (If-None-Match, If-Modified-Since, If-Match).
+
+El ETag de un producto es `"<id>-<version>"`, donde `version` se incrementa
+en cada UPDATE. Los listados usan un hash de su contenido o de la versión del
+catálogo, de modo que un cliente que ya tiene la respuesta recibe 304 sin que
+el servidor serialice el cuerpo.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, List, Optional, Set
+
+from fastapi import Request
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.product import ProductDB, ProductTombstoneDB
+
+
+def product_etag(product_id: int, version: int) -> str:
+    return f'"{product_id}-{version}"'
+
+
+def content_etag(*parts: object) -> str:
+    """ETag fuerte a partir de un hash de las partes que determinan la respuesta"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()}"'
+
+
+def weak_etag(etag: str) -> str:
+    """
+    Versión débil (W/) de un ETag. Las representaciones comprimidas de una
+    respuesta no son idénticas byte a byte a la original, así que no pueden
+    compartir su ETag fuerte; If-None-Match compara en forma débil y sigue
+    respondiendo 304 a cualquiera de ellas.
+    """
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+def parse_etags(header: Optional[str]) -> Optional[List[str]]:
+    """
+    Lista de ETags de un encabezado If-Match / If-None-Match, sin el prefijo
+    débil W/. None si el encabezado no está presente.
+    """
+    if header is None:
+        return None
+    tags = []
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.append(tag)
+    return tags
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    True si la copia del cliente sigue vigente (RFC 9110: If-None-Match tiene
+    prioridad; If-Modified-Since solo se evalúa si no viene If-None-Match).
+    """
+    tags = parse_etags(request.headers.get("if-none-match"))
+    if tags is not None:
+        return "*" in tags or etag in tags
+
+    since = request.headers.get("if-modified-since")
+    if since is None or last_modified is None:
+        return False
+    try:
+        since_date = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    if since_date.tzinfo is None:
+        since_date = since_date.replace(tzinfo=timezone.utc)
+    # Las fechas HTTP tienen resolución de segundos
+    return last_modified.replace(microsecond=0) <= since_date
+
+
+def if_match_versions(request: Request, product_id: int) -> Optional[Set[int]]:
+    """
+    Versiones aceptadas por el encabezado If-Match para `product_id`.
+
+    Returns:
+        None si no hay If-Match o es `*` (solo se exige que exista el producto);
+        en otro caso, el conjunto de versiones aceptadas (vacío si ningún ETag
+        corresponde a este producto).
+    """
+    tags = parse_etags(request.headers.get("if-match"))
+    if tags is None or "*" in tags:
+        return None
+    versions = set()
+    prefix = f'"{product_id}-'
+    for tag in tags:
+        if tag.startswith(prefix) and tag.endswith('"'):
+            try:
+                versions.add(int(tag[len(prefix):-1]))
+            except ValueError:
+                continue
+    return versions
+
+
+def etag_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def rows_fingerprint(rows: Iterable) -> List[tuple]:
+    """(id, version) de cada fila, para calcular el ETag de una página"""
+    return [(row.id, row.version) for row in rows]
+
+
+async def catalog_token(db: AsyncSession) -> tuple:
+    """
+    Versión del catálogo completo, obtenida con una sola consulta sobre los
+    índices de change_seq: toda alta agrega una fila, toda modificación sube
+    el change_seq de su fila y toda baja agrega o reemplaza un tombstone.
+    Se usan cantidad y suma en lugar del máximo porque en PostgreSQL una
+    transacción puede confirmar un change_seq menor que el máximo ya visible.
+    """
+    result = await db.execute(select(
+        select(func.count(ProductDB.id)).scalar_subquery(),
+        select(func.coalesce(func.sum(ProductDB.change_seq), 0)).scalar_subquery(),
+        select(func.count(ProductTombstoneDB.id)).scalar_subquery(),
+        select(func.coalesce(func.sum(ProductTombstoneDB.change_seq), 0)).scalar_subquery(),
+    ))
+    return tuple(result.one())
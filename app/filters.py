@@ -0,0 +1,72 @@
+"""
+Filtros del listado de productos.
+
+Cada filtro está respaldado por un índice declarado en `ProductDB`, para que
+las consultas filtradas sigan usando índices a medida que crece la tabla.
+"""
+
+from typing import Optional
+
+from fastapi import Query
+from sqlalchemy import Select
+
+from app.models.product import ProductDB
+
+LIKE_ESCAPE = "\\"
+
+
+def escape_like(value: str) -> str:
+    """Escapa los comodines de LIKE para buscar el texto literal"""
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+class ProductFilters:
+    """
+    Parámetros de filtrado, inyectables con `Depends(ProductFilters)`.
+    
+    Attributes:
+        nombre: Subcadena del nombre, sin distinguir mayúsculas (índice de trigramas)
+        nombre_prefijo: Prefijo del nombre; en PostgreSQL distingue mayúsculas
+            (índice text_pattern_ops)
+        precio_min: Precio mínimo, inclusive (índice sobre precio)
+        precio_max: Precio máximo, inclusive (índice sobre precio)
+        en_stock: Si es True, solo productos con stock > 0 (índice parcial)
+    """
+    
+    def __init__(
+        self,
+        nombre: Optional[str] = Query(None, min_length=1, description="Subcadena del nombre"),
+        nombre_prefijo: Optional[str] = Query(None, min_length=1, description="Prefijo del nombre"),
+        precio_min: Optional[float] = Query(None, ge=0),
+        precio_max: Optional[float] = Query(None, ge=0),
+        en_stock: Optional[bool] = Query(None, description="Solo productos con stock disponible"),
+    ):
+        self.nombre = nombre
+        self.nombre_prefijo = nombre_prefijo
+        self.precio_min = precio_min
+        self.precio_max = precio_max
+        self.en_stock = en_stock
+    
+    def apply(self, query: Select) -> Select:
+        """Agrega las condiciones WHERE de los filtros presentes"""
+        if self.nombre is not None:
+            query = query.where(
+                ProductDB.nombre.ilike(f"%{escape_like(self.nombre)}%", escape=LIKE_ESCAPE)
+            )
+        if self.nombre_prefijo is not None:
+            query = query.where(
+                ProductDB.nombre.like(f"{escape_like(self.nombre_prefijo)}%", escape=LIKE_ESCAPE)
+            )
+        if self.precio_min is not None:
+            query = query.where(ProductDB.precio >= self.precio_min)
+        if self.precio_max is not None:
+            query = query.where(ProductDB.precio <= self.precio_max)
+        if self.en_stock is True:
+            query = query.where(ProductDB.stock > 0)
+        elif self.en_stock is False:
+            query = query.where(ProductDB.stock <= 0)
+        return query
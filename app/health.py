@@ -0,0 +1,127 @@
+"""
+Estado de salud de la instancia para el balanceador.
+
+- Vida (`/health/live`): el proceso responde; sin E/S.
+- Preparación (`/health/ready`): la base respondió en el último chequeo, ese
+  chequeo es reciente y el pool no está al borde de agotarse.
+
+El chequeo de la base corre en segundo plano cada HEALTH_CHECK_INTERVAL_SECONDS
+(con su propio engine sin pool y un tiempo máximo); los sondeos solo leen el
+último resultado, así que un RDS lento no detiene el event loop ni acumula
+sondeos en espera.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import (
+    HEALTH_CHECK_INTERVAL_SECONDS,
+    HEALTH_CHECK_TIMEOUT_SECONDS,
+    HEALTH_POOL_SATURATION_THRESHOLD,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseStatus(NamedTuple):
+    """Resultado de un chequeo de la base"""
+    ok: bool
+    checked_at: float
+    latency_ms: float
+    error: Optional[str] = None
+
+
+class HealthChecker:
+    """Consulta la base periódicamente y guarda el último resultado"""
+
+    def __init__(
+        self, engine: AsyncEngine,
+        interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+        timeout: float = HEALTH_CHECK_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.engine = engine
+        self.interval = interval
+        self.timeout = timeout
+        self._clock = clock
+        self.status: Optional[DatabaseStatus] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> DatabaseStatus:
+        start = self._clock()
+        try:
+            await asyncio.wait_for(self._ping(), self.timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"sin respuesta en {self.timeout}s"
+        except Exception as e:
+            error = str(e)
+        now = self._clock()
+        if error is not None and (self.status is None or self.status.ok):
+            logger.error(f"Health check de base de datos fallido: {error}")
+        elif error is None and self.status is not None and not self.status.ok:
+            logger.info("Base de datos disponible nuevamente")
+        self.status = DatabaseStatus(error is None, now, round((now - start) * 1000, 1), error)
+        return self.status
+
+    async def _ping(self) -> None:
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def is_fresh(self) -> bool:
+        """El último resultado tiene menos de tres intervalos (el chequeo no se trabó)"""
+        return self.status is not None and self._clock() - self.status.checked_at <= 3 * self.interval
+
+    async def start(self) -> None:
+        """Hace un primer chequeo e inicia los siguientes en segundo plano"""
+        if self._task is None:
+            await self.check()
+            self._task = asyncio.create_task(self._check_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _check_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def database(self) -> Dict[str, Any]:
+        """Último resultado en forma serializable"""
+        if self.status is None:
+            return {"status": "unknown"}
+        return {
+            "status": "connected" if self.status.ok else "disconnected",
+            "latency_ms": self.status.latency_ms,
+            "age_seconds": round(self._clock() - self.status.checked_at, 1),
+            **({"error": self.status.error} if self.status.error else {}),
+        }
+
+
+def readiness_problems(
+    checker: HealthChecker, saturation: Optional[float],
+    threshold: float = HEALTH_POOL_SATURATION_THRESHOLD
+) -> List[str]:
+    """Motivos por los que la instancia no debería recibir tráfico (vacío si está lista)"""
+    problems = []
+    if checker.status is None:
+        problems.append("base de datos sin chequear")
+    elif not checker.status.ok:
+        problems.append("base de datos no disponible")
+    elif not checker.is_fresh():
+        problems.append("chequeo de base de datos desactualizado")
+    if saturation is not None and saturation >= threshold:
+        problems.append(f"pool de conexiones al {saturation:.0%}")
+    return problems
@@ -1,13 +1,22 @@
 import logging
-import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+from app.admission import AdmissionMiddleware, admission_controller
+from app.cache import catalog_snapshots, product_cache
+from app.compression import CompressionMiddleware
+from app.database import async_engine, health_engine, pool_saturation, pool_stats
+from app.health import HealthChecker, readiness_problems
+from app.metrics import MetricsMiddleware, instrument_engine, metrics_payload
+from app.notifications import (
+    get_notification_channel,
+    handle_listener_reset,
+    handle_product_notification,
+)
+from app.ratelimit import RateLimitMiddleware, rate_limiter
+from app.replicas import ReadYourWritesMiddleware, replica_set
 from app.routes import products
 
-# Solo crear tablas si no estamos en modo test
-if os.getenv("TESTING") != "1":
-    from app.database import engine, Base
-    Base.metadata.create_all(bind=engine)
-
 # Configure basic logging
 logging.basicConfig(
     level=logging.INFO,
@@ -16,14 +25,62 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Estado de la base consultado en segundo plano para los health checks
+health_checker = HealthChecker(health_engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Arranque y parada de cada worker.
+    Inicia el listener de cambios de productos que mantiene coherente la caché,
+    el chequeo periódico de las réplicas de lectura y el de salud de la base.
+    """
+    channel = get_notification_channel()
+    await channel.start(handle_product_notification, handle_listener_reset)
+    await replica_set.start()
+    await health_checker.start()
+    yield
+    await health_checker.stop()
+    await replica_set.stop()
+    await channel.stop()
+
+
 # Create FastAPI application instance
 app = FastAPI(
     title="API de Productos",
     description="API REST para gestión de productos con PostgreSQL",
     version="1.0.0",
-    redirect_slashes=False  # Evita redirecciones automáticas por trailing slash
+    redirect_slashes=False,  # Evita redirecciones automáticas por trailing slash
+    lifespan=lifespan
 )
 
+# Compresión gzip/brotli de respuestas grandes (listados, exportación)
+app.add_middleware(CompressionMiddleware)
+
+# Con réplicas, las lecturas de quien acaba de escribir van al primario
+if replica_set.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# Límite de concurrencia adaptativo: ante sobrecarga responde 503 rápido en
+# lugar de acumular peticiones esperando una conexión del pool
+if admission_controller is not None:
+    app.add_middleware(AdmissionMiddleware)
+
+# Límite por cliente (API key o IP): un cliente ruidoso recibe 429 antes de
+# ocupar un lugar del control de admisión
+if rate_limiter is not None:
+    app.add_middleware(RateLimitMiddleware)
+
+# Conteo y latencia por ruta; se agrega al final para ser el más externo y
+# medir también la compresión
+app.add_middleware(MetricsMiddleware)
+
+# Duración de cada sentencia y uso del pool, por base de datos
+instrument_engine(async_engine.sync_engine)
+for replica in replica_set.replicas:
+    instrument_engine(replica.engine.sync_engine, replica.name)
+
 # Include product routes
 app.include_router(products.router)
 
@@ -36,30 +93,55 @@ async def root():
     return {"message": "Bienvenido a la API de Productos"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métricas en formato Prometheus (agregadas entre workers en modo multiproceso)"""
+    content, media_type = metrics_payload()
+    return Response(content=content, media_type=media_type)
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness: el proceso responde. No consulta la base de datos."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    Readiness para el target group del ALB: 200 si la instancia puede atender
+    tráfico, 503 si no (base no disponible en el último chequeo o pool casi
+    agotado). Responde con el resultado en caché, sin E/S.
+    """
+    saturation = pool_saturation()
+    problems = readiness_problems(health_checker, saturation)
+    body = {
+        "status": "not_ready" if problems else "ready",
+        "database": health_checker.database(),
+        "pool_saturation": round(saturation, 3) if saturation is not None else None,
+    }
+    if problems:
+        body["reasons"] = problems
+    return JSONResponse(body, status_code=503 if problems else 200)
+
+
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint para ALB y Auto Scaling Group.
-    Verifica que la app esté corriendo y pueda conectarse a la DB.
+    Informa el último chequeo de la base (hecho en segundo plano, sin
+    bloquear el event loop) junto con el estado del pool y de las cachés
+    (contadores del worker que atiende la petición; /metrics los agrega).
     """
-    try:
-        # Verificar conexión a base de datos
-        from app.database import engine
-        from sqlalchemy import text
-        
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        
-        return {
-            "status": "healthy",
-            "service": "productos-api",
-            "database": "connected"
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return {
-            "status": "unhealthy",
-            "service": "productos-api",
-            "database": "disconnected",
-            "error": str(e)
-        }
+    database = health_checker.database()
+    healthy = not readiness_problems(health_checker, None)
+    return {
+        "status": "healthy" if healthy else "unhealthy",
+        "service": "productos-api",
+        "database": database["status"],
+        "database_check": database,
+        "pool": pool_stats(),
+        "cache": {"products": product_cache.stats(), "catalog_snapshots": catalog_snapshots.stats()},
+        **({"admission": admission_controller.stats()} if admission_controller else {}),
+        **({"replicas": replica_set.stats()} if replica_set.replicas else {})
+    }
@@ -0,0 +1,192 @@
+"""
+Métricas Prometheus expuestas en /metrics.
+
+- Peticiones HTTP: total por ruta/método/estado, histograma de latencia por
+  ruta y peticiones en curso. La ruta es la plantilla (`/productos/{product_id}`),
+  no la URL, para acotar la cantidad de series.
+- Base de datos: duración de cada sentencia por tipo (eventos del engine),
+  conexiones en uso/overflow del pool y espera por una conexión.
+- Control de admisión: límite de concurrencia, cola y rechazos (app/admission.py).
+- Cachés en memoria: aciertos, fallos, expulsiones y expiraciones por caché
+  (app/cache.py).
+- Límite por cliente: fallos del almacén compartido, que dejan pasar las
+  peticiones sin limitar (app/ratelimit.py).
+
+Con gunicorn cada worker es un proceso: si PROMETHEUS_MULTIPROC_DIR está
+definida (gunicorn_config.py la define), los valores se escriben en archivos
+de ese directorio y /metrics agrega los de todos los workers, sin importar
+cuál atienda la petición.
+"""
+
+import os
+import time
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Sentencias típicas de la API: milisegundos a unos pocos segundos
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Peticiones HTTP atendidas",
+    ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Duración de las peticiones HTTP hasta el último byte",
+    ["method", "route"]
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Peticiones HTTP en curso",
+    ["method"], multiprocess_mode="livesum"
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Duración de cada sentencia SQL",
+    ["database", "operation"], buckets=DB_BUCKETS
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Conexiones del pool en uso",
+    ["database"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Conexiones abiertas por encima de pool_size",
+    ["database"], multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Espera por una conexión del pool",
+    buckets=DB_BUCKETS
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_concurrency_limit", "Límite de peticiones concurrentes del control de admisión",
+    multiprocess_mode="livesum"
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued_requests", "Peticiones esperando lugar en el control de admisión",
+    multiprocess_mode="livesum"
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds", "Espera en la cola del control de admisión",
+    buckets=DB_BUCKETS
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Peticiones rechazadas con 503 por sobrecarga",
+    ["priority"]
+)
+CACHE_HITS = Counter("cache_hits_total", "Lecturas servidas desde la caché en memoria", ["cache"])
+CACHE_MISSES = Counter("cache_misses_total", "Lecturas sin entrada vigente en la caché", ["cache"])
+CACHE_EVICTIONS = Counter("cache_evictions_total", "Entradas expulsadas por tamaño (LRU)", ["cache"])
+CACHE_EXPIRATIONS = Counter("cache_expirations_total", "Entradas descartadas por TTL", ["cache"])
+RATE_LIMIT_STORE_ERRORS = Counter(
+    "rate_limit_store_errors_total", "Consultas al almacén de rate limit fallidas (petición permitida)"
+)
+
+# Rutas sin coincidencia (404) agrupadas en una sola serie
+UNMATCHED_ROUTE = "unmatched"
+
+OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def statement_operation(statement: str) -> str:
+    """Tipo de sentencia (primera palabra) para la etiqueta `operation`"""
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine, database: str = "primary") -> None:
+    """
+    Mide la duración de cada sentencia y el uso del pool de `engine` (el
+    `sync_engine` de un engine asíncrono).
+    """
+    histograms = {op: DB_QUERY_DURATION.labels(database, op) for op in OPERATIONS | {"OTHER"}}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _observe(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            histograms[statement_operation(statement)].observe(time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _discard_timer(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    checked_out = DB_POOL_CHECKED_OUT.labels(database)
+    overflow = DB_POOL_OVERFLOW.labels(database)
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(*args):
+        checked_out.inc()
+        overflow.set(max(pool.overflow(), 0))
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(*args):
+        # El evento llega antes de devolver la conexión: si la cola del pool
+        # está llena, la conexión se cierra y el overflow baja en uno
+        checked_out.dec()
+        pending = pool.overflow() - (1 if pool.checkedin() >= pool.size() else 0)
+        overflow.set(max(pending, 0))
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que cuenta y mide cada petición HTTP"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # El router deja la ruta encontrada en el scope compartido
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            HTTP_REQUESTS.labels(method, path, str(status)).inc()
+            HTTP_LATENCY.labels(method, path).observe(time.perf_counter() - start)
+
+
+def metrics_payload(multiproc_dir: Optional[str] = None) -> tuple:
+    """
+    Texto de exposición de Prometheus y su Content-Type. En modo
+    multiproceso se agregan los archivos de todos los workers.
+    """
+    multiproc_dir = multiproc_dir or os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry, path=multiproc_dir)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -1,7 +1,39 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import (
+    DDL, BigInteger, Column, DateTime, Float, Index, Integer, String, event, func, literal_column, text
+)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from app.config import SEARCH_TEXT_CONFIG
 from app.database import Base
-from pydantic import BaseModel, Field
-from typing import Optional
+from app.pagination import ID_MAX
+from pydantic import BaseModel, Field, conint, field_validator
+from typing import List, Optional
+
+
+class next_change_seq(FunctionElement):
+    """
+    Siguiente valor de la secuencia global de cambios del catálogo.
+
+    En PostgreSQL es `nextval('product_change_seq')`. En otros motores (SQLite
+    en tests, que serializa las escrituras) se calcula como el máximo actual
+    de productos y tombstones más uno.
+    """
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(next_change_seq, "postgresql")
+def _next_change_seq_postgresql(element, compiler, **kw):
+    return "nextval('product_change_seq')"
+
+
+@compiles(next_change_seq)
+def _next_change_seq_default(element, compiler, **kw):
+    return (
+        "(SELECT coalesce(max(seq), 0) + 1 FROM ("
+        "SELECT max(change_seq) AS seq FROM products "
+        "UNION ALL SELECT max(change_seq) FROM product_tombstones))"
+    )
 
 
 # Modelo SQLAlchemy (tabla en PostgreSQL)
@@ -14,6 +46,102 @@ class ProductDB(Base):
     precio = Column(Float, nullable=False)
     descripcion = Column(String, nullable=True)
     stock = Column(Integer, nullable=False, default=0)
+    # Se incrementa en cada UPDATE (ETag y control de concurrencia optimista)
+    version = Column(
+        Integer, nullable=False, default=1, server_default=text("1"),
+        onupdate=literal_column("version") + 1
+    )
+    updated_at = Column(
+        DateTime(timezone=True), nullable=False,
+        server_default=func.now(), onupdate=func.now()
+    )
+    # Posición en la secuencia global de cambios (altas y modificaciones);
+    # ver GET /productos/changes
+    change_seq = Column(BigInteger, nullable=False, default=next_change_seq(), onupdate=next_change_seq())
+    
+    # Índices para los filtros del listado (ver app/filters.py)
+    __table_args__ = (
+        # Rangos de precio
+        Index("ix_products_precio", "precio"),
+        # Búsqueda por prefijo (LIKE 'abc%') independiente del collation
+        Index("ix_products_nombre_prefix", "nombre", postgresql_ops={"nombre": "text_pattern_ops"}),
+        # Búsqueda por subcadena (ILIKE '%abc%') con trigramas, solo PostgreSQL
+        Index(
+            "ix_products_nombre_trgm", "nombre",
+            postgresql_using="gin", postgresql_ops={"nombre": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        # Listado de productos con stock, recorrido en orden de ID
+        Index(
+            "ix_products_in_stock", "id",
+            postgresql_where=text("stock > 0"), sqlite_where=text("stock > 0")
+        ),
+        # Recorrido keyset de /productos/changes
+        Index("ix_products_change_seq", "change_seq", "id"),
+    )
+
+
+class ProductTombstoneDB(Base):
+    """Registro de un producto eliminado, para la sincronización incremental"""
+    __tablename__ = "product_tombstones"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    change_seq = Column(BigInteger, nullable=False, default=next_change_seq())
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_product_tombstones_change_seq", "change_seq", "id"),
+    )
+
+
+# El índice de trigramas requiere la extensión pg_trgm
+event.listen(
+    ProductDB.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+# Secuencia de cambios compartida por productos y tombstones. También queda
+# como DEFAULT de la columna para que COPY (importación) la asigne.
+event.listen(
+    ProductDB.__table__,
+    "before_create",
+    DDL("CREATE SEQUENCE IF NOT EXISTS product_change_seq").execute_if(dialect="postgresql")
+)
+event.listen(
+    ProductDB.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE products ALTER COLUMN change_seq "
+        "SET DEFAULT nextval('product_change_seq')"
+    ).execute_if(dialect="postgresql")
+)
+
+# Búsqueda de texto completo (solo PostgreSQL): columna tsvector generada a
+# partir de nombre (peso A) y descripcion (peso B), con índice GIN. No se mapea
+# en el ORM para no transferirla en cada lectura; ver app/search.py.
+# Estos DDL solo aplican a create_all (tests, benchmarks); en producción el
+# esquema lo crean las migraciones (migrations/versions), que la mantienen con
+# un trigger para no reescribir la tabla.
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}'::regconfig, coalesce(nombre, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}'::regconfig, coalesce(descripcion, '')), 'B')"
+)
+event.listen(
+    ProductDB.__table__,
+    "after_create",
+    DDL(
+        f"ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED"
+    ).execute_if(dialect="postgresql")
+)
+event.listen(
+    ProductDB.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_products_search_vector "
+        "ON products USING gin (search_vector)"
+    ).execute_if(dialect="postgresql")
+)
 
 
 # Modelo Pydantic (validación y API)
@@ -36,3 +164,171 @@ class Product(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class ProductPatch(BaseModel):
+    """
+    Actualización parcial de un producto: solo se envían los campos a cambiar.
+    
+    nombre, precio y stock pueden omitirse pero no ser null; descripcion
+    acepta null para borrarla.
+    """
+    nombre: Optional[str] = Field(None, min_length=1)
+    precio: Optional[float] = Field(None, gt=0)
+    descripcion: Optional[str] = None
+    stock: Optional[int] = Field(None, ge=0)
+    
+    class Config:
+        extra = "forbid"
+    
+    @field_validator("nombre", "precio", "stock")
+    @classmethod
+    def not_null(cls, value):
+        if value is None:
+            raise ValueError("no puede ser null")
+        return value
+
+
+class ProductPage(BaseModel):
+    """
+    Página de productos para el listado paginado por cursor.
+    
+    Attributes:
+        items: Productos de la página, ordenados por ID
+        next_cursor: Cursor opaco para pedir la siguiente página (None si es la última)
+        limit: Tamaño de página solicitado
+    """
+    items: List[Product]
+    next_cursor: Optional[str] = None
+    limit: int
+
+
+class ProductBulkUpdate(Product):
+    """Producto para actualización masiva: el ID es obligatorio"""
+    id: int = Field(..., ge=1, le=ID_MAX)
+
+
+class BulkDeleteRequest(BaseModel):
+    """IDs a eliminar en una operación masiva (dentro del rango de products.id)"""
+    ids: List[conint(ge=1, le=ID_MAX)] = Field(..., min_length=1)
+
+
+class BulkItemResult(BaseModel):
+    """
+    Resultado de un elemento dentro de una operación masiva.
+    
+    Attributes:
+        index: Posición del elemento en la petición
+        id: ID del producto afectado
+        status: created, updated, deleted o not_found
+    """
+    index: int
+    id: Optional[int] = None
+    status: str
+
+
+class BulkResult(BaseModel):
+    """Resultado de una operación masiva, con un elemento por cada entrada"""
+    results: List[BulkItemResult]
+    succeeded: int
+    failed: int
+
+
+class ImportRowError(BaseModel):
+    """Fila rechazada durante una importación"""
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """
+    Resumen de una importación en streaming.
+    
+    Attributes:
+        accepted: Filas válidas escritas en la base de datos
+        rejected: Filas rechazadas por formato o validación
+        errors: Detalle de las filas rechazadas (limitado a IMPORT_MAX_REPORTED_ERRORS)
+        batches: Lotes escritos (cada uno en su propia transacción)
+        elapsed_seconds: Duración total de la importación
+        rows_per_second: Filas aceptadas por segundo
+    """
+    accepted: int
+    rejected: int
+    errors: List[ImportRowError]
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+class ProductSearchHit(Product):
+    """Producto encontrado por la búsqueda, con su puntaje de relevancia"""
+    rank: float
+
+
+class ProductSearchPage(BaseModel):
+    """
+    Página de resultados de búsqueda, ordenados por relevancia.
+    
+    Attributes:
+        items: Productos encontrados en esta página
+        offset: Posición del primer resultado
+        limit: Tamaño de página solicitado
+        next_offset: Offset de la siguiente página (None si es la última)
+    """
+    items: List[ProductSearchHit]
+    offset: int
+    limit: int
+    next_offset: Optional[int] = None
+
+
+class ProductBatchRequest(BaseModel):
+    """IDs a obtener en una sola consulta (dentro del rango de products.id)"""
+    ids: List[conint(ge=1, le=ID_MAX)] = Field(..., min_length=1)
+
+
+class ProductBatch(BaseModel):
+    """
+    Resultado de una lectura por lote.
+    
+    Attributes:
+        items: Productos encontrados, en el orden de la petición (sin repetidos)
+        missing: IDs solicitados que no existen, en el orden de la petición
+    """
+    items: List[Product]
+    missing: List[int]
+
+
+class ProductChanges(BaseModel):
+    """
+    Cambios del catálogo desde un token de sincronización.
+    
+    Attributes:
+        items: Productos creados o modificados, en orden de cambio
+        deleted: IDs de productos eliminados
+        next_token: Token para pedir los cambios siguientes
+        has_more: True si hay más cambios disponibles de inmediato
+    """
+    items: List[Product]
+    deleted: List[int]
+    next_token: str
+    has_more: bool
+
+
+class StockAdjustment(BaseModel):
+    """
+    Ajuste atómico de stock.
+    
+    Attributes:
+        delta: Unidades a sumar (positivo, reposición) o restar (negativo, reserva)
+    """
+    delta: int = Field(..., description="Negativo para reservar, positivo para reponer")
+
+
+class StockAdjustmentItem(StockAdjustment):
+    """Ajuste de stock de un producto dentro de un lote"""
+    id: int = Field(..., ge=1, le=ID_MAX)
+
+
+class StockAdjustmentBatch(BaseModel):
+    """Lote de ajustes aplicados de forma atómica (todos o ninguno)"""
+    items: List[StockAdjustmentItem] = Field(..., min_length=1)
@@ -0,0 +1,245 @@
+"""
+Coherencia de la caché de productos entre workers con LISTEN/NOTIFY.
+
+Cada escritura emite un NOTIFY (dentro de su transacción, por lo que solo se
+entrega si hace commit) con los IDs modificados. Cada worker mantiene una
+conexión dedicada en LISTEN que invalida sus entradas locales al recibirlo.
+
+El canal es intercambiable: fuera de PostgreSQL (tests con SQLite) se usa
+`InMemoryNotificationChannel`, que entrega los mensajes dentro del proceso.
+"""
+
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import os
+import socket
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import product_cache
+from app.config import DATABASE_URL, PRODUCT_NOTIFY_CHANNEL, PRODUCT_NOTIFY_ENABLED
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL limita el payload de NOTIFY a 8000 bytes
+MAX_PAYLOAD_BYTES = 7500
+
+# Intervalo de ping de la conexión LISTEN para detectar cortes silenciosos
+LISTENER_KEEPALIVE_SECONDS = 30
+LISTENER_MAX_BACKOFF_SECONDS = 30
+
+MessageHandler = Callable[[str], None]
+ResetHandler = Callable[[], None]
+
+
+def worker_id() -> str:
+    """Identificador del proceso actual (host:pid) para ignorar sus propios mensajes"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def encode_payloads(product_ids: Iterable[int], origin: Optional[str] = None) -> List[str]:
+    """
+    Codifica IDs como payloads `origen|id,id,...`, partidos para respetar
+    el tamaño máximo de NOTIFY.
+    """
+    origin = origin or worker_id()
+    payloads = []
+    current: List[str] = []
+    size = len(origin) + 1
+    for product_id in product_ids:
+        item = str(product_id)
+        if current and size + len(item) + 1 > MAX_PAYLOAD_BYTES:
+            payloads.append(f"{origin}|{','.join(current)}")
+            current, size = [], len(origin) + 1
+        current.append(item)
+        size += len(item) + 1
+    if current:
+        payloads.append(f"{origin}|{','.join(current)}")
+    return payloads
+
+
+def decode_payload(payload: str) -> Tuple[str, List[int]]:
+    """
+    Decodifica un payload generado por `encode_payloads`.
+
+    Raises:
+        ValueError: si el payload está mal formado
+    """
+    origin, _, ids = payload.rpartition("|")
+    if not origin or not ids:
+        raise ValueError(f"Payload inválido: {payload!r}")
+    return origin, [int(i) for i in ids.split(",")]
+
+
+class NotificationChannel(ABC):
+    """Interfaz de un canal de notificaciones de cambios de productos"""
+
+    @abstractmethod
+    async def publish(self, db: AsyncSession, product_ids: Iterable[int]) -> None:
+        """Publica los IDs modificados; llamar antes del commit de `db`"""
+
+    @abstractmethod
+    async def start(self, on_message: MessageHandler, on_reset: ResetHandler) -> None:
+        """Comienza a escuchar en segundo plano (no debe bloquear el arranque)"""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Detiene la escucha y libera la conexión"""
+
+
+class InMemoryNotificationChannel(NotificationChannel):
+    """
+    Canal dentro del proceso para tests o despliegues sin PostgreSQL.
+
+    Varias instancias pueden compartir `subscribers` para simular varios
+    workers; `published` conserva los payloads enviados para inspección.
+    """
+
+    def __init__(self, subscribers: Optional[List[MessageHandler]] = None):
+        self.subscribers = subscribers if subscribers is not None else []
+        self.published: List[str] = []
+        self._handler: Optional[MessageHandler] = None
+
+    async def publish(self, db: AsyncSession, product_ids: Iterable[int]) -> None:
+        for payload in encode_payloads(product_ids):
+            self.published.append(payload)
+            for handler in list(self.subscribers):
+                handler(payload)
+
+    async def start(self, on_message: MessageHandler, on_reset: ResetHandler) -> None:
+        self._handler = on_message
+        self.subscribers.append(on_message)
+
+    async def stop(self) -> None:
+        if self._handler in self.subscribers:
+            self.subscribers.remove(self._handler)
+        self._handler = None
+
+
+class PostgresNotificationChannel(NotificationChannel):
+    """Canal sobre LISTEN/NOTIFY de PostgreSQL con reconexión automática"""
+
+    def __init__(self, dsn: str, channel: str = PRODUCT_NOTIFY_CHANNEL):
+        self.dsn = dsn
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, db: AsyncSession, product_ids: Iterable[int]) -> None:
+        # pg_notify es transaccional: se entrega solo cuando `db` hace commit
+        for payload in encode_payloads(product_ids):
+            await db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": payload}
+            )
+
+    async def start(self, on_message: MessageHandler, on_reset: ResetHandler) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_forever(on_message, on_reset))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _listen_forever(self, on_message: MessageHandler, on_reset: ResetHandler) -> None:
+        import asyncpg
+
+        def listener(connection, pid, channel, payload):
+            try:
+                on_message(payload)
+            except Exception as e:
+                logger.error(f"Error procesando notificación {payload!r}: {e}")
+
+        delay = 1
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn, timeout=10)
+            except Exception as e:
+                logger.warning(f"LISTEN {self.channel}: no se pudo conectar ({e}), reintento en {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LISTENER_MAX_BACKOFF_SECONDS)
+                continue
+
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda c, lost=lost: lost.set())
+            try:
+                await conn.add_listener(self.channel, listener)
+                # Mientras no hubo conexión se pudieron perder notificaciones
+                on_reset()
+                delay = 1
+                logger.info(f"Escuchando cambios de productos en '{self.channel}'")
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), LISTENER_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        await conn.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"LISTEN {self.channel}: conexión perdida ({e})")
+            finally:
+                if not conn.is_closed():
+                    try:
+                        await conn.close(timeout=5)
+                    except Exception:
+                        conn.terminate()
+            on_reset()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LISTENER_MAX_BACKOFF_SECONDS)
+
+
+def create_notification_channel(database_url: str = DATABASE_URL) -> NotificationChannel:
+    """Canal PostgreSQL si la base lo soporta; en otro caso, uno en memoria"""
+    url = make_url(database_url)
+    if PRODUCT_NOTIFY_ENABLED and url.get_backend_name() == "postgresql":
+        dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresNotificationChannel(dsn)
+    return InMemoryNotificationChannel()
+
+
+_channel: Optional[NotificationChannel] = None
+
+
+def get_notification_channel() -> NotificationChannel:
+    global _channel
+    if _channel is None:
+        _channel = create_notification_channel()
+    return _channel
+
+
+def set_notification_channel(channel: Optional[NotificationChannel]) -> None:
+    """Reemplaza el canal activo (None vuelve a crear el predeterminado)"""
+    global _channel
+    _channel = channel
+
+
+async def publish_product_changes(db: AsyncSession, product_ids: Iterable[int]) -> None:
+    """Notifica a los demás workers que `product_ids` cambiaron"""
+    await get_notification_channel().publish(db, product_ids)
+
+
+def handle_product_notification(payload: str) -> None:
+    """Invalida en la caché local los productos modificados por otro worker"""
+    try:
+        origin, product_ids = decode_payload(payload)
+    except ValueError as e:
+        logger.warning(str(e))
+        return
+    if origin == worker_id():
+        return
+    for product_id in product_ids:
+        product_cache.invalidate(product_id)
+
+
+def handle_listener_reset() -> None:
+    """Sin garantía de haber recibido todo, la caché local deja de ser confiable"""
+    product_cache.clear()
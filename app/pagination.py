@@ -0,0 +1,79 @@
+"""
+Cursores opacos para paginación keyset.
+
+El cursor codifica el último ID entregado; la siguiente página se obtiene con
+`WHERE id > :ultimo_id ORDER BY id LIMIT :limit`, por lo que el costo de la
+página N es el mismo que el de la primera, sin importar el tamaño de la tabla.
+
+El token de sincronización de /productos/changes usa el mismo formato con la
+clave (change_seq, id) del último cambio entregado.
+"""
+
+import base64
+import json
+from typing import Tuple
+
+# Rango de products.id (Integer) y de change_seq (BigInteger): un valor fuera
+# de rango haría fallar la consulta en lugar de responder 400
+ID_MAX = 2**31 - 1
+SEQ_MAX = 2**63 - 1
+
+
+def _encode(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(token: str) -> dict:
+    padded = token + "=" * (-len(token) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(data, dict):
+        raise ValueError("Token inválido")
+    return data
+
+
+def _is_int(value, maximum: int) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= maximum
+
+
+def encode_cursor(last_id: int) -> str:
+    """Codifica el último ID visto como cursor opaco (base64 url-safe)"""
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodifica un cursor generado por `encode_cursor`.
+
+    Raises:
+        ValueError: si el cursor está mal formado o el ID está fuera de rango
+    """
+    try:
+        last_id = _decode(cursor)["id"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Cursor inválido") from e
+    if not _is_int(last_id, ID_MAX):
+        raise ValueError("Cursor inválido")
+    return last_id
+
+
+def encode_change_token(seq: int, last_id: int) -> str:
+    """Codifica la posición (change_seq, id) del último cambio entregado"""
+    return _encode({"seq": seq, "id": last_id})
+
+
+def decode_change_token(token: str) -> Tuple[int, int]:
+    """
+    Decodifica un token generado por `encode_change_token`.
+
+    Raises:
+        ValueError: si el token está mal formado o fuera de rango
+    """
+    try:
+        data = _decode(token)
+        position = (data["seq"], data["id"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Token inválido") from e
+    if not (_is_int(position[0], SEQ_MAX) and _is_int(position[1], ID_MAX)):
+        raise ValueError("Token inválido")
+    return position
@@ -0,0 +1,264 @@
+"""
+Límite de peticiones por cliente con token buckets.
+
+Cada cliente (su API key si RATE_LIMIT_KEY_HEADER está configurado y la
+envía, si no su IP) tiene un balde de RATE_LIMIT_BURST fichas que se recarga
+a RATE_LIMIT_PER_SECOND; cada petición consume una y, sin fichas, se responde
+429 con Retry-After.
+
+El estado de los baldes vive en un almacén intercambiable:
+- `MemoryRateLimitStore`: en el proceso, sin E/S. El límite es por worker.
+- `PostgresRateLimitStore`: tabla UNLOGGED compartida por todos los workers e
+  instancias; cada petición es un único UPSERT atómico, sobre un engine
+  propio y pequeño (`create_rate_limit_engine`), no el pool de la API.
+"""
+
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import (
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_KEY_HEADER,
+    RATE_LIMIT_MEMORY_MAX_KEYS,
+    RATE_LIMIT_PER_SECOND,
+    RATE_LIMIT_STORE,
+    RATE_LIMIT_TRUSTED_PROXIES,
+)
+from app.database import create_rate_limit_engine
+from app.metrics import RATE_LIMIT_STORE_ERRORS
+from app.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+# Sin límite: sondeos del balanceador y de Prometheus
+EXEMPT_PREFIXES = ("/health", "/metrics")
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class RateLimitStore(ABC):
+    """Interfaz de un almacén de token buckets"""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        """
+        Recarga el balde de `key` y consume una ficha si hay.
+
+        Returns:
+            (permitido, fichas restantes)
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Baldes en un OrderedDict por orden de último uso. Un balde inactivo
+    durante burst/rate segundos ya estaría lleno (igual que uno nuevo), así
+    que se descarta; además se acota a `max_keys` descartando el más antiguo.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MEMORY_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        now = self._clock()
+        self._expire(now - burst / rate)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = burst
+            bucket = self._buckets[key] = [tokens, now]
+        else:
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            self._buckets.move_to_end(key)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        bucket[0], bucket[1] = tokens, now
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def _expire(self, cutoff: float) -> None:
+        while self._buckets:
+            key, (tokens, updated_at) = next(iter(self._buckets.items()))
+            if updated_at > cutoff:
+                break
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# La tabla es UNLOGGED: no genera WAL (escrituras baratas) y se vacía tras una
+# caída del servidor, lo que para baldes de unos segundos es aceptable
+CREATE_TABLE_SQL = text(
+    "CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets ("
+    "key TEXT PRIMARY KEY, tokens DOUBLE PRECISION NOT NULL, "
+    "updated_at DOUBLE PRECISION NOT NULL, allowed BOOLEAN NOT NULL)"
+)
+
+# Recarga y consumo en una sola sentencia; el reloj es el de la base para que
+# todas las instancias usen el mismo. Los CAST fijan el tipo de los parámetros:
+# sin ellos PostgreSQL infiere `:burst - 1` como entero y asyncpg truncaría una
+# ráfaga fraccionaria
+TAKE_SQL = text("""
+WITH now AS (SELECT EXTRACT(EPOCH FROM clock_timestamp())::double precision AS ts)
+INSERT INTO rate_limit_buckets AS b (key, tokens, updated_at, allowed)
+SELECT :key, CAST(:burst AS double precision) - 1, now.ts, TRUE FROM now
+ON CONFLICT (key) DO UPDATE SET
+    tokens = LEAST(CAST(:burst AS double precision),
+                   b.tokens + (EXCLUDED.updated_at - b.updated_at) * CAST(:rate AS double precision))
+        - CASE WHEN LEAST(CAST(:burst AS double precision),
+                          b.tokens + (EXCLUDED.updated_at - b.updated_at) * CAST(:rate AS double precision)) >= 1
+          THEN 1 ELSE 0 END,
+    allowed = LEAST(CAST(:burst AS double precision),
+                    b.tokens + (EXCLUDED.updated_at - b.updated_at) * CAST(:rate AS double precision)) >= 1,
+    updated_at = EXCLUDED.updated_at
+RETURNING allowed, tokens
+""")
+
+# Baldes que ya estarían llenos
+CLEANUP_SQL = text(
+    "DELETE FROM rate_limit_buckets "
+    "WHERE updated_at < EXTRACT(EPOCH FROM clock_timestamp()) - CAST(:idle_seconds AS double precision)"
+)
+
+
+class PostgresRateLimitStore(RateLimitStore):
+    """
+    Baldes compartidos en PostgreSQL. Si la consulta falla se deja pasar
+    la petición: el límite protege a la API, no debe tumbarla. Cada fallo se
+    cuenta en `errors` y en la métrica rate_limit_store_errors_total, para que
+    un almacén roto (que desactiva el límite) no pase inadvertido.
+    """
+
+    # Cada cuántas consultas este worker limpia los baldes inactivos
+    CLEANUP_EVERY = 1000
+
+    def __init__(self, sessionmaker: async_sessionmaker):
+        self.sessionmaker = sessionmaker
+        self._table_ready = False
+        self._takes = 0
+        self.errors = 0
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        try:
+            async with self.sessionmaker() as db:
+                if not self._table_ready:
+                    await db.execute(CREATE_TABLE_SQL)
+                    self._table_ready = True
+                row = (await db.execute(TAKE_SQL, {"key": key, "rate": rate, "burst": burst})).one()
+                self._takes += 1
+                if self._takes % self.CLEANUP_EVERY == 0:
+                    await db.execute(CLEANUP_SQL, {"idle_seconds": burst / rate})
+                await db.commit()
+        except Exception as e:
+            self.errors += 1
+            RATE_LIMIT_STORE_ERRORS.inc()
+            logger.warning(f"Rate limit no disponible, petición permitida: {e}")
+            return True, burst
+        return bool(row.allowed), float(row.tokens)
+
+
+class RateLimiter:
+    """Token bucket por cliente sobre un almacén"""
+
+    def __init__(
+        self, store: RateLimitStore,
+        rate: float = RATE_LIMIT_PER_SECOND, burst: float = RATE_LIMIT_BURST
+    ):
+        self.store = store
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.limited = 0
+
+    async def check(self, key: str) -> RateLimitDecision:
+        allowed, tokens = await self.store.take(key, self.rate, self.burst)
+        if allowed:
+            return RateLimitDecision(True, tokens, 0.0)
+        self.limited += 1
+        return RateLimitDecision(False, tokens, (1 - tokens) / self.rate)
+
+
+def client_key(
+    scope: Scope, key_header: str = RATE_LIMIT_KEY_HEADER,
+    trusted_proxies: int = RATE_LIMIT_TRUSTED_PROXIES
+) -> str:
+    """
+    Identificador del cliente: hash de su API key o su IP. Detrás de
+    `trusted_proxies` proxies la IP es la que agregó el más externo a
+    X-Forwarded-For (las anteriores las puede falsificar el cliente).
+    """
+    headers = Headers(scope=scope)
+    api_key = headers.get(key_header) if key_header else None
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:32]
+    if trusted_proxies > 0:
+        forwarded = [ip.strip() for ip in headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+        if len(forwarded) >= trusted_proxies:
+            return "ip:" + forwarded[-trusted_proxies]
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI que responde 429 a los clientes que superan su límite"""
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        decision = await self.limiter.check(client_key(scope))
+        if decision.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        body = dumps({"detail": "Límite de peticiones excedido"})
+        retry_after = max(1, int(decision.retry_after + 0.999))
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+                (b"ratelimit-limit", str(int(self.limiter.burst)).encode()),
+                (b"ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_rate_limit_store(kind: str = RATE_LIMIT_STORE) -> RateLimitStore:
+    """Almacén configurado en RATE_LIMIT_STORE"""
+    if kind == "postgres":
+        return PostgresRateLimitStore(
+            async_sessionmaker(bind=create_rate_limit_engine(), expire_on_commit=False)
+        )
+    if kind == "memory":
+        return MemoryRateLimitStore()
+    raise ValueError(f"RATE_LIMIT_STORE desconocido: {kind!r}")
+
+
+# Limitador del worker (None si está desactivado)
+rate_limiter: Optional[RateLimiter] = RateLimiter(create_rate_limit_store()) if RATE_LIMIT_ENABLED else None
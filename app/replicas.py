@@ -0,0 +1,276 @@
+"""
+Enrutamiento de lecturas a réplicas de PostgreSQL.
+
+Con DATABASE_REPLICA_URLS configurada, las rutas de solo lectura (listado,
+búsqueda, lotes, exportación y productos individuales) piden su sesión a
+`get_read_db` / `get_read_sessionmaker`, que eligen una réplica sana; las
+escrituras siguen usando `get_db` sobre el primario. Sin réplicas, o si
+ninguna está disponible, las lecturas van al primario.
+
+- Selección: round robin o la réplica con menos sesiones abiertas.
+- Expulsión: un error de conexión saca a la réplica de la rotación durante
+  DB_REPLICA_EJECT_SECONDS; el chequeo periódico también la saca si su retraso
+  de replicación supera DB_REPLICA_MAX_LAG_SECONDS, y la reincorpora al
+  recuperarse.
+- Leer lo escrito: tras una escritura exitosa, `ReadYourWritesMiddleware`
+  deja una cookie con la que las lecturas del mismo cliente van al primario
+  durante READ_YOUR_WRITES_SECONDS.
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import (
+    DB_REPLICA_CHECK_INTERVAL_SECONDS,
+    DB_REPLICA_EJECT_SECONDS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_STRATEGY,
+    READ_YOUR_WRITES_SECONDS,
+)
+from app.database import get_sessionmaker, replica_engines
+
+logger = logging.getLogger(__name__)
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+# Métodos que no modifican datos: no activan la lectura desde el primario
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Lecturas que usan POST (cuerpo con la lista de IDs)
+READ_ONLY_POST_PATHS = {"/productos/batch"}
+
+# Errores que indican que la réplica no está disponible (no errores de la consulta)
+CONNECTION_ERRORS = (
+    exc.OperationalError,
+    exc.InterfaceError,
+    exc.TimeoutError,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+# Retraso de replicación en segundos; 0 si la réplica reprodujo todo lo recibido
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    """
+    Una réplica de lectura. Se usa como una fábrica de sesiones: `replica()`
+    abre una sesión, cuenta las sesiones abiertas y expulsa a la réplica si
+    la sesión falla por un error de conexión.
+    """
+
+    def __init__(
+        self, name: str, engine: AsyncEngine,
+        eject_seconds: float = DB_REPLICA_EJECT_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.engine = engine
+        self.eject_seconds = eject_seconds
+        self._clock = clock
+        self._sessionmaker = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        self.in_use = 0
+        self.sessions = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.lag_seconds: Optional[float] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self._clock() >= self.ejected_until
+
+    def eject(self, reason: str) -> None:
+        """Saca a la réplica de la rotación durante `eject_seconds`"""
+        if self.healthy:
+            self.ejections += 1
+            logger.warning(f"Réplica {self.name} fuera de rotación: {reason}")
+        self.ejected_until = self._clock() + self.eject_seconds
+
+    def readmit(self) -> None:
+        if not self.healthy:
+            logger.info(f"Réplica {self.name} de vuelta en rotación")
+        self.ejected_until = 0.0
+
+    def __call__(self):
+        return self._session()
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        self.in_use += 1
+        self.sessions += 1
+        try:
+            async with self._sessionmaker() as db:
+                yield db
+        except CONNECTION_ERRORS as e:
+            self.eject(str(e))
+            raise
+        finally:
+            self.in_use -= 1
+
+    async def check(self, max_lag: float = DB_REPLICA_MAX_LAG_SECONDS) -> None:
+        """Consulta la réplica (y su retraso en PostgreSQL) para expulsarla o reincorporarla"""
+        try:
+            async with self.engine.connect() as conn:
+                if self.engine.dialect.name == "postgresql":
+                    self.lag_seconds = float((await conn.execute(LAG_QUERY)).scalar() or 0)
+                else:
+                    await conn.execute(text("SELECT 1"))
+                    self.lag_seconds = 0.0
+        except Exception as e:
+            self.eject(f"chequeo fallido ({e})")
+            return
+        if self.lag_seconds > max_lag:
+            self.eject(f"retraso de replicación de {self.lag_seconds:.1f}s")
+        else:
+            self.readmit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "in_use": self.in_use,
+            "sessions": self.sessions,
+            "ejections": self.ejections,
+            "lag_seconds": self.lag_seconds,
+        }
+
+
+class ReplicaSet:
+    """Réplicas disponibles y la estrategia para elegir entre ellas"""
+
+    def __init__(self, replicas: List[Replica], strategy: str = DB_REPLICA_STRATEGY):
+        if strategy not in ("round_robin", "least_connections"):
+            raise ValueError(f"Estrategia de réplicas desconocida: {strategy!r}")
+        self.replicas = replicas
+        self.strategy = strategy
+        self._counter = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[Replica]:
+        """Réplica sana para la próxima lectura, o None si no hay ninguna"""
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        # El contador rota también los empates de least_connections
+        start = next(self._counter) % len(healthy)
+        rotated = healthy[start:] + healthy[:start]
+        if self.strategy == "least_connections":
+            return min(rotated, key=lambda r: r.in_use)
+        return rotated[0]
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(replica.check() for replica in self.replicas))
+
+    async def start(self, interval: float = DB_REPLICA_CHECK_INTERVAL_SECONDS) -> None:
+        """Inicia el chequeo periódico en segundo plano"""
+        if self.replicas and interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._check_forever(interval))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _check_forever(self, interval: float) -> None:
+        while True:
+            try:
+                await self.check_all()
+            except Exception as e:
+                logger.error(f"Error en el chequeo de réplicas: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+
+def _replica_name(engine: AsyncEngine) -> str:
+    url = engine.url
+    return f"{url.host}:{url.port or 5432}/{url.database}" if url.host else str(url.database)
+
+
+replica_set = ReplicaSet([Replica(_replica_name(e), e) for e in replica_engines])
+
+
+def wants_primary(request: Request) -> bool:
+    """True si el cliente escribió hace poco (cookie de leer lo escrito vigente)"""
+    value = request.cookies.get(READ_PRIMARY_COOKIE)
+    if not value:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+
+def get_read_sessionmaker(
+    request: Request, primary: async_sessionmaker = Depends(get_sessionmaker)
+):
+    """
+    Fábrica de sesiones para lecturas: una réplica sana, o el primario si no
+    hay réplicas disponibles o el cliente acaba de escribir.
+    """
+    if wants_primary(request):
+        return primary
+    return replica_set.choose() or primary
+
+
+async def get_read_db(sessionmaker=Depends(get_read_sessionmaker)):
+    """Obtener sesión asíncrona de solo lectura (réplica o primario)"""
+    async with sessionmaker() as db:
+        yield db
+
+
+class ReadYourWritesMiddleware:
+    """
+    Marca con una cookie a los clientes que acaban de escribir, para que sus
+    lecturas vayan al primario mientras las réplicas se ponen al día.
+    """
+
+    def __init__(self, app: ASGIApp, seconds: float = READ_YOUR_WRITES_SECONDS):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or self.seconds <= 0
+            or scope["method"] in SAFE_METHODS
+            or scope["path"] in READ_ONLY_POST_PATHS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}={until:.3f}; Max-Age={math.ceil(self.seconds)}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -1,61 +1,860 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.models.product import Product, ProductDB
-from app.database import get_db
+import time
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import Integer, any_, bindparam, delete, insert, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Annotated, List, NamedTuple, Optional, Set, Union
+from app.cache import catalog_snapshots, product_cache
+from app.changes import START, fetch_changes, record_tombstones
+from app.compression import choose_encoding, encode_body
+from app.config import (
+    BATCH_GET_MAX_IDS,
+    BULK_MAX_ITEMS,
+    EXPORT_BATCH_SIZE,
+    IMPORT_BATCH_SIZE,
+    IMPORT_MAX_LINE_BYTES,
+    IMPORT_MAX_REPORTED_ERRORS,
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    SEARCH_MAX_OFFSET,
+)
+from app.models.product import (
+    BulkDeleteRequest,
+    BulkItemResult,
+    BulkResult,
+    ImportReport,
+    ImportRowError,
+    Product,
+    ProductBatch,
+    ProductBatchRequest,
+    ProductBulkUpdate,
+    ProductChanges,
+    ProductDB,
+    ProductPage,
+    ProductPatch,
+    ProductSearchHit,
+    ProductSearchPage,
+    StockAdjustment,
+    StockAdjustmentBatch,
+)
+from app.database import get_db, get_sessionmaker
+from app.etags import (
+    catalog_token,
+    content_etag,
+    etag_headers,
+    if_match_versions,
+    is_not_modified,
+    product_etag,
+    rows_fingerprint,
+    weak_etag,
+)
+from app.filters import ProductFilters
+from app.notifications import publish_product_changes
+from app.pagination import ID_MAX, decode_change_token, decode_cursor, encode_change_token, encode_cursor
+from app.replicas import get_read_db, get_read_sessionmaker
+from app.search import search_products
+from app.serialization import PRODUCT_COLUMNS, FastJSONResponse, dumps, product_dicts
+from app.singleflight import SingleFlight
+from app.streaming import (
+    EXPORT_COLUMNS,
+    MEDIA_TYPES,
+    LineTooLongError,
+    encode_csv,
+    encode_ndjson,
+    iter_import_records,
+)
 
 # Create router for product endpoints
 # redirect_slashes=False evita redirecciones automáticas
 router = APIRouter(prefix="/productos", tags=["productos"])
 
+# Cargas en curso compartidas por peticiones simultáneas
+product_loads = SingleFlight()
+catalog_loads = SingleFlight()
+
+# ID de producto en la ruta: fuera del rango de products.id (int4) la consulta
+# fallaría con 500; así se rechaza con 422
+ProductIdPath = Annotated[int, Path(ge=1, le=ID_MAX, description="ID del producto")]
+
+class CachedProduct(NamedTuple):
+    """Entrada de la caché: el producto serializable y los datos de su ETag"""
+    product: Product
+    version: int
+    updated_at: Optional[datetime]
+    
+    @property
+    def etag(self) -> str:
+        return product_etag(self.product.id, self.version)
+
+
+def _cache_entry(db_product: ProductDB) -> CachedProduct:
+    return CachedProduct(Product.model_validate(db_product), db_product.version, db_product.updated_at)
+
+
+def _set_etag(response: Response, entry: CachedProduct):
+    response.headers.update(etag_headers(entry.etag, entry.updated_at))
+
+
+async def _check_precondition(db: AsyncSession, product_id: int, versions: Optional[Set[int]]):
+    """
+    Se llama cuando una escritura condicionada no afectó ninguna fila.
+    
+    Raises:
+        HTTPException: 404 si el producto no existe; 412 si existe pero su
+            versión no coincide con If-Match
+    """
+    await db.rollback()
+    exists = (await db.scalars(select(ProductDB.id).where(ProductDB.id == product_id))).first()
+    if exists is None:
+        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    if versions is not None:
+        raise HTTPException(status_code=412, detail="El producto fue modificado (If-Match no coincide)")
+    raise HTTPException(status_code=404, detail="Producto no encontrado")
+
+
+# Tamaño de los lotes de IDs en cláusulas IN (límite de parámetros por sentencia)
+IN_CLAUSE_CHUNK = 1000
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _check_bulk_size(count: int):
+    if count > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo {BULK_MAX_ITEMS} elementos por operación masiva"
+        )
+
+
+def _parse_ids(raw: str) -> List[int]:
+    """IDs separados por coma (`1,2,3`), dentro del rango de products.id"""
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids debe ser una lista de enteros separados por coma")
+    if not ids:
+        raise HTTPException(status_code=422, detail="ids no puede estar vacío")
+    if not all(1 <= product_id <= ID_MAX for product_id in ids):
+        raise HTTPException(status_code=422, detail=f"Los ids deben estar entre 1 y {ID_MAX}")
+    return ids
+
+
+async def _get_many(db: AsyncSession, ids: List[int]) -> ProductBatch:
+    """
+    Productos de `ids` en el orden pedido. Los que no están en la caché se
+    leen con una sola consulta: `id = ANY(:ids)` en PostgreSQL (un único
+    parámetro de tipo arreglo, sin importar la cantidad) e IN por lotes en
+    otros motores.
+    
+    `db` puede ser una réplica: los productos escritos hace muy poco se
+    devuelven pero no se guardan en la caché, porque la réplica podría no
+    tener aún su última versión.
+    """
+    requested = list(dict.fromkeys(ids))
+    found = {}
+    misses = []
+    for product_id in requested:
+        entry = product_cache.get(product_id)
+        if entry is None:
+            misses.append(product_id)
+        else:
+            found[product_id] = entry.product
+    
+    if misses:
+        stamps = {product_id: product_cache.stamp(product_id) for product_id in misses}
+        connection = await db.connection()
+        if connection.dialect.name == "postgresql":
+            conditions = [ProductDB.id == any_(bindparam("ids", misses, type_=ARRAY(Integer)))]
+        else:
+            conditions = [ProductDB.id.in_(chunk) for chunk in _chunks(misses, IN_CLAUSE_CHUNK)]
+        for condition in conditions:
+            for db_product in await db.scalars(select(ProductDB).where(condition)):
+                entry = _cache_entry(db_product)
+                if not product_cache.recently_written(db_product.id):
+                    product_cache.set(db_product.id, entry, stamp=stamps[db_product.id])
+                found[db_product.id] = entry.product
+    
+    return ProductBatch(
+        items=[found[product_id] for product_id in requested if product_id in found],
+        missing=[product_id for product_id in requested if product_id not in found]
+    )
+
+
+def _bulk_result(results: List[BulkItemResult]) -> BulkResult:
+    failed = sum(1 for r in results if r.status == "not_found")
+    return BulkResult(results=results, succeeded=len(results) - failed, failed=failed)
+
+
+# Niveles de compresión de los snapshots del catálogo (se comprimen una vez por versión)
+SNAPSHOT_COMPRESSION_LEVELS = {"br": 9, "gzip": 9}
+
+# Columnas escritas por la importación (el ID lo asigna la base de datos)
+IMPORT_COLUMNS = ("nombre", "precio", "descripcion", "stock")
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _adjust_stock_statement(product_id: int, delta: int):
+    """
+    UPDATE condicional de una sola sentencia: solo aplica si el stock
+    resultante no es negativo, sin leer antes la fila (sin carreras de
+    lectura-modificación-escritura entre compradores concurrentes).
+    """
+    return (
+        update(ProductDB)
+        .where(ProductDB.id == product_id, ProductDB.stock + delta >= 0)
+        .values(stock=ProductDB.stock + delta)
+        .returning(ProductDB)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _update_product(
+    db: AsyncSession, product_id: int, values: dict, request: Request, response: Response
+) -> Product:
+    """
+    Aplica `values` con un único UPDATE ... RETURNING (sin SELECT previo ni
+    refresh posterior), confirma y actualiza la caché. Si la petición trae
+    If-Match, la versión se verifica en el mismo UPDATE.
+    
+    Raises:
+        HTTPException: 404 si el producto no existe, 412 si If-Match no coincide
+    """
+    versions = if_match_versions(request, product_id)
+    query = update(ProductDB).where(ProductDB.id == product_id)
+    if versions is not None:
+        query = query.where(ProductDB.version.in_(versions))
+    db_product = (await db.scalars(
+        query.values(**values)
+        .returning(ProductDB)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if db_product is None:
+        await _check_precondition(db, product_id, versions)
+    
+    entry = _cache_entry(db_product)
+    await publish_product_changes(db, [product_id])
+    await db.commit()
+    product_cache.set(product_id, entry)
+    _set_etag(response, entry)
+    return entry.product
+
+
+async def _load_product(sessionmaker: async_sessionmaker, product_id: int) -> Optional[CachedProduct]:
+    """Lee un producto en una sesión propia y llena la caché (None si no existe)"""
+    stamp = product_cache.stamp(product_id)
+    async with sessionmaker() as db:
+        db_product = await db.get(ProductDB, product_id)
+    if db_product is None:
+        return None
+    entry = _cache_entry(db_product)
+    product_cache.set(product_id, entry, stamp=stamp)
+    return entry
+
+
+async def _build_catalog_snapshot(
+    sessionmaker: async_sessionmaker, query, key: tuple, encoding: Optional[str]
+) -> tuple:
+    async with sessionmaker() as db:
+        rows = (await db.execute(query.order_by(ProductDB.id))).all()
+    body = dumps(product_dicts(rows))
+    snapshot = await run_in_threadpool(encode_body, body, encoding, SNAPSHOT_COMPRESSION_LEVELS.get(encoding))
+    catalog_snapshots.set(key, snapshot)
+    return snapshot
+
+
+async def _catalog_snapshot_response(
+    sessionmaker: async_sessionmaker, query, etag: str, request: Request
+) -> Response:
+    """
+    Catálogo completo ya serializado y comprimido para la codificación que
+    acepta el cliente. Se guarda por (ETag, codificación): las peticiones
+    repetidas sin cambios en el catálogo no consultan filas ni recomprimen, y
+    las simultáneas comparten una sola construcción.
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    key = (etag, encoding)
+    snapshot = catalog_snapshots.get(key)
+    if snapshot is None:
+        snapshot = await catalog_loads.do(
+            key, lambda: _build_catalog_snapshot(sessionmaker, query, key, encoding)
+        )
+    
+    content, content_encoding = snapshot
+    headers = etag_headers(etag)
+    headers["Vary"] = "Accept-Encoding"
+    if content_encoding is not None:
+        headers["Content-Encoding"] = content_encoding
+        headers["ETag"] = weak_etag(etag)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+async def _write_import_batch(db: AsyncSession, products: List[Product]):
+    """
+    Escribe y confirma un lote de la importación.
+    En PostgreSQL usa COPY; en otros motores, un INSERT ejecutado como executemany.
+    """
+    connection = await db.connection()
+    if connection.dialect.name == "postgresql":
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            ProductDB.__tablename__,
+            records=[tuple(getattr(p, c) for c in IMPORT_COLUMNS) for p in products],
+            columns=IMPORT_COLUMNS
+        )
+    else:
+        await db.execute(insert(ProductDB), [p.model_dump(include=set(IMPORT_COLUMNS)) for p in products])
+    await db.commit()
+
 
 @router.post("/", response_model=Product, status_code=201)
-async def create_product(product: Product, db: Session = Depends(get_db)):
+async def create_product(product: Product, response: Response, db: AsyncSession = Depends(get_db)):
     """
-    Crea un nuevo producto en PostgreSQL.
+    Crea un nuevo producto en PostgreSQL con un único INSERT ... RETURNING.
     
     Args:
         product: Datos del producto a crear (nombre, precio, descripcion, stock)
+        response: Respuesta, para agregar el ETag
         db: Sesión de base de datos (inyectada automáticamente)
     
     Returns:
         Product: El producto creado con su ID asignado
     """
-    db_product = ProductDB(
-        nombre=product.nombre,
-        precio=product.precio,
-        descripcion=product.descripcion,
-        stock=product.stock
+    db_product = (await db.scalars(
+        insert(ProductDB)
+        .values(**product.model_dump(exclude={"id"}))
+        .returning(ProductDB)
+    )).one()
+    entry = _cache_entry(db_product)
+    await publish_product_changes(db, [entry.product.id])
+    await db.commit()
+    
+    product_cache.set(entry.product.id, entry)
+    _set_etag(response, entry)
+    return entry.product
+
+
+@router.get("/", response_model=Union[ProductPage, List[Product]])
+async def list_products(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="Cursor devuelto por la página anterior"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    all: bool = Query(False, description="Devuelve el catálogo completo sin paginar"),
+    filters: ProductFilters = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    sessionmaker: async_sessionmaker = Depends(get_read_sessionmaker)
+):
+    """
+    Lista productos desde PostgreSQL usando paginación keyset por ID.
+    
+    Las filas se leen como tuplas de columnas y se codifican directamente a
+    JSON (ver app/serialization.py), sin objetos ORM ni validación Pydantic.
+    
+    La respuesta lleva un ETag: el de una página se calcula a partir de los
+    (id, version) de sus filas; el del catálogo completo, a partir de una
+    consulta agregada previa, sin cargar los productos. Si coincide con
+    If-None-Match se responde 304 sin serializar el cuerpo.
+    
+    Args:
+        request: Petición (encabezados condicionales)
+        cursor: Cursor opaco de la página anterior (omitir para la primera página)
+        limit: Cantidad máxima de productos por página
+        all: Si es True, retorna la lista completa sin paginar (solo catálogos pequeños)
+        filters: Filtros por nombre, rango de precio y disponibilidad
+        db: Sesión de lectura (réplica o primario)
+        sessionmaker: Fábrica de sesiones para construir el snapshot del catálogo
+            (la misma réplica que `db`)
+    
+    Returns:
+        ProductPage: Página de productos con el cursor de la siguiente página,
+        o List[Product] con todos los productos si `all=true`
+    
+    Raises:
+        HTTPException: 400 si el cursor es inválido
+    """
+    # Filas como tuplas de columnas, codificadas sin pasar por ORM ni Pydantic
+    query = filters.apply(select(*PRODUCT_COLUMNS, ProductDB.version))
+    if all:
+        etag = content_etag("catalog", await catalog_token(db), sorted(request.query_params.multi_items()))
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers=etag_headers(etag))
+        return await _catalog_snapshot_response(sessionmaker, query, etag, request)
+    
+    if cursor is not None:
+        try:
+            last_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        query = query.where(ProductDB.id > last_id)
+    
+    # Se pide un elemento extra para saber si existe una página siguiente
+    rows = (await db.execute(query.order_by(ProductDB.id).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    
+    etag = content_etag("page", limit, rows_fingerprint(rows), next_cursor)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=etag_headers(etag))
+    return FastJSONResponse(
+        {"items": product_dicts(rows), "next_cursor": next_cursor, "limit": limit},
+        headers=etag_headers(etag)
     )
-    db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
-    return db_product
 
 
-@router.get("/", response_model=List[Product])
-async def list_products(db: Session = Depends(get_db)):
+@router.post("/bulk", response_model=BulkResult, status_code=201)
+async def bulk_create_products(products: List[Product], db: AsyncSession = Depends(get_db)):
     """
-    Lista todos los productos desde PostgreSQL.
+    Crea muchos productos en una sola transacción.
+    
+    Todos los elementos se validan antes de escribir (un elemento inválido
+    rechaza la petición completa con 422) y se insertan con un INSERT
+    multi-fila ... RETURNING id.
     
     Args:
-        db: Sesión de base de datos (inyectada automáticamente)
+        products: Productos a crear (se ignora el campo id)
+        db: Sesión de base de datos
     
     Returns:
-        List[Product]: Lista de todos los productos
+        BulkResult: ID asignado a cada elemento, en el orden de la petición
+    
+    Raises:
+        HTTPException: 413 si se supera BULK_MAX_ITEMS
     """
-    products = db.query(ProductDB).all()
-    return products
+    _check_bulk_size(len(products))
+    if not products:
+        return _bulk_result([])
+    
+    rows = [p.model_dump(exclude={"id"}) for p in products]
+    result = await db.scalars(
+        insert(ProductDB).returning(ProductDB.id, sort_by_parameter_order=True),
+        rows
+    )
+    ids = list(result)
+    await publish_product_changes(db, ids)
+    await db.commit()
+    
+    return _bulk_result([
+        BulkItemResult(index=i, id=product_id, status="created")
+        for i, product_id in enumerate(ids)
+    ])
+
+
+@router.put("/bulk", response_model=BulkResult)
+async def bulk_update_products(products: List[ProductBulkUpdate], db: AsyncSession = Depends(get_db)):
+    """
+    Actualiza muchos productos en una sola transacción.
+    
+    Se verifica qué IDs existen con consultas IN por lotes y se aplican los
+    cambios con un UPDATE por clave primaria ejecutado como executemany.
+    
+    Args:
+        products: Productos completos con su ID
+        db: Sesión de base de datos
+    
+    Returns:
+        BulkResult: updated o not_found para cada elemento
+    
+    Raises:
+        HTTPException: 413 si se supera BULK_MAX_ITEMS, 422 si hay IDs repetidos
+    """
+    _check_bulk_size(len(products))
+    ids = [p.id for p in products]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=422, detail="IDs repetidos en la petición")
+    
+    existing = set()
+    for chunk in _chunks(ids, IN_CLAUSE_CHUNK):
+        existing.update(await db.scalars(select(ProductDB.id).where(ProductDB.id.in_(chunk))))
+    
+    rows = [p.model_dump() for p in products if p.id in existing]
+    if rows:
+        await db.execute(update(ProductDB), rows)
+        await publish_product_changes(db, [row["id"] for row in rows])
+    await db.commit()
+    
+    for product_id in existing:
+        product_cache.invalidate(product_id)
+    return _bulk_result([
+        BulkItemResult(index=i, id=p.id, status="updated" if p.id in existing else "not_found")
+        for i, p in enumerate(products)
+    ])
+
+
+@router.delete("/bulk", response_model=BulkResult)
+async def bulk_delete_products(request: BulkDeleteRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Elimina muchos productos en una sola transacción con DELETE ... RETURNING id.
+    
+    Args:
+        request: IDs a eliminar
+        db: Sesión de base de datos
+    
+    Returns:
+        BulkResult: deleted o not_found para cada ID
+    
+    Raises:
+        HTTPException: 413 si se supera BULK_MAX_ITEMS
+    """
+    _check_bulk_size(len(request.ids))
+    
+    deleted = set()
+    for chunk in _chunks(list(dict.fromkeys(request.ids)), IN_CLAUSE_CHUNK):
+        result = await db.scalars(
+            delete(ProductDB)
+            .where(ProductDB.id.in_(chunk))
+            .returning(ProductDB.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted.update(result)
+    if deleted:
+        await record_tombstones(db, sorted(deleted))
+        await publish_product_changes(db, sorted(deleted))
+    await db.commit()
+    
+    for product_id in deleted:
+        product_cache.invalidate(product_id)
+    return _bulk_result([
+        BulkItemResult(index=i, id=product_id, status="deleted" if product_id in deleted else "not_found")
+        for i, product_id in enumerate(request.ids)
+    ])
+
+
+@router.get("/export")
+async def export_products(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    sessionmaker: async_sessionmaker = Depends(get_read_sessionmaker)
+):
+    """
+    Exporta el catálogo completo en NDJSON o CSV como respuesta en streaming.
+    
+    Las filas se leen con un cursor del servidor (`yield_per`) y se escriben
+    en la respuesta a medida que llegan, sin materializar el catálogo.
+    
+    Args:
+        format: ndjson (por defecto) o csv
+        sessionmaker: Fábrica de sesiones de lectura; la sesión vive mientras dure el streaming
+    
+    Returns:
+        StreamingResponse: Productos ordenados por ID
+    """
+    columns = [getattr(ProductDB, name) for name in EXPORT_COLUMNS]
+    query = (
+        select(*columns)
+        .order_by(ProductDB.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    
+    async def generate():
+        async with sessionmaker() as db:
+            result = await db.stream(query)
+            first = True
+            async for rows in result.partitions():
+                if format == "csv":
+                    yield encode_csv(rows, header=first)
+                else:
+                    yield encode_ndjson(rows)
+                first = False
+            if first and format == "csv":
+                yield encode_csv([], header=True)
+    
+    return StreamingResponse(
+        generate(),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="productos.{format}"'}
+    )
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_products(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Importa productos desde una carga NDJSON o CSV sin mantenerla en memoria.
+    
+    El cuerpo se lee de a trozos; cada fila se valida contra `Product` y las
+    válidas se escriben en lotes de IMPORT_BATCH_SIZE (COPY en PostgreSQL).
+    No se lee más de la carga mientras un lote se está escribiendo, por lo que
+    un cliente rápido no puede llenar la memoria del worker. Cada lote se
+    confirma por separado: si la importación se interrumpe, los lotes ya
+    escritos permanecen.
+    
+    Args:
+        request: Petición cuyo cuerpo contiene los productos
+        format: ndjson o csv (por defecto se deduce del Content-Type)
+        db: Sesión de base de datos
+    
+    Returns:
+        ImportReport: Filas aceptadas/rechazadas con número de línea y rendimiento
+    
+    Raises:
+        HTTPException: 400 si la carga no es UTF-8, 413 si una línea supera IMPORT_MAX_LINE_BYTES
+    """
+    if format is None:
+        format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    
+    started = time.perf_counter()
+    accepted = rejected = batches = 0
+    errors: List[ImportRowError] = []
+    batch: List[Product] = []
+    
+    def reject(line: int, message: str):
+        nonlocal rejected
+        rejected += 1
+        if len(errors) < IMPORT_MAX_REPORTED_ERRORS:
+            errors.append(ImportRowError(line=line, error=message))
+    
+    records = iter_import_records(request.stream(), format, IMPORT_MAX_LINE_BYTES)
+    try:
+        async for line, data, error in records:
+            if error is not None:
+                reject(line, error)
+                continue
+            data.pop("id", None)
+            try:
+                batch.append(Product.model_validate(data))
+            except ValidationError as e:
+                reject(line, _validation_message(e))
+                continue
+            
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await _write_import_batch(db, batch)
+                accepted += len(batch)
+                batches += 1
+                batch = []
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="La carga debe estar codificada en UTF-8")
+    except LineTooLongError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    if batch:
+        await _write_import_batch(db, batch)
+        accepted += len(batch)
+        batches += 1
+    
+    elapsed = time.perf_counter() - started
+    return ImportReport(
+        accepted=accepted,
+        rejected=rejected,
+        errors=errors,
+        batches=batches,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(accepted / elapsed, 1) if elapsed > 0 else 0.0
+    )
+
+
+@router.get("/search", response_model=ProductSearchPage)
+async def search_products_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Palabras a buscar"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    offset: int = Query(0, ge=0, le=SEARCH_MAX_OFFSET),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Búsqueda de texto completo en nombre y descripcion, ordenada por relevancia.
+    
+    En PostgreSQL usa el índice GIN sobre `search_vector` (admite sintaxis de
+    websearch: "frase exacta", -excluir, or). Las coincidencias en el nombre
+    pesan más que en la descripción.
+    
+    Args:
+        q: Texto a buscar
+        limit: Cantidad máxima de resultados por página
+        offset: Posición del primer resultado
+        db: Sesión de lectura (réplica o primario)
+    
+    Returns:
+        ProductSearchPage: Resultados con su puntaje y el offset de la siguiente página
+    """
+    # Se pide un resultado extra para saber si existe una página siguiente
+    hits = await search_products(db, q, limit + 1, offset)
+    next_offset = offset + limit if len(hits) > limit else None
+    return ProductSearchPage(
+        items=[
+            ProductSearchHit(**Product.model_validate(product).model_dump(), rank=rank)
+            for product, rank in hits[:limit]
+        ],
+        offset=offset,
+        limit=limit,
+        next_offset=next_offset
+    )
+
+
+@router.get("/batch", response_model=ProductBatch)
+async def get_products_batch(
+    ids: str = Query(..., description="IDs separados por coma, p. ej. 1,2,3"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Obtiene varios productos por ID en una sola llamada y una sola consulta.
+    
+    Args:
+        ids: IDs separados por coma (máximo BATCH_GET_MAX_IDS)
+        db: Sesión de lectura (réplica o primario)
+    
+    Returns:
+        ProductBatch: Productos en el orden pedido e IDs inexistentes
+    
+    Raises:
+        HTTPException: 422 si ids está mal formado, 413 si supera BATCH_GET_MAX_IDS
+    """
+    product_ids = _parse_ids(ids)
+    if len(product_ids) > BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo {BATCH_GET_MAX_IDS} IDs por consulta; usar POST /productos/batch"
+        )
+    return await _get_many(db, product_ids)
+
+
+@router.post("/batch", response_model=ProductBatch)
+async def post_products_batch(request: ProductBatchRequest, db: AsyncSession = Depends(get_read_db)):
+    """
+    Variante de GET /productos/batch con los IDs en el cuerpo, para conjuntos
+    grandes que no caben en la URL.
+    
+    Args:
+        request: IDs a obtener
+        db: Sesión de lectura (réplica o primario)
+    
+    Returns:
+        ProductBatch: Productos en el orden pedido e IDs inexistentes
+    
+    Raises:
+        HTTPException: 413 si se supera BULK_MAX_ITEMS
+    """
+    _check_bulk_size(len(request.ids))
+    return await _get_many(db, request.ids)
+
+
+@router.get("/changes", response_model=ProductChanges)
+async def list_changes(
+    since: Optional[str] = Query(None, description="next_token de la consulta anterior (omitir para la carga inicial)"),
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Productos creados, modificados o eliminados desde un token de sincronización.
+    
+    Sin `since` se recorre el catálogo completo (carga inicial); después basta
+    con guardar `next_token` y repetir la consulta para recibir solo los
+    cambios. Mientras `has_more` sea True conviene pedir de inmediato la
+    siguiente página; un mismo producto puede llegar más de una vez.
+    
+    Se lee siempre del primario: el margen de seguridad del token supone que
+    los cambios son visibles apenas hacen commit, sin retraso de replicación.
+    
+    Args:
+        since: Token devuelto por la consulta anterior
+        limit: Cantidad máxima de cambios por respuesta
+        db: Sesión de base de datos
+    
+    Returns:
+        ProductChanges: Productos vigentes, IDs eliminados y el siguiente token
+    
+    Raises:
+        HTTPException: 400 si el token es inválido
+    """
+    position = START
+    if since is not None:
+        try:
+            position = decode_change_token(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Token inválido")
+    
+    changes = await fetch_changes(db, position, limit)
+    return FastJSONResponse({
+        "items": product_dicts(changes.products),
+        "deleted": changes.deleted,
+        "next_token": encode_change_token(*changes.position),
+        "has_more": changes.has_more,
+    })
+
+
+@router.post("/stock/adjust", response_model=List[Product])
+async def adjust_stock_batch(batch: StockAdjustmentBatch, db: AsyncSession = Depends(get_db)):
+    """
+    Ajusta el stock de varios productos en una sola transacción (todo o nada).
+    
+    Los ajustes del mismo producto se suman y se aplican en orden de ID para
+    que dos lotes concurrentes tomen los locks de fila en el mismo orden.
+    
+    Args:
+        batch: Ajustes (id, delta) a aplicar
+        db: Sesión de base de datos
+    
+    Returns:
+        List[Product]: Productos ajustados, en el orden de su primera aparición
+    
+    Raises:
+        HTTPException: 409 si algún producto no existe o quedaría con stock
+            negativo; el detalle lista cada ID fallido y ningún ajuste se aplica
+    """
+    deltas = {}
+    for item in batch.items:
+        deltas[item.id] = deltas.get(item.id, 0) + item.delta
+    
+    adjusted = {}
+    failed = []
+    for product_id in sorted(deltas):
+        product = (await db.scalars(_adjust_stock_statement(product_id, deltas[product_id]))).first()
+        if product is None:
+            failed.append(product_id)
+        else:
+            adjusted[product_id] = _cache_entry(product)
+    
+    if failed:
+        await db.rollback()
+        existing = set(await db.scalars(select(ProductDB.id).where(ProductDB.id.in_(failed))))
+        raise HTTPException(status_code=409, detail=[
+            {"id": product_id, "error": "stock_insuficiente" if product_id in existing else "no_encontrado"}
+            for product_id in failed
+        ])
+    
+    await publish_product_changes(db, list(adjusted))
+    await db.commit()
+    for product_id, entry in adjusted.items():
+        product_cache.set(product_id, entry)
+    return [adjusted[product_id].product for product_id in deltas]
 
 
 @router.get("/{product_id}", response_model=Product)
-async def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(
+    product_id: ProductIdPath, request: Request, response: Response,
+    sessionmaker: async_sessionmaker = Depends(get_read_sessionmaker),
+    primary: async_sessionmaker = Depends(get_sessionmaker)
+):
     """
     Obtiene un producto específico por ID.
     
+    Las lecturas se sirven desde la caché LRU+TTL del proceso cuando es
+    posible; en caso de fallo se consulta la base de datos y se llena la caché.
+    Las peticiones simultáneas por el mismo ID comparten una sola consulta.
+    Los productos escritos hace muy poco (en este u otro worker) se leen del
+    primario, para no llenar la caché con una versión anterior de una réplica.
+    La respuesta lleva ETag y Last-Modified; si el cliente ya tiene la versión
+    actual (If-None-Match / If-Modified-Since) se responde 304 sin cuerpo.
+    
     Args:
         product_id: ID del producto a buscar
-        db: Sesión de base de datos
+        request: Petición (encabezados condicionales)
+        response: Respuesta, para agregar el ETag
+        sessionmaker: Fábrica de sesiones de lectura para la consulta compartida
+        primary: Fábrica de sesiones del primario
     
     Returns:
         Product: El producto encontrado
@@ -63,58 +862,146 @@ async def get_product(product_id: int, db: Session = Depends(get_db)):
     Raises:
         HTTPException: 404 si el producto no existe
     """
-    product = db.query(ProductDB).filter(ProductDB.id == product_id).first()
-    if product is None:
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
-    return product
+    entry = product_cache.get(product_id)
+    if entry is None:
+        if product_cache.recently_written(product_id):
+            sessionmaker = primary
+        # El sello del producto en la clave evita unirse a una carga previa a
+        # una escritura suya; el origen, que una lectura del primario espere a
+        # una réplica
+        entry = await product_loads.do(
+            (product_id, product_cache.stamp(product_id), sessionmaker is primary),
+            lambda: _load_product(sessionmaker, product_id)
+        )
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+    
+    if is_not_modified(request, entry.etag, entry.updated_at):
+        return Response(status_code=304, headers=etag_headers(entry.etag, entry.updated_at))
+    _set_etag(response, entry)
+    return entry.product
 
 
 @router.put("/{product_id}", response_model=Product)
-async def update_product(product_id: int, product: Product, db: Session = Depends(get_db)):
+async def update_product(
+    product_id: ProductIdPath, product: Product, request: Request, response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Actualiza un producto existente.
+    Reemplaza todos los campos de un producto existente.
+    
+    Con `If-Match: "<id>-<version>"` la actualización solo se aplica si el
+    producto no cambió desde que el cliente lo leyó (concurrencia optimista).
     
     Args:
         product_id: ID del producto a actualizar
         product: Nuevos datos del producto
+        request: Petición (encabezado If-Match)
+        response: Respuesta, para agregar el nuevo ETag
         db: Sesión de base de datos
     
     Returns:
         Product: El producto actualizado
     
     Raises:
-        HTTPException: 404 si el producto no existe
+        HTTPException: 404 si el producto no existe, 412 si If-Match no coincide
     """
-    db_product = db.query(ProductDB).filter(ProductDB.id == product_id).first()
-    if db_product is None:
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    return await _update_product(db, product_id, product.model_dump(exclude={"id"}), request, response)
+
+
+@router.patch("/{product_id}", response_model=Product)
+async def patch_product(
+    product_id: ProductIdPath, patch: ProductPatch, request: Request, response: Response,
+    db: AsyncSession = Depends(get_db),
+    sessionmaker: async_sessionmaker = Depends(get_sessionmaker)
+):
+    """
+    Actualiza solo los campos enviados de un producto.
     
-    db_product.nombre = product.nombre
-    db_product.precio = product.precio
-    db_product.descripcion = product.descripcion
-    db_product.stock = product.stock
+    Args:
+        product_id: ID del producto a actualizar
+        patch: Campos a modificar
+        request: Petición (encabezado If-Match)
+        response: Respuesta, para agregar el nuevo ETag
+        db: Sesión de base de datos
+        sessionmaker: Fábrica de sesiones (lectura cuando no se envió ningún campo)
+    
+    Returns:
+        Product: El producto actualizado (o el actual, si no se envió ningún campo)
     
-    db.commit()
-    db.refresh(db_product)
-    return db_product
+    Raises:
+        HTTPException: 404 si el producto no existe, 412 si If-Match no coincide
+    """
+    changes = patch.model_dump(exclude_unset=True)
+    if not changes:
+        return await get_product(product_id, request, response, sessionmaker, sessionmaker)
+    return await _update_product(db, product_id, changes, request, response)
 
 
 @router.delete("/{product_id}", status_code=204)
-async def delete_product(product_id: int, db: Session = Depends(get_db)):
+async def delete_product(product_id: ProductIdPath, request: Request, db: AsyncSession = Depends(get_db)):
     """
-    Elimina un producto.
+    Elimina un producto con un único DELETE ... RETURNING id.
     
     Args:
         product_id: ID del producto a eliminar
+        request: Petición (encabezado If-Match opcional)
         db: Sesión de base de datos
     
     Raises:
-        HTTPException: 404 si el producto no existe
+        HTTPException: 404 si el producto no existe, 412 si If-Match no coincide
     """
-    db_product = db.query(ProductDB).filter(ProductDB.id == product_id).first()
-    if db_product is None:
-        raise HTTPException(status_code=404, detail="Producto no encontrado")
+    versions = if_match_versions(request, product_id)
+    query = delete(ProductDB).where(ProductDB.id == product_id)
+    if versions is not None:
+        query = query.where(ProductDB.version.in_(versions))
+    deleted_id = (await db.scalars(
+        query.returning(ProductDB.id).execution_options(synchronize_session=False)
+    )).first()
+    if deleted_id is None:
+        await _check_precondition(db, product_id, versions)
     
-    db.delete(db_product)
-    db.commit()
+    await record_tombstones(db, [product_id])
+    await publish_product_changes(db, [product_id])
+    await db.commit()
+    product_cache.invalidate(product_id)
     return None
+
+
+@router.post("/{product_id}/stock/adjust", response_model=Product)
+async def adjust_stock(
+    product_id: ProductIdPath, adjustment: StockAdjustment, response: Response,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Ajusta el stock de un producto con un único UPDATE condicional.
+    
+    `UPDATE ... SET stock = stock + :delta WHERE id = :id AND stock + :delta >= 0
+    RETURNING ...`: la reserva es correcta bajo concurrencia y cuesta una sola
+    sentencia.
+    
+    Args:
+        product_id: ID del producto
+        adjustment: Unidades a sumar (positivo) o reservar (negativo)
+        response: Respuesta, para agregar el nuevo ETag
+        db: Sesión de base de datos
+    
+    Returns:
+        Product: El producto con el stock actualizado
+    
+    Raises:
+        HTTPException: 404 si el producto no existe, 409 si el stock no alcanza
+    """
+    db_product = (await db.scalars(_adjust_stock_statement(product_id, adjustment.delta))).first()
+    if db_product is None:
+        await db.rollback()
+        if await db.get(ProductDB, product_id) is None:
+            raise HTTPException(status_code=404, detail="Producto no encontrado")
+        raise HTTPException(status_code=409, detail="Stock insuficiente")
+    
+    entry = _cache_entry(db_product)
+    await publish_product_changes(db, [product_id])
+    await db.commit()
+    product_cache.set(product_id, entry)
+    _set_etag(response, entry)
+    return entry.product
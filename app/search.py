@@ -0,0 +1,156 @@
+"""
+Búsqueda de texto completo sobre nombre y descripcion de productos.
+
+En PostgreSQL usa la columna generada `search_vector` (índice GIN) con
+`websearch_to_tsquery` y `ts_rank_cd`. En otros motores (SQLite en tests) usa
+un índice invertido en memoria, que se reconstruye desde la base de datos
+cuando hubo un commit desde la última construcción.
+"""
+
+import asyncio
+import math
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import SEARCH_TEXT_CONFIG
+from app.models.product import ProductDB
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Pesos equivalentes a setweight 'A' (nombre) y 'B' (descripcion)
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Minúsculas, sin acentos, separado en palabras"""
+    if not text:
+        return []
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    stripped = "".join(c for c in normalized if not unicodedata.combining(c))
+    return TOKEN_RE.findall(stripped)
+
+
+class InvertedIndex:
+    """
+    Índice invertido token -> {id: peso}.
+
+    Todas las palabras de la consulta deben aparecer (como websearch_to_tsquery);
+    el puntaje suma peso * idf de cada término.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._documents = 0
+
+    def add(self, product_id: int, nombre: Optional[str], descripcion: Optional[str]) -> None:
+        for weight, text in ((NAME_WEIGHT, nombre), (DESCRIPTION_WEIGHT, descripcion)):
+            for token in tokenize(text):
+                postings = self._postings.setdefault(token, {})
+                postings[product_id] = postings.get(product_id, 0.0) + weight
+        self._documents += 1
+
+    def search(self, query: str) -> List[Tuple[int, float]]:
+        """IDs que contienen todos los términos, ordenados por puntaje descendente"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        postings = [self._postings.get(term) for term in terms]
+        if any(p is None for p in postings):
+            return []
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates.intersection_update(p)
+
+        idf = [math.log(1 + self._documents / len(p)) for p in postings]
+        scores = [
+            (product_id, sum(p[product_id] * w for p, w in zip(postings, idf)))
+            for product_id in candidates
+        ]
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores
+
+
+class FallbackSearchIndex:
+    """Índice invertido del proceso, invalidado en cada commit"""
+
+    def __init__(self):
+        self.generation = 0
+        self._built_generation = -1
+        self._index = InvertedIndex()
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self.generation += 1
+
+    async def search(self, db: AsyncSession, query: str) -> List[Tuple[int, float]]:
+        if self._built_generation != self.generation:
+            async with self._lock:
+                if self._built_generation != self.generation:
+                    await self._rebuild(db)
+        return self._index.search(query)
+
+    async def _rebuild(self, db: AsyncSession) -> None:
+        # Un commit durante la reconstrucción deja el índice marcado como obsoleto
+        generation = self.generation
+        index = InvertedIndex()
+        result = await db.stream(
+            select(ProductDB.id, ProductDB.nombre, ProductDB.descripcion)
+            .execution_options(yield_per=REBUILD_BATCH_SIZE)
+        )
+        async for product_id, nombre, descripcion in result:
+            index.add(product_id, nombre, descripcion)
+        self._index = index
+        self._built_generation = generation
+
+
+fallback_index = FallbackSearchIndex()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_fallback_index(session):
+    fallback_index.invalidate()
+
+
+async def search_products(
+    db: AsyncSession, query: str, limit: int, offset: int
+) -> Sequence[Tuple[ProductDB, float]]:
+    """
+    Productos que coinciden con `query`, ordenados por relevancia y luego por ID.
+
+    Returns:
+        Hasta `limit` pares (producto, puntaje) a partir de `offset`
+    """
+    connection = await db.connection()
+    if connection.dialect.name == "postgresql":
+        ts_query = func.websearch_to_tsquery(
+            literal_column(f"'{SEARCH_TEXT_CONFIG}'::regconfig"), query
+        )
+        vector = literal_column("products.search_vector")
+        rank = func.ts_rank_cd(vector, ts_query).label("rank")
+        result = await db.execute(
+            select(ProductDB, rank)
+            .where(vector.op("@@")(ts_query))
+            .order_by(rank.desc(), ProductDB.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return [(product, score) for product, score in result.all()]
+
+    matches = (await fallback_index.search(db, query))[offset:offset + limit]
+    if not matches:
+        return []
+    result = await db.scalars(
+        select(ProductDB).where(ProductDB.id.in_([product_id for product_id, _ in matches]))
+    )
+    by_id = {product.id: product for product in result}
+    return [(by_id[product_id], score) for product_id, score in matches if product_id in by_id]
@@ -0,0 +1,47 @@
+"""
+Serialización JSON rápida para las respuestas de productos.
+
+Los listados grandes no construyen objetos ORM ni modelos Pydantic: se
+seleccionan solo las columnas como tuplas y se codifican directamente a bytes
+con orjson. Los datos provienen de la base de datos, cuyas restricciones ya
+garantizan lo que validaría `Product`, así que validarlos otra vez (al crear
+el modelo y de nuevo con `response_model`) solo consume CPU.
+"""
+
+import json
+from typing import Any, Iterable, List, Sequence
+
+from fastapi.responses import JSONResponse
+
+from app.models.product import ProductDB
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson figura en requirements.txt
+    orjson = None
+
+# Mismo orden de campos que el modelo `Product`
+PRODUCT_FIELDS = ("id", "nombre", "precio", "descripcion", "stock")
+PRODUCT_COLUMNS = tuple(getattr(ProductDB, name) for name in PRODUCT_FIELDS)
+
+
+def dumps(content: Any) -> bytes:
+    """JSON compacto en UTF-8; orjson si está instalado, si no la biblioteca estándar"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """Respuesta JSON serializada con `dumps`"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def product_dicts(rows: Iterable[Sequence]) -> List[dict]:
+    """
+    Convierte filas que empiezan con PRODUCT_COLUMNS en diccionarios con la
+    forma de `Product` (las columnas adicionales al final se ignoran).
+    """
+    return [dict(zip(PRODUCT_FIELDS, row)) for row in rows]
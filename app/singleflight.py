@@ -0,0 +1,63 @@
+"""
+Coalescencia de peticiones concurrentes (single-flight).
+
+Cuando muchas peticiones piden lo mismo a la vez (un producto popular justo
+después de un deploy o de que expire su entrada en caché), solo la primera
+consulta la base de datos; las demás esperan esa misma consulta y reciben su
+resultado (o su excepción).
+
+La carga corre como una tarea independiente: si la petición que la inició se
+cancela (cliente desconectado), las que la esperan no se ven afectadas. Por
+eso la función cargada debe abrir su propia sesión en lugar de usar la de la
+petición.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Agrupa por clave las cargas en curso.
+
+    La clave debe identificar también la versión de los datos (p. ej. la
+    generación de la caché): una petición que llega después de una escritura
+    no debe recibir el resultado de una carga iniciada antes.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """Ejecuta `load()` o se une a la ejecución en curso para `key`"""
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.ensure_future(load())
+            self._flights[key] = task
+            task.add_done_callback(lambda t, key=key: self._done(key, t))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Evita el aviso "exception was never retrieved" si nadie esperaba ya
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores para inspección/monitoreo"""
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+    def __len__(self) -> int:
+        return len(self._flights)
@@ -0,0 +1,189 @@
+"""
+Codificación y lectura de productos en NDJSON y CSV en streaming.
+
+La exportación trabaja sobre tuplas de columnas (sin construir objetos ORM)
+y produce un bloque de texto por lote; la importación consume el cuerpo de la
+petición de a trozos y entrega un registro a la vez. En ambos casos la memoria
+del worker no depende del tamaño del catálogo.
+"""
+
+import codecs
+import csv
+import io
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.serialization import dumps
+
+# Columnas exportadas, en orden
+EXPORT_COLUMNS = ("id", "nombre", "precio", "descripcion", "stock")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def encode_ndjson(rows: Iterable[Sequence]) -> bytes:
+    """Una línea JSON por fila, en UTF-8"""
+    return b"".join(dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+
+
+def encode_csv(rows: Iterable[Sequence], header: bool = False) -> str:
+    """Filas CSV (con encabezado opcional); None se escribe como campo vacío"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+# (número de línea, datos del registro o None, mensaje de error o None)
+ImportRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+class LineTooLongError(ValueError):
+    """Una línea de la carga supera el máximo permitido"""
+
+
+def _utf8_len(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Divide un flujo de bytes UTF-8 en líneas numeradas (desde 1).
+    
+    Raises:
+        LineTooLongError: si una línea supera `max_line_bytes`
+        UnicodeDecodeError: si la carga no es UTF-8 válido
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        if "\n" in buffer:
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                line_no += 1
+                if _utf8_len(line) > max_line_bytes:
+                    raise LineTooLongError(f"Línea {line_no} demasiado larga")
+                yield line_no, line.rstrip("\r")
+        if _utf8_len(buffer) > max_line_bytes:
+            raise LineTooLongError(f"Línea {line_no + 1} demasiado larga")
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield line_no + 1, buffer.rstrip("\r")
+
+
+async def iter_ndjson_records(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[ImportRecord]:
+    """Un objeto JSON por línea; las líneas vacías se ignoran"""
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"JSON inválido: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield line_no, None, "Se esperaba un objeto JSON"
+            continue
+        yield line_no, data, None
+
+
+def _ends_quoted(line: str, in_quotes: bool) -> bool:
+    """
+    Si la línea termina dentro de un campo entre comillas, con las reglas del
+    dialecto por defecto de `csv`: una comilla abre un campo solo al inicio
+    del campo ('Monitor 27"' es un valor literal) y "" dentro de comillas es
+    una comilla escapada.
+    """
+    at_field_start = not in_quotes
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if in_quotes:
+            if char == '"':
+                if line[i + 1:i + 2] == '"':
+                    i += 1
+                else:
+                    in_quotes = False
+        elif char == '"' and at_field_start:
+            in_quotes = True
+        at_field_start = char == ","
+        i += 1
+    return in_quotes
+
+
+async def iter_csv_records(lines: AsyncIterator[Tuple[int, str]], max_record_bytes: int) -> AsyncIterator[ImportRecord]:
+    """
+    CSV con encabezado en la primera línea. Un campo entre comillas puede
+    contener saltos de línea; el registro se reporta con su línea inicial.
+    Los campos vacíos se interpretan como None.
+    
+    Un registro con comillas abiertas que supera `max_record_bytes` o llega
+    al final del archivo se rechaza en su línea inicial y la lectura se
+    retoma en la línea siguiente: una comilla sin cerrar no arrastra el resto
+    de la carga a memoria ni invalida los registros que le siguen.
+    """
+    header: Optional[List[str]] = None
+    replay: deque = deque()  # líneas a releer tras rechazar un registro
+    pending: List[Tuple[int, str]] = []
+    pending_bytes = 0
+    in_quotes = False
+    source = lines.__aiter__()
+    exhausted = False
+    
+    while True:
+        if replay:
+            line_no, line = replay.popleft()
+        elif not exhausted:
+            try:
+                line_no, line = await source.__anext__()
+            except StopAsyncIteration:
+                exhausted = True
+                continue
+        elif pending:
+            yield pending[0][0], None, "Comillas sin cerrar"
+            replay.extend(pending[1:])
+            pending, pending_bytes, in_quotes = [], 0, False
+            continue
+        else:
+            break
+        
+        pending.append((line_no, line))
+        pending_bytes += _utf8_len(line) + 1
+        in_quotes = _ends_quoted(line, in_quotes)
+        if in_quotes:
+            if pending_bytes > max_record_bytes:
+                yield pending[0][0], None, f"Registro de más de {max_record_bytes} bytes (¿comillas sin cerrar?)"
+                replay.extendleft(reversed(pending[1:]))
+                pending, pending_bytes, in_quotes = [], 0, False
+            continue  # el registro sigue en la próxima línea
+        
+        start = pending[0][0]
+        text = "\n".join(line for _, line in pending)
+        pending, pending_bytes = [], 0
+        if not text.strip():
+            continue
+        
+        fields = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in fields]
+            continue
+        if len(fields) != len(header):
+            yield start, None, f"Se esperaban {len(header)} columnas, hay {len(fields)}"
+            continue
+        yield start, {k: (v if v != "" else None) for k, v in zip(header, fields)}, None
+
+
+def iter_import_records(chunks: AsyncIterator[bytes], format: str, max_line_bytes: int) -> AsyncIterator[ImportRecord]:
+    """Registros de una carga NDJSON o CSV, leídos incrementalmente"""
+    lines = iter_lines(chunks, max_line_bytes)
+    if format == "csv":
+        return iter_csv_records(lines, max_line_bytes)
+    return iter_ndjson_records(lines)
@@ -0,0 +1,65 @@
+"""
+Micro-benchmarks del modelo `Product`: validación y serialización.
+
+Mide, por producto, el costo de:
+- validate_dict: `Product.model_validate` de un dict (cuerpo de un POST)
+- validate_json: `Product.model_validate_json` de bytes JSON
+- validate_orm: `Product.model_validate` de un objeto ORM (from_attributes)
+- patch_validate: `ProductPatch.model_validate` de una actualización parcial
+- dump_python / dump_json: `model_dump` y `model_dump_json` de un Product
+- product_dicts: tuplas de columnas a dicts + `dumps` (camino del listado)
+
+Uso:
+    python benchmarks/bench_models.py --number 20000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from app.models.product import Product, ProductDB, ProductPatch  # noqa: E402
+from app.serialization import dumps, orjson, product_dicts  # noqa: E402
+from benchmarks.seed import generate_products  # noqa: E402
+
+
+def cases(seed: int) -> Dict[str, Callable[[], object]]:
+    data = next(generate_products(1, seed))
+    data["descripcion"] = data["descripcion"] or "Descripción de prueba"
+    body = json.dumps(data).encode()
+    orm = ProductDB(id=1, **data)
+    product = Product(id=1, **data)
+    row = [(1, data["nombre"], data["precio"], data["descripcion"], data["stock"])]
+    patch = {"precio": 10.5, "stock": 3}
+    return {
+        "validate_dict": lambda: Product.model_validate(data),
+        "validate_json": lambda: Product.model_validate_json(body),
+        "validate_orm": lambda: Product.model_validate(orm),
+        "patch_validate": lambda: ProductPatch.model_validate(patch),
+        "dump_python": lambda: product.model_dump(),
+        "dump_json": lambda: product.model_dump_json(),
+        "product_dicts": lambda: dumps(product_dicts(row)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="Llamadas por medición")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"mejor de {args.repeat} x {args.number} llamadas (orjson: {'sí' if orjson else 'no'})")
+    for name, fn in cases(args.seed).items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        print(f"  {name:<15} {best / args.number * 1e6:8.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
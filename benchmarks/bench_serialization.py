@@ -0,0 +1,104 @@
+"""
+Benchmark: costo de serializar un listado de productos.
+
+Compara, sobre una base SQLite en memoria con N productos:
+- orm_pydantic: camino anterior de `list_products`. Carga objetos ORM, los
+  valida con `Product.model_validate`, FastAPI los valida otra vez con el
+  response_model y los codifica con jsonable_encoder + json.
+- orm_dump_json: objetos ORM + validación + `TypeAdapter.dump_json` (el camino
+  rápido de FastAPI recientes cuando hay response_model).
+- rows_fast: camino actual. Tuplas de columnas + product_dicts + orjson.
+
+Uso:
+    python benchmarks/bench_serialization.py --rows 10000 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TESTING", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app.models.product import Product, ProductDB  # noqa: E402
+from app.serialization import PRODUCT_COLUMNS, dumps, orjson, product_dicts  # noqa: E402
+
+PRODUCT_LIST = TypeAdapter(List[Product])
+
+
+def seed(session: Session, rows: int) -> None:
+    session.execute(insert(ProductDB), [
+        {
+            "nombre": f"Producto {i}",
+            "precio": round(1 + i * 0.37, 2),
+            "descripcion": None if i % 3 == 0 else f"Descripción del producto número {i}",
+            "stock": i % 50,
+        }
+        for i in range(rows)
+    ])
+    session.commit()
+
+
+def orm_pydantic(session: Session) -> bytes:
+    products = [Product.model_validate(p) for p in session.scalars(select(ProductDB).order_by(ProductDB.id))]
+    validated = PRODUCT_LIST.validate_python(products, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def orm_dump_json(session: Session) -> bytes:
+    products = [Product.model_validate(p) for p in session.scalars(select(ProductDB).order_by(ProductDB.id))]
+    return PRODUCT_LIST.dump_json(PRODUCT_LIST.validate_python(products, from_attributes=True))
+
+
+def rows_fast(session: Session) -> bytes:
+    rows = session.execute(select(*PRODUCT_COLUMNS).order_by(ProductDB.id)).all()
+    return dumps(product_dicts(rows))
+
+
+def measure(session: Session, fn: Callable[[Session], bytes], repeat: int) -> float:
+    """Mejor tiempo (segundos) de `repeat` ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        session.expunge_all()
+        start = time.perf_counter()
+        fn(session)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.rows)
+        # Las tres variantes deben producir el mismo JSON
+        expected = json.loads(orm_pydantic(session))
+        assert json.loads(rows_fast(session)) == expected
+        assert json.loads(orm_dump_json(session)) == expected
+
+        print(f"{args.rows} productos, mejor de {args.repeat} (orjson: {'sí' if orjson else 'no'})")
+        baseline = None
+        for fn in (orm_pydantic, orm_dump_json, rows_fast):
+            seconds = measure(session, fn, args.repeat)
+            baseline = baseline or seconds
+            per_10k = seconds * 10000 / args.rows * 1000
+            print(f"  {fn.__name__:<14} {per_10k:8.1f} ms / 10k   x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Prueba de carga de la API de productos.
+
+Ejecuta una mezcla de operaciones (listar, obtener, crear, actualizar,
+eliminar) con `--concurrency` clientes simultáneos durante `--duration`
+segundos y reporta RPS y latencias p50/p95/p99 por operación.
+
+El objetivo puede ser:
+- un servidor en marcha (`--url http://localhost:8000`), o
+- la aplicación en el mismo proceso (`--database-url`, sin --url), útil para
+  comparar cambios de código sin red ni gunicorn de por medio.
+
+La base debe estar cargada con benchmarks/seed.py (IDs 1..--rows). Solo se
+eliminan productos creados durante la propia prueba, así que el catálogo
+inicial no cambia de tamaño entre ejecuciones.
+
+Uso:
+    python benchmarks/seed.py --rows 100000 --database-url sqlite:///./bench.db --reset
+    python benchmarks/load.py --rows 100000 --database-url sqlite:///./bench.db \\
+        --scenario mixed --concurrency 32 --duration 30 --output results.json
+    python benchmarks/load.py --url http://localhost:8000 --rows 100000 \\
+        --scenario read --baseline results.json
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from benchmarks.stats import compare, load, save, summarize  # noqa: E402
+
+# Peso de cada operación en cada escenario
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "read": {"get": 80, "list": 20},
+    "get": {"get": 100},
+    "list": {"list": 100},
+    "mixed": {"get": 60, "list": 15, "create": 10, "update": 10, "delete": 5},
+    "write": {"create": 40, "update": 40, "delete": 20},
+}
+
+PAGE_LIMIT = 100
+
+
+class LoadState:
+    """Estado compartido por los clientes: IDs existentes y creados en la prueba"""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.created: List[int] = []
+
+
+def build_request(op: str, state: LoadState, rng: random.Random) -> Tuple[str, str, Optional[dict]]:
+    """Método, URL y cuerpo de una operación"""
+    from app.pagination import encode_cursor
+
+    if op == "get":
+        return "GET", f"/productos/{rng.randint(1, state.rows)}", None
+    if op == "list":
+        after = rng.randint(0, max(0, state.rows - PAGE_LIMIT))
+        cursor = f"&cursor={encode_cursor(after)}" if after else ""
+        return "GET", f"/productos/?limit={PAGE_LIMIT}{cursor}", None
+    if op == "create":
+        return "POST", "/productos/", {
+            "nombre": f"Carga {rng.randrange(10**9)}",
+            "precio": round(rng.uniform(1, 2000), 2),
+            "stock": rng.randint(0, 200),
+        }
+    if op == "update":
+        return "PATCH", f"/productos/{rng.randint(1, state.rows)}", {"precio": round(rng.uniform(1, 2000), 2)}
+    if op == "delete":
+        if state.created:
+            return "DELETE", f"/productos/{state.created.pop(rng.randrange(len(state.created)))}", None
+        return build_request("create", state, rng)
+    raise ValueError(f"Operación desconocida: {op}")
+
+
+class Recorder:
+    """Latencias y códigos de estado por operación, ignorando el calentamiento"""
+
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, op: str, started: float, latency: float, status: int) -> None:
+        if started < self.measure_from:
+            return
+        self.latencies[op].append(latency)
+        self.statuses[op][status] += 1
+        if status == 0 or status >= 500:
+            self.errors[op] += 1
+
+    def results(self, elapsed: float) -> Dict[str, Any]:
+        operations = {
+            op: summarize(self.latencies[op], self.errors[op], elapsed, self.statuses[op])
+            for op in sorted(self.latencies)
+        }
+        every = [latency for latencies in self.latencies.values() for latency in latencies]
+        statuses: Dict[int, int] = defaultdict(int)
+        for per_op in self.statuses.values():
+            for code, count in per_op.items():
+                statuses[code] += count
+        return {
+            "overall": summarize(every, sum(self.errors.values()), elapsed, statuses),
+            "operations": operations,
+        }
+
+
+async def client_loop(
+    client: httpx.AsyncClient, weights: Dict[str, int], state: LoadState,
+    recorder: Recorder, deadline: float, rng: random.Random
+) -> None:
+    ops, op_weights = list(weights), list(weights.values())
+    while True:
+        started = time.perf_counter()
+        if started >= deadline:
+            return
+        op = rng.choices(ops, op_weights)[0]
+        method, url, body = build_request(op, state, rng)
+        try:
+            response = await client.request(method, url, json=body)
+            status = response.status_code
+            if op == "create" and status == 201:
+                state.created.append(response.json()["id"])
+        except httpx.HTTPError:
+            status = 0
+        recorder.record(op, started, time.perf_counter() - started, status)
+
+
+@asynccontextmanager
+async def open_client(url: Optional[str], database_url: str, concurrency: int):
+    """Cliente HTTP hacia `url`, o hacia la aplicación en este proceso"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            yield client
+        return
+
+    # La configuración se lee al importar la aplicación
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("TESTING", "1")
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", limits=limits, timeout=60) as client:
+            yield client
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    weights = SCENARIOS[args.scenario]
+    state = LoadState(args.rows)
+    async with open_client(args.url, args.database_url, args.concurrency) as client:
+        start = time.perf_counter()
+        recorder = Recorder(start + args.warmup)
+        deadline = start + args.warmup + args.duration
+        await asyncio.gather(*[
+            client_loop(client, weights, state, recorder, deadline, random.Random(args.seed + i))
+            for i in range(args.concurrency)
+        ])
+        elapsed = time.perf_counter() - recorder.measure_from
+    results = recorder.results(elapsed)
+    results["meta"] = {
+        "scenario": args.scenario,
+        "weights": weights,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "warmup_seconds": args.warmup,
+        "rows": args.rows,
+        "target": args.url or args.database_url,
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    meta = results["meta"]
+    print(f"Escenario {meta['scenario']}, {meta['concurrency']} clientes, {meta['duration_seconds']}s, {meta['rows']} productos")
+    print(f"  {'operación':<10} {'n':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for name, summary in [("total", results["overall"])] + list(results["operations"].items()):
+        print(
+            f"  {name:<10} {summary['count']:>8} {summary['rps']:>9.1f} {summary['p50_ms']:>9.2f} "
+            f"{summary['p95_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['errors']:>8}"
+        )
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print("Comparación con la línea base:")
+    for row in rows:
+        mark = "  REGRESIÓN" if row["regressed"] else ""
+        print(
+            f"  {row['operation']:<10} p95 {row['baseline_p95_ms']:.2f} -> {row['p95_ms']:.2f} ms "
+            f"({row['p95_change']:+.1%})   rps {row['baseline_rps']:.1f} -> {row['rps']:.1f} "
+            f"({row['rps_change']:+.1%}){mark}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="Segundos medidos")
+    parser.add_argument("--warmup", type=float, default=3, help="Segundos iniciales descartados")
+    parser.add_argument("--rows", type=int, default=10000, help="Productos cargados con seed.py")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="Servidor en marcha; sin --url se usa la app en el proceso")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db", help="Base para la app en el proceso")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados JSON anteriores con los que comparar")
+    parser.add_argument("--max-regression", type=float, default=0.1,
+                        help="Empeoramiento tolerado de p95/rps frente a la línea base (0.1 = 10%%)")
+    args = parser.parse_args()
+    # Una línea de log por petición distorsiona la medición
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    results = asyncio.run(run_load(args))
+    print_results(results)
+    if args.output:
+        save(results, args.output)
+    if args.baseline:
+        rows = compare(results, load(args.baseline), args.max_regression)
+        print_comparison(rows)
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
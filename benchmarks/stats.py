@@ -0,0 +1,99 @@
+"""
+Resumen de latencias y comparación de resultados de benchmarks.
+
+Los resultados se guardan como JSON con la forma:
+
+    {"meta": {...}, "overall": {...}, "operations": {"get": {...}, ...}}
+
+donde cada resumen tiene count, errors, rps y latencias en milisegundos
+(mean, p50, p95, p99, max).
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Percentil `q` (0-100) con interpolación lineal sobre valores ya ordenados"""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, statuses: Optional[Dict[int, int]] = None) -> Dict[str, Any]:
+    """
+    Resumen de una operación.
+
+    Args:
+        latencies: Duración de cada petición en segundos
+        errors: Peticiones fallidas (5xx o error de conexión)
+        elapsed: Duración de la medición en segundos
+        statuses: Cantidad de respuestas por código HTTP
+    """
+    ordered = sorted(latencies)
+    to_ms = 1000
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * to_ms, 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * to_ms, 2),
+        "p95_ms": round(percentile(ordered, 95) * to_ms, 2),
+        "p99_ms": round(percentile(ordered, 99) * to_ms, 2),
+        "max_ms": round(ordered[-1] * to_ms, 2) if ordered else 0.0,
+        "statuses": {str(code): count for code, count in sorted((statuses or {}).items())},
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[Dict[str, Any]]:
+    """
+    Compara `current` contra `baseline` por operación.
+
+    Una operación empeora si su p95 sube o su rps baja más que `max_regression`
+    (fracción, p. ej. 0.1 = 10%).
+
+    Returns:
+        Una fila por operación presente en ambos resultados, con los cambios
+        relativos y `regressed`
+    """
+    rows = []
+    sections = {"overall": (current.get("overall"), baseline.get("overall"))}
+    for name, summary in current.get("operations", {}).items():
+        sections[name] = (summary, baseline.get("operations", {}).get(name))
+    for name, (now, before) in sections.items():
+        if not now or not before:
+            continue
+        p95_change = _relative(now["p95_ms"], before["p95_ms"])
+        rps_change = _relative(now["rps"], before["rps"])
+        rows.append({
+            "operation": name,
+            "p95_ms": now["p95_ms"],
+            "baseline_p95_ms": before["p95_ms"],
+            "p95_change": p95_change,
+            "rps": now["rps"],
+            "baseline_rps": before["rps"],
+            "rps_change": rps_change,
+            "regressed": p95_change > max_regression or rps_change < -max_regression,
+        })
+    return rows
+
+
+def _relative(now: float, before: float) -> float:
+    if before == 0:
+        return 0.0 if now == 0 else float("inf")
+    return round((now - before) / before, 4)
+
+
+def save(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
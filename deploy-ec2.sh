@@ -60,6 +60,10 @@ if [ $? -ne 0 ]; then
     exit 1
 fi
 
+# 6b. Aplicar migraciones de esquema
+echo "🗄️  Aplicando migraciones..."
+alembic upgrade head || { echo "❌ Error en las migraciones"; exit 1; }
+
 # 7. Copiar servicio systemd
 echo "🔧 Configurando servicio systemd..."
 sudo cp fastapi.service /etc/systemd/system/
@@ -1,6 +1,30 @@
 # Configuración simple de Gunicorn
 
+import os
+import shutil
+
+from app.config import WORKERS
+
 bind = "0.0.0.0:8000"
-workers = 4
+# Mismo valor con el que app/config.py reparte DB_MAX_CONNECTIONS entre workers
+workers = WORKERS
 worker_class = "uvicorn.workers.UvicornWorker"
 timeout = 120
+
+# Métricas Prometheus en modo multiproceso: cada worker escribe sus valores en
+# este directorio y /metrics los agrega. Debe definirse antes de crear los
+# workers, por eso se hace aquí y no en la aplicación.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/productos-api-metrics")
+
+
+def on_starting(server):
+    """Descarta los archivos de métricas de una ejecución anterior"""
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Los gauges de un worker terminado dejan de sumarse"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,80 @@
+"""
+Entorno de Alembic: aplica las migraciones sobre MIGRATION_DATABASE_URL.
+
+En PostgreSQL:
+- Un advisory lock serializa las migraciones: si varias instancias del Auto
+  Scaling Group arrancan a la vez, una aplica los cambios y las demás esperan
+  y luego no encuentran nada pendiente.
+- `lock_timeout` (MIGRATION_LOCK_TIMEOUT) acota la espera por locks de tabla.
+  Un ALTER TABLE encolado detrás de una transacción larga bloquea a su vez
+  todas las consultas que llegan después; es preferible abortar y reintentar
+  (las migraciones son idempotentes).
+- Sin `statement_timeout`: la construcción de índices sobre `products` puede
+  durar más que cualquier consulta de la API.
+
+Cada revisión corre en su propia transacción; lo que debe ejecutarse fuera
+de ella (CREATE INDEX CONCURRENTLY, backfills por lotes) usa los helpers de
+migrations/helpers.py.
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+import app.models.product  # noqa: F401  (registra las tablas en Base.metadata)
+from app.config import DB_CONNECT_TIMEOUT, MIGRATION_DATABASE_URL, MIGRATION_LOCK_TIMEOUT
+from app.database import Base
+
+# Clave del advisory lock de las migraciones (constante arbitraria)
+MIGRATION_LOCK_KEY = 725839011
+
+# Objetos creados por las migraciones que el ORM no mapea: autogenerate no
+# debe proponer borrarlos
+UNMAPPED_OBJECTS = {
+    ("column", "search_vector"),
+    ("index", "ix_products_search_vector"),
+    ("table", "rate_limit_buckets"),
+}
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    return not (reflected and compare_to is None and (type_, name) in UNMAPPED_OBJECTS)
+
+
+def run_migrations_online() -> None:
+    url = config.get_main_option("sqlalchemy.url") or MIGRATION_DATABASE_URL
+    connect_args = {"connect_timeout": DB_CONNECT_TIMEOUT} if url.startswith("postgresql") else {}
+    engine = create_engine(url, poolclass=NullPool, connect_args=connect_args)
+
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Se toma antes de fijar lock_timeout: esperar a otra instancia
+            # que está migrando es lo esperado. Se libera al cerrar la conexión.
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.execute(text("SELECT set_config('lock_timeout', :value, false)"), {"value": MIGRATION_LOCK_TIMEOUT})
+            connection.execute(text("SELECT set_config('statement_timeout', '0', false)"))
+            connection.commit()
+
+        context.configure(
+            connection=connection,
+            target_metadata=Base.metadata,
+            include_object=include_object,
+            transaction_per_migration=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    # Las migraciones consultan el esquema actual para ser idempotentes
+    raise SystemExit("Las migraciones requieren conexión a la base; el modo --sql no está soportado")
+
+run_migrations_online()
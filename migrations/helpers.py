@@ -0,0 +1,165 @@
+"""
+Operaciones de esquema que no bloquean el tráfico sobre tablas grandes.
+
+Todas son idempotentes (consultan el esquema antes de actuar) para que una
+migración abortada por lock_timeout pueda reintentarse, y funcionan también
+sobre SQLite (desarrollo y tests), donde no hay tráfico concurrente que
+proteger y se usan las operaciones simples de Alembic.
+"""
+
+import time
+from typing import List, Optional
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.config import MIGRATION_BATCH_PAUSE_SECONDS, MIGRATION_BATCH_SIZE
+
+
+def is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def has_table(table: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    return any(c["name"] == column for c in sa.inspect(op.get_bind()).get_columns(table))
+
+
+def is_nullable(table: str, column: str) -> bool:
+    return next(c["nullable"] for c in sa.inspect(op.get_bind()).get_columns(table) if c["name"] == column)
+
+
+def _pg_index_valid(name: str) -> Optional[bool]:
+    """True/False si el índice existe y es válido o no; None si no existe"""
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+        ),
+        {"name": name},
+    ).scalar()
+
+
+def create_index_concurrently(name: str, table: str, columns: List[str], **kw) -> None:
+    """
+    Crea un índice sin bloquear escrituras (CREATE INDEX CONCURRENTLY).
+
+    Se ejecuta fuera de la transacción de la migración, como exige
+    PostgreSQL. Si una ejecución anterior se interrumpió, el índice quedó
+    marcado como inválido (no se usa pero sí se mantiene en cada escritura):
+    se elimina y se vuelve a construir.
+
+    Args:
+        name: Nombre del índice
+        table: Tabla
+        columns: Columnas o expresiones
+        **kw: Opciones de `op.create_index` (postgresql_using, postgresql_where...)
+    """
+    if not is_postgresql():
+        if not any(i["name"] == name for i in sa.inspect(op.get_bind()).get_indexes(table)):
+            op.create_index(name, table, columns, **kw)
+        return
+    with op.get_context().autocommit_block():
+        valid = _pg_index_valid(name)
+        if valid:
+            return
+        if valid is False:
+            op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        op.create_index(name, table, columns, postgresql_concurrently=True, **kw)
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    """Elimina un índice sin bloquear lecturas ni escrituras de la tabla"""
+    if not is_postgresql():
+        op.drop_index(name, table_name=table, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def add_column(table: str, column: sa.Column) -> None:
+    """
+    Agrega una columna si no existe.
+
+    En PostgreSQL 11+ una columna nula, o con DEFAULT constante o estable
+    (como now()), solo modifica el catálogo: el lock exclusivo dura
+    milisegundos y lock_timeout evita quedar encolado detrás de otra
+    transacción. Una columna NOT NULL sin DEFAULT debe agregarse nula,
+    completarse con `backfill` y cerrarse con `set_not_null`.
+
+    SQLite no admite ADD COLUMN con DEFAULT no constante: ahí se recrea la
+    tabla.
+    """
+    if has_column(table, column.name):
+        return
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table(table, recreate="always") as batch:
+            batch.add_column(column)
+    else:
+        op.add_column(table, column)
+
+
+def backfill(table: str, assignments: str, where: str, key: str = "id") -> int:
+    """
+    UPDATE por rangos de `key`, cada lote en su propia transacción.
+
+    Un UPDATE único sobre toda la tabla mantiene el lock de cada fila hasta
+    terminar (bloqueando los PATCH concurrentes sobre cualquier producto) y
+    genera el WAL de golpe, atrasando a las réplicas de lectura. Por lotes de
+    MIGRATION_BATCH_SIZE filas, con una pausa entre lotes, cada fila queda
+    bloqueada solo durante su lote. Si se interrumpe, `where` hace que la
+    siguiente ejecución continúe donde quedó.
+
+    Args:
+        table: Tabla a actualizar
+        assignments: Cláusula SET, p. ej. "stock = 0"
+        where: Filas pendientes, p. ej. "stock IS NULL"
+        key: Columna entera indexada por la que se recorre la tabla
+
+    Returns:
+        Filas actualizadas
+    """
+    bind = op.get_bind()
+    updated = 0
+    with op.get_context().autocommit_block():
+        low, high = bind.execute(sa.text(f"SELECT min({key}), max({key}) FROM {table} WHERE {where}")).one()
+        if low is None:
+            return 0
+        update = sa.text(
+            f"UPDATE {table} SET {assignments} "
+            f"WHERE {key} >= :start AND {key} < :end AND ({where})"
+        )
+        for start in range(low, high + 1, MIGRATION_BATCH_SIZE):
+            updated += bind.execute(update, {"start": start, "end": start + MIGRATION_BATCH_SIZE}).rowcount
+            if MIGRATION_BATCH_PAUSE_SECONDS > 0:
+                time.sleep(MIGRATION_BATCH_PAUSE_SECONDS)
+    return updated
+
+
+def set_not_null(table: str, column: str) -> None:
+    """
+    Marca una columna NOT NULL sin recorrer la tabla bajo lock exclusivo.
+
+    `ALTER COLUMN SET NOT NULL` verifica todas las filas con un lock
+    ACCESS EXCLUSIVE. En PostgreSQL 12+ omite esa verificación si un CHECK
+    validado ya lo garantiza: el CHECK se agrega NOT VALID (instantáneo), se
+    valida con un lock que no bloquea lecturas ni escrituras y se elimina al
+    final. Cada paso va en su propia transacción para no retener el lock
+    exclusivo del primero durante la validación.
+    """
+    if not is_nullable(table, column):
+        return
+    if not is_postgresql():
+        with op.batch_alter_table(table, recreate="always") as batch:
+            batch.alter_column(column, nullable=False)
+        return
+    constraint = f"{table}_{column}_not_null"
+    with op.get_context().autocommit_block():
+        op.execute(sa.text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"))
+        op.execute(sa.text(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID"))
+        op.execute(sa.text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}"))
+        op.execute(sa.text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+        op.execute(sa.text(f"ALTER TABLE {table} DROP CONSTRAINT {constraint}"))
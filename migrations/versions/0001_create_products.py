@@ -0,0 +1,38 @@
+"""Tabla de productos
+
+Esquema inicial (id, nombre, precio, descripcion). En bases creadas antes de
+usar migraciones la tabla ya existe y no se modifica.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if has_table("products"):
+        return
+    op.create_table(
+        "products",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("nombre", sa.String, nullable=False),
+        sa.Column("precio", sa.Float, nullable=False),
+        sa.Column("descripcion", sa.String, nullable=True),
+    )
+    op.create_index("ix_products_id", "products", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("products")
@@ -0,0 +1,31 @@
+"""Columna stock
+
+Reemplaza el ALTER TABLE + UPDATE de la tabla completa de
+migrate_database.sql: con DEFAULT constante, PostgreSQL 11+ agrega la
+columna sin reescribir la tabla y las filas existentes ya leen 0.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column
+
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column("products", sa.Column("stock", sa.Integer, nullable=False, server_default=sa.text("0")))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("stock")
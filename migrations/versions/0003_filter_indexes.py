@@ -0,0 +1,44 @@
+"""Índices para los filtros del listado
+
+Rango de precio, búsqueda por prefijo y subcadena en nombre (trigramas, solo
+PostgreSQL) y productos con stock. Se construyen con CONCURRENTLY.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently, is_postgresql
+
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    create_index_concurrently("ix_products_precio", "products", ["precio"])
+    create_index_concurrently(
+        "ix_products_nombre_prefix", "products", ["nombre"],
+        postgresql_ops={"nombre": "text_pattern_ops"}
+    )
+    if is_postgresql():
+        op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        create_index_concurrently(
+            "ix_products_nombre_trgm", "products", ["nombre"],
+            postgresql_using="gin", postgresql_ops={"nombre": "gin_trgm_ops"}
+        )
+    create_index_concurrently(
+        "ix_products_in_stock", "products", ["id"],
+        postgresql_where=sa.text("stock > 0"), sqlite_where=sa.text("stock > 0")
+    )
+
+
+def downgrade() -> None:
+    for name in ("ix_products_in_stock", "ix_products_nombre_trgm", "ix_products_nombre_prefix", "ix_products_precio"):
+        drop_index_concurrently(name, "products")
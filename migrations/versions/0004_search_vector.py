@@ -0,0 +1,82 @@
+"""Búsqueda de texto completo
+
+Columna tsvector (nombre peso A, descripcion peso B) con índice GIN.
+
+migrate_database.sql la agregaba como columna GENERATED ... STORED, lo que
+reescribe la tabla completa bajo un lock exclusivo. Aquí se agrega nula
+(solo catálogo), un trigger la mantiene en altas y modificaciones, las filas
+existentes se completan por lotes y el índice se construye con
+CONCURRENTLY. Las bases que ya tienen la columna generada la conservan.
+
+Solo PostgreSQL.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from app.config import SEARCH_TEXT_CONFIG
+from migrations.helpers import (
+    add_column,
+    backfill,
+    create_index_concurrently,
+    drop_index_concurrently,
+    is_postgresql,
+)
+
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def search_vector_sql(row: str = "") -> str:
+    return (
+        f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}'::regconfig, coalesce({row}nombre, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}'::regconfig, coalesce({row}descripcion, '')), 'B')"
+    )
+
+
+def _is_generated() -> bool:
+    return bool(op.get_bind().execute(sa.text(
+        "SELECT is_generated = 'ALWAYS' FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = 'products' AND column_name = 'search_vector'"
+    )).scalar())
+
+
+def upgrade() -> None:
+    if not is_postgresql():
+        return
+    add_column("products", sa.Column("search_vector", TSVECTOR, nullable=True))
+    if not _is_generated():
+        op.execute(sa.text(f"""
+            CREATE OR REPLACE FUNCTION products_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {search_vector_sql("NEW.")};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """))
+        op.execute(sa.text("DROP TRIGGER IF EXISTS products_search_vector ON products"))
+        op.execute(sa.text(
+            "CREATE TRIGGER products_search_vector "
+            "BEFORE INSERT OR UPDATE OF nombre, descripcion ON products "
+            "FOR EACH ROW EXECUTE FUNCTION products_search_vector_update()"
+        ))
+        backfill("products", f"search_vector = {search_vector_sql()}", "search_vector IS NULL")
+    create_index_concurrently("ix_products_search_vector", "products", ["search_vector"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    if not is_postgresql():
+        return
+    drop_index_concurrently("ix_products_search_vector", "products")
+    op.execute(sa.text("DROP TRIGGER IF EXISTS products_search_vector ON products"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS products_search_vector_update()"))
+    op.execute(sa.text("ALTER TABLE products DROP COLUMN IF EXISTS search_vector"))
@@ -0,0 +1,36 @@
+"""Versión y fecha de modificación para ETags
+
+`version` se incrementa en cada UPDATE y forma el ETag "<id>-<version>";
+`updated_at` alimenta Last-Modified. Con DEFAULT constante (1) o estable
+(now()) PostgreSQL 11+ las agrega sin reescribir la tabla.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import add_column
+
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column("products", sa.Column("version", sa.Integer, nullable=False, server_default=sa.text("1")))
+    add_column(
+        "products",
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now())
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("updated_at")
+        batch.drop_column("version")
@@ -0,0 +1,69 @@
+"""Secuencia de cambios y tombstones (GET /productos/changes)
+
+Cada alta o modificación toma el siguiente valor de product_change_seq y cada
+baja deja un tombstone con su propio valor.
+
+migrate_database.sql numeraba las filas existentes con un único UPDATE de la
+tabla completa. Aquí la columna se agrega nula con DEFAULT (las filas nuevas
+ya reciben su valor), las existentes se numeran por lotes en orden de ID, el
+NOT NULL se impone a través de un CHECK validado sin lock exclusivo y el
+índice se construye con CONCURRENTLY.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import (
+    add_column,
+    backfill,
+    create_index_concurrently,
+    drop_index_concurrently,
+    has_table,
+    is_postgresql,
+    set_not_null,
+)
+
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if is_postgresql():
+        op.execute(sa.text("CREATE SEQUENCE IF NOT EXISTS product_change_seq"))
+        add_column("products", sa.Column("change_seq", sa.BigInteger, nullable=True))
+        # También queda como DEFAULT para que COPY (importación) la asigne
+        op.execute(sa.text(
+            "ALTER TABLE products ALTER COLUMN change_seq SET DEFAULT nextval('product_change_seq')"
+        ))
+        backfill("products", "change_seq = nextval('product_change_seq')", "change_seq IS NULL")
+    else:
+        add_column("products", sa.Column("change_seq", sa.BigInteger, nullable=True))
+        backfill("products", "change_seq = id", "change_seq IS NULL")
+    set_not_null("products", "change_seq")
+    create_index_concurrently("ix_products_change_seq", "products", ["change_seq", "id"])
+
+    if not has_table("product_tombstones"):
+        op.create_table(
+            "product_tombstones",
+            sa.Column("id", sa.Integer, primary_key=True, autoincrement=False),
+            sa.Column("change_seq", sa.BigInteger, nullable=False),
+            sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        )
+        op.create_index("ix_product_tombstones_change_seq", "product_tombstones", ["change_seq", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("product_tombstones")
+    drop_index_concurrently("ix_products_change_seq", "products")
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("change_seq")
+    if is_postgresql():
+        op.execute(sa.text("DROP SEQUENCE IF EXISTS product_change_seq"))
@@ -0,0 +1,39 @@
+"""Baldes del límite de peticiones (RATE_LIMIT_STORE=postgres)
+
+Tabla UNLOGGED (sin WAL; se vacía tras una caída del servidor). La API
+también la crea al primer uso si no existe. Solo PostgreSQL.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import is_postgresql
+
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not is_postgresql():
+        return
+    op.execute(sa.text("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets (
+            key TEXT PRIMARY KEY,
+            tokens DOUBLE PRECISION NOT NULL,
+            updated_at DOUBLE PRECISION NOT NULL,
+            allowed BOOLEAN NOT NULL
+        )
+    """))
+
+
+def downgrade() -> None:
+    if is_postgresql():
+        op.execute(sa.text("DROP TABLE IF EXISTS rate_limit_buckets"))
@@ -1,19 +1,27 @@
 """
 Configuración de pytest para tests con PostgreSQL.
-Usa una base de datos en memoria SQLite para tests rápidos.
+Usa una base de datos SQLite para tests rápidos; las rutas acceden a ella
+mediante aiosqlite, igual que lo hacen con asyncpg en producción.
 """
 import os
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
 # Establecer modo test y DATABASE_URL para tests antes de importar app
 os.environ["TESTING"] = "1"
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
+# Los tests hacen muchas peticiones seguidas desde el mismo cliente; el límite
+# por cliente se prueba en tests/test_ratelimit.py con su propio limitador
+os.environ["RATE_LIMIT_ENABLED"] = "0"
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_sessionmaker
+from app.cache import catalog_snapshots, product_cache
 from app.main import app
+from app.replicas import get_read_db
 
 # Base de datos en memoria para tests (SQLite)
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -23,6 +31,15 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine asíncrono sobre el mismo archivo. NullPool evita reutilizar conexiones
+# aiosqlite entre los event loops de distintos TestClient.
+async_engine = create_async_engine(
+    "sqlite+aiosqlite:///./test.db", poolclass=NullPool
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 @pytest.fixture(scope="function")
 def db_session():
@@ -49,13 +66,16 @@ def client(db_session):
     """
     Cliente de prueba de FastAPI con base de datos de test.
     """
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
+    async def override_get_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_sessionmaker] = lambda: TestingAsyncSessionLocal
+    # Los IDs se reutilizan entre tests: la caché debe empezar vacía
+    product_cache.clear()
+    catalog_snapshots.clear()
     
     with TestClient(app) as test_client:
         yield test_client
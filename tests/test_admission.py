@@ -0,0 +1,151 @@
+"""
+Tests para el control de admisión (límite adaptativo y descarte de carga).
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.admission import READ, WRITE, AdmissionController, AdmissionMiddleware
+from app.main import app
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdmissionController:
+    """Tests de AdmissionController"""
+
+    def test_admits_up_to_limit_then_queues(self):
+        controller = AdmissionController(initial_limit=2, max_queue_wait=1)
+
+        async def run():
+            assert await controller.acquire()
+            assert await controller.acquire()
+            waiting = asyncio.ensure_future(controller.acquire())
+            await asyncio.sleep(0)
+            assert controller.queued == 1
+            controller.release()
+            return await waiting
+
+        assert asyncio.run(run()) is True
+        assert controller.in_flight == 2
+        assert controller.queued == 0
+
+    def test_writes_are_admitted_before_reads(self):
+        controller = AdmissionController(initial_limit=1, max_queue_wait=1)
+        order = []
+
+        async def wait(priority):
+            await controller.acquire(priority)
+            order.append(priority)
+
+        async def run():
+            await controller.acquire()
+            tasks = [asyncio.ensure_future(wait(p)) for p in (READ, WRITE)]
+            await asyncio.sleep(0)
+            controller.release()
+            await asyncio.sleep(0)
+            controller.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert order == [WRITE, READ]
+
+    def test_queue_wait_timeout_rejects(self):
+        controller = AdmissionController(initial_limit=1, max_queue_wait=0.01)
+
+        async def run():
+            await controller.acquire()
+            return await controller.acquire()
+
+        assert asyncio.run(run()) is False
+        assert controller.stats()["rejected"] == 1
+        assert controller.queued == 0
+
+    def test_full_queue_rejects_immediately(self):
+        controller = AdmissionController(initial_limit=1, max_queue=0)
+
+        async def run():
+            await controller.acquire()
+            return await controller.acquire()
+
+        assert asyncio.run(run()) is False
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        controller = AdmissionController(initial_limit=1, max_queue_wait=1)
+
+        async def run():
+            await controller.acquire()
+            waiting = asyncio.ensure_future(controller.acquire())
+            await asyncio.sleep(0)
+            waiting.cancel()
+            await asyncio.sleep(0)
+            controller.release()
+
+        asyncio.run(run())
+        assert controller.in_flight == 0
+        assert controller.queued == 0
+
+    def test_slow_responses_decrease_limit_once_per_interval(self):
+        clock = FakeClock()
+        controller = AdmissionController(initial_limit=10, latency_target=0.5, clock=clock)
+        controller.in_flight = 3
+
+        controller.release(latency=2.0)
+        controller.release(latency=2.0)
+        assert controller.limit == 9.0
+
+        clock.now = 0.5
+        controller.release(latency=2.0)
+        assert controller.limit == 8.1
+
+    def test_fast_responses_increase_limit_only_when_used(self):
+        controller = AdmissionController(initial_limit=4, max_limit=10, latency_target=0.5)
+
+        controller.in_flight = 1
+        controller.release(latency=0.01)
+        assert controller.limit == 4.0
+
+        controller.in_flight = 5
+        controller.release(latency=0.01)
+        assert controller.limit == 4.25
+
+    def test_limit_stays_within_bounds(self):
+        controller = AdmissionController(initial_limit=1, min_limit=1, max_limit=1, latency_target=0.5)
+        controller.in_flight = 2
+
+        controller.release(latency=5.0)
+        assert controller.limit == 1.0
+        controller.release(latency=0.01)
+        assert controller.limit == 1.0
+
+
+class TestAdmissionMiddleware:
+    """Tests del descarte de carga en la API"""
+
+    def test_overloaded_requests_get_503_with_retry_after(self, client):
+        controller = AdmissionController(initial_limit=1, max_queue=0)
+        asyncio.run(controller.acquire())
+        # Sin `with`: el lifespan ya lo ejecutó el cliente del fixture
+        shedding_client = TestClient(AdmissionMiddleware(app, controller, retry_after=3))
+
+        response = shedding_client.get("/productos/")
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert shedding_client.get("/health/live").status_code == 200
+
+    def test_admitted_requests_release_their_slot(self, client):
+        controller = AdmissionController(initial_limit=1)
+        admitting_client = TestClient(AdmissionMiddleware(app, controller))
+
+        assert admitting_client.get("/productos/").status_code == 200
+        assert admitting_client.get("/productos/").status_code == 200
+        assert controller.in_flight == 0
+        assert controller.stats()["admitted"] == 2
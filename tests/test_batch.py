@@ -0,0 +1,100 @@
+"""
+Tests para la lectura por lote (/productos/batch).
+"""
+
+import app.routes.products as product_routes
+from app.cache import product_cache
+
+
+def _create(client, nombre):
+    return client.post("/productos/", json={"nombre": nombre, "precio": 1.0, "stock": 1}).json()["id"]
+
+
+class TestBatchGet:
+    """Tests de GET /productos/batch"""
+
+    def test_returns_products_in_request_order(self, client):
+        a, b, c = _create(client, "A"), _create(client, "B"), _create(client, "C")
+
+        response = client.get(f"/productos/batch?ids={c},{a},{b}")
+
+        assert response.status_code == 200
+        assert [p["nombre"] for p in response.json()["items"]] == ["C", "A", "B"]
+        assert response.json()["missing"] == []
+
+    def test_reports_missing_ids(self, client):
+        a = _create(client, "A")
+
+        data = client.get(f"/productos/batch?ids=999,{a},998").json()
+
+        assert [p["id"] for p in data["items"]] == [a]
+        assert data["missing"] == [999, 998]
+
+    def test_duplicates_are_returned_once(self, client):
+        a = _create(client, "A")
+
+        data = client.get(f"/productos/batch?ids={a},{a}").json()
+
+        assert len(data["items"]) == 1
+
+    def test_mixes_cached_and_uncached_products(self, client):
+        a, b = _create(client, "A"), _create(client, "B")
+        product_cache.invalidate(b)
+
+        data = client.get(f"/productos/batch?ids={a},{b}").json()
+
+        assert [p["id"] for p in data["items"]] == [a, b]
+        assert product_cache.get(b) is not None
+
+    def test_reflects_updates(self, client):
+        a = _create(client, "A")
+        client.get(f"/productos/batch?ids={a}")
+
+        client.patch(f"/productos/{a}", json={"nombre": "A2"})
+
+        assert client.get(f"/productos/batch?ids={a}").json()["items"][0]["nombre"] == "A2"
+
+    def test_invalid_ids_return_422(self, client):
+        assert client.get("/productos/batch?ids=1,x").status_code == 422
+        assert client.get("/productos/batch?ids=,").status_code == 422
+        assert client.get("/productos/batch").status_code == 422
+
+    def test_out_of_range_ids_return_422(self, client):
+        assert client.get(f"/productos/batch?ids=1,{2**31}").status_code == 422
+        assert client.get(f"/productos/batch?ids={2**70}").status_code == 422
+        assert client.get("/productos/batch?ids=0").status_code == 422
+
+    def test_too_many_ids_return_413(self, client, monkeypatch):
+        monkeypatch.setattr(product_routes, "BATCH_GET_MAX_IDS", 2)
+
+        assert client.get("/productos/batch?ids=1,2,3").status_code == 413
+
+
+class TestBatchPost:
+    """Tests de POST /productos/batch"""
+
+    def test_post_body_variant(self, client):
+        a, b = _create(client, "A"), _create(client, "B")
+
+        response = client.post("/productos/batch", json={"ids": [b, 999, a]})
+
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()["items"]] == [b, a]
+        assert response.json()["missing"] == [999]
+
+    def test_empty_body_returns_422(self, client):
+        assert client.post("/productos/batch", json={"ids": []}).status_code == 422
+
+    def test_out_of_range_ids_return_422(self, client):
+        assert client.post("/productos/batch", json={"ids": [1, 2**31]}).status_code == 422
+        assert client.post("/productos/batch", json={"ids": [2**70]}).status_code == 422
+        assert client.post("/productos/batch", json={"ids": [0]}).status_code == 422
+
+    def test_large_id_set_is_chunked(self, client, monkeypatch):
+        monkeypatch.setattr(product_routes, "IN_CLAUSE_CHUNK", 2)
+        ids = [_create(client, f"P{i}") for i in range(5)]
+        product_cache.clear()
+
+        data = client.post("/productos/batch", json={"ids": list(reversed(ids))}).json()
+
+        assert [p["id"] for p in data["items"]] == list(reversed(ids))
@@ -0,0 +1,62 @@
+"""
+Tests para las utilidades de benchmarks.
+"""
+
+import random
+
+from benchmarks.load import LoadState, build_request
+from benchmarks.seed import generate_products
+from benchmarks.stats import compare, percentile, summarize
+
+
+class TestStats:
+    """Tests del resumen de latencias"""
+
+    def test_percentile_interpolates(self):
+        values = [1.0, 2.0, 3.0, 4.0, 5.0]
+
+        assert percentile(values, 50) == 3.0
+        assert percentile(values, 95) == 4.8
+        assert percentile([], 99) == 0.0
+
+    def test_summarize_reports_ms_and_rps(self):
+        summary = summarize([0.01, 0.02, 0.03, 0.04], errors=1, elapsed=2, statuses={200: 3, 500: 1})
+
+        assert summary["count"] == 4
+        assert summary["rps"] == 2.0
+        assert summary["p50_ms"] == 25.0
+        assert summary["max_ms"] == 40.0
+        assert summary["statuses"] == {"200": 3, "500": 1}
+
+    def test_compare_flags_regressions(self):
+        baseline = {"overall": {"p95_ms": 10.0, "rps": 100.0}, "operations": {"get": {"p95_ms": 10.0, "rps": 100.0}}}
+        current = {"overall": {"p95_ms": 10.5, "rps": 98.0}, "operations": {"get": {"p95_ms": 15.0, "rps": 100.0}}}
+
+        rows = {row["operation"]: row for row in compare(current, baseline, max_regression=0.1)}
+
+        assert not rows["overall"]["regressed"]
+        assert rows["get"]["regressed"]
+        assert rows["get"]["p95_change"] == 0.5
+
+
+class TestSeed:
+    """Tests del generador de datos"""
+
+    def test_same_seed_same_products(self):
+        assert list(generate_products(50, seed=7)) == list(generate_products(50, seed=7))
+        assert list(generate_products(50, seed=7)) != list(generate_products(50, seed=8))
+
+
+class TestLoad:
+    """Tests de la construcción de peticiones"""
+
+    def test_delete_only_removes_created_products(self):
+        state = LoadState(rows=10)
+        rng = random.Random(1)
+
+        method, _, _ = build_request("delete", state, rng)
+        assert method == "POST"
+
+        state.created.append(42)
+        assert build_request("delete", state, rng)[:2] == ("DELETE", "/productos/42")
+        assert state.created == []
@@ -0,0 +1,82 @@
+"""
+Tests para los endpoints masivos /productos/bulk.
+"""
+
+
+def _items(count, offset=0):
+    return [
+        {"nombre": f"Bulk_{offset + i}", "precio": 1.0 + i, "stock": i}
+        for i in range(count)
+    ]
+
+
+class TestBulkEndpoints:
+    """Tests de creación, actualización y eliminación masivas"""
+    
+    def test_bulk_create_returns_ids_in_request_order(self, client):
+        response = client.post("/productos/bulk", json=_items(50))
+        
+        assert response.status_code == 201
+        body = response.json()
+        assert body["succeeded"] == 50
+        assert body["failed"] == 0
+        assert [r["index"] for r in body["results"]] == list(range(50))
+        
+        ids = [r["id"] for r in body["results"]]
+        assert ids == sorted(ids)
+        assert client.get(f"/productos/{ids[7]}").json()["nombre"] == "Bulk_7"
+    
+    def test_bulk_create_rejects_whole_batch_on_invalid_item(self, client):
+        items = _items(3)
+        items[1]["precio"] = -5
+        
+        response = client.post("/productos/bulk", json=items)
+        
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][:2] == ["body", 1]
+        assert client.get("/productos/?all=true").json() == []
+    
+    def test_bulk_update_reports_missing_ids(self, client):
+        ids = [r["id"] for r in client.post("/productos/bulk", json=_items(3)).json()["results"]]
+        client.get(f"/productos/{ids[0]}")  # llena la caché
+        
+        updates = [
+            {"id": ids[0], "nombre": "Nuevo", "precio": 9.5, "stock": 1},
+            {"id": 9999, "nombre": "Fantasma", "precio": 1.0, "stock": 0},
+        ]
+        response = client.put("/productos/bulk", json=updates)
+        
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["results"]] == ["updated", "not_found"]
+        assert client.get(f"/productos/{ids[0]}").json()["nombre"] == "Nuevo"
+    
+    def test_bulk_update_rejects_duplicate_ids(self, client):
+        item = {"id": 1, "nombre": "A", "precio": 1.0, "stock": 0}
+        
+        response = client.put("/productos/bulk", json=[item, item])
+        
+        assert response.status_code == 422
+    
+    def test_bulk_delete(self, client):
+        ids = [r["id"] for r in client.post("/productos/bulk", json=_items(4)).json()["results"]]
+        
+        response = client.request("DELETE", "/productos/bulk", json={"ids": ids[:2] + [9999]})
+        
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()["results"]] == ["deleted", "deleted", "not_found"]
+        remaining = [p["id"] for p in client.get("/productos/?all=true").json()]
+        assert remaining == ids[2:]
+    
+    def test_out_of_range_ids_return_422(self, client):
+        item = {"id": 2**31, "nombre": "A", "precio": 1.0, "stock": 0}
+        
+        assert client.put("/productos/bulk", json=[item]).status_code == 422
+        assert client.request("DELETE", "/productos/bulk", json={"ids": [1, 2**70]}).status_code == 422
+        assert client.request("DELETE", "/productos/bulk", json={"ids": [0]}).status_code == 422
+    
+    def test_bulk_size_limit(self, client, monkeypatch):
+        monkeypatch.setattr("app.routes.products.BULK_MAX_ITEMS", 2)
+        
+        response = client.post("/productos/bulk", json=_items(3))
+        
+        assert response.status_code == 413
@@ -0,0 +1,184 @@
+"""
+Tests para la caché LRU+TTL de productos.
+"""
+
+from prometheus_client import REGISTRY
+
+from app.cache import STAMP_MIN_KEYS, LRUTTLCache, product_cache
+
+
+class FakeClock:
+    """Reloj controlable para probar expiración sin esperar"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestLRUTTLCache:
+    """Tests unitarios de LRUTTLCache"""
+    
+    def test_get_returns_stored_value_and_counts_hit(self):
+        cache = LRUTTLCache(maxsize=10, ttl=60)
+        cache.set(1, "a")
+        
+        assert cache.get(1) == "a"
+        assert cache.get(2) is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+    
+    def test_named_cache_exports_prometheus_counters(self):
+        clock = FakeClock()
+        cache = LRUTTLCache(maxsize=1, ttl=5, clock=clock, name="test")
+        
+        def sample(metric):
+            return REGISTRY.get_sample_value(f"cache_{metric}_total", {"cache": "test"}) or 0.0
+        
+        before = {m: sample(m) for m in ("hits", "misses", "evictions", "expirations")}
+        cache.set(1, "a")
+        cache.get(1)
+        cache.set(2, "b")
+        cache.get(1)
+        clock.now = 5.0
+        cache.get(2)
+        
+        assert {m: sample(m) - before[m] for m in before} == {
+            "hits": 1, "misses": 2, "evictions": 1, "expirations": 1
+        }
+    
+    def test_evicts_least_recently_used(self):
+        cache = LRUTTLCache(maxsize=2, ttl=60)
+        cache.set(1, "a")
+        cache.set(2, "b")
+        cache.get(1)  # 2 pasa a ser el menos usado
+        cache.set(3, "c")
+        
+        assert cache.get(2) is None
+        assert cache.get(1) == "a"
+        assert cache.get(3) == "c"
+        assert cache.stats()["evictions"] == 1
+    
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        cache = LRUTTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.set(1, "a")
+        
+        clock.now = 4.9
+        assert cache.get(1) == "a"
+        clock.now = 5.0
+        assert cache.get(1) is None
+        assert cache.stats()["expirations"] == 1
+        assert len(cache) == 0
+    
+    def test_invalidate_removes_entry(self):
+        cache = LRUTTLCache(maxsize=10, ttl=60)
+        cache.set(1, "a")
+        cache.invalidate(1)
+        
+        assert cache.get(1) is None
+    
+    def test_stale_read_does_not_overwrite_write(self):
+        cache = LRUTTLCache(maxsize=10, ttl=60)
+        stamp = cache.stamp(1)
+        cache.set(1, "escrito")
+        cache.set(1, "leído antes", stamp=stamp)
+        
+        assert cache.get(1) == "escrito"
+    
+    def test_write_to_other_key_keeps_read(self):
+        cache = LRUTTLCache(maxsize=10, ttl=60)
+        stamp = cache.stamp(1)
+        cache.set(2, "escrito")
+        cache.invalidate(3)
+        cache.set(1, "leído", stamp=stamp)
+        
+        assert cache.get(1) == "leído"
+    
+    def test_clear_discards_pending_reads(self):
+        cache = LRUTTLCache(maxsize=10, ttl=60)
+        stamp = cache.stamp(1)
+        cache.clear()
+        cache.set(1, "leído antes", stamp=stamp)
+        
+        assert cache.get(1) is None
+    
+    def test_dropped_stamp_discards_pending_read(self):
+        cache = LRUTTLCache(maxsize=1, ttl=60)
+        stamp = cache.stamp(1)
+        cache.set(1, "escrito")
+        for key in range(2, STAMP_MIN_KEYS + 2):
+            cache.invalidate(key)
+        cache.set(1, "leído antes", stamp=stamp)
+        
+        assert cache.get(1) == "escrito"
+    
+    def test_recently_written_tracks_writes_within_window(self):
+        clock = FakeClock()
+        cache = LRUTTLCache(maxsize=10, ttl=60, clock=clock, write_window=5)
+        cache.set(1, "a")
+        cache.set(2, "b", stamp=cache.stamp(2))
+        cache.invalidate(3)
+        
+        assert cache.recently_written(1)
+        assert not cache.recently_written(2)
+        assert cache.recently_written(3)
+        clock.now = 5.0
+        assert not cache.recently_written(1)
+        assert not cache.recently_written(3)
+    
+    def test_clear_marks_every_key_as_written(self):
+        clock = FakeClock()
+        cache = LRUTTLCache(maxsize=10, ttl=60, clock=clock, write_window=5)
+        cache.clear()
+        
+        assert cache.recently_written(42)
+        clock.now = 5.0
+        assert not cache.recently_written(42)
+    
+    def test_zero_maxsize_disables_cache(self):
+        cache = LRUTTLCache(maxsize=0, ttl=60)
+        cache.set(1, "a")
+        
+        assert cache.get(1) is None
+        assert len(cache) == 0
+
+
+class TestProductCacheRoutes:
+    """Tests de integración de la caché con las rutas de productos"""
+    
+    def test_repeated_get_is_served_from_cache(self, client):
+        product_id = client.post("/productos/", json={
+            "nombre": "Monitor", "precio": 150.0, "stock": 3
+        }).json()["id"]
+        product_cache.invalidate(product_id)
+        hits_before = product_cache.hits
+        
+        first = client.get(f"/productos/{product_id}")
+        second = client.get(f"/productos/{product_id}")
+        
+        assert first.json() == second.json()
+        assert product_cache.hits == hits_before + 1
+    
+    def test_update_refreshes_cached_entry(self, client):
+        product_id = client.post("/productos/", json={
+            "nombre": "Monitor", "precio": 150.0, "stock": 3
+        }).json()["id"]
+        client.get(f"/productos/{product_id}")
+        
+        client.put(f"/productos/{product_id}", json={
+            "nombre": "Monitor", "precio": 120.0, "stock": 3
+        })
+        
+        assert client.get(f"/productos/{product_id}").json()["precio"] == 120.0
+    
+    def test_delete_invalidates_cached_entry(self, client):
+        product_id = client.post("/productos/", json={
+            "nombre": "Monitor", "precio": 150.0, "stock": 3
+        }).json()["id"]
+        client.get(f"/productos/{product_id}")
+        
+        client.delete(f"/productos/{product_id}")
+        
+        assert client.get(f"/productos/{product_id}").status_code == 404
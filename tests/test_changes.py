@@ -0,0 +1,142 @@
+"""
+Tests para la sincronización incremental (/productos/changes).
+"""
+
+from datetime import datetime
+
+import pytest
+
+import app.changes
+from app.pagination import decode_change_token, encode_change_token
+
+
+@pytest.fixture(autouse=True)
+def no_safety_lag(monkeypatch):
+    monkeypatch.setattr(app.changes, "CHANGES_SAFETY_LAG_SECONDS", 0)
+
+
+def _create(client, nombre="Producto"):
+    return client.post("/productos/", json={"nombre": nombre, "precio": 10.0, "stock": 1}).json()["id"]
+
+
+def _changes(client, since=None, limit=None):
+    params = {}
+    if since is not None:
+        params["since"] = since
+    if limit is not None:
+        params["limit"] = limit
+    response = client.get("/productos/changes", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestChangeToken:
+    """Tests de codificación del token"""
+
+    def test_round_trip(self):
+        assert decode_change_token(encode_change_token(42, 7)) == (42, 7)
+
+    @pytest.mark.parametrize("token", [
+        "", "no-es-token", encode_change_token(1, 1)[:-3],
+        encode_change_token(2**63, 1), encode_change_token(1, 2**31),
+    ])
+    def test_invalid_token_raises(self, token):
+        with pytest.raises(ValueError):
+            decode_change_token(token)
+
+
+class TestChanges:
+    """Tests de GET /productos/changes"""
+
+    def test_initial_sync_returns_all_products(self, client):
+        ids = [_create(client, "A"), _create(client, "B")]
+
+        data = _changes(client)
+
+        assert [p["id"] for p in data["items"]] == ids
+        assert data["deleted"] == []
+        assert data["has_more"] is False
+
+    def test_no_changes_since_latest_token(self, client):
+        _create(client)
+        token = _changes(client)["next_token"]
+
+        data = _changes(client, token)
+
+        assert data["items"] == []
+        assert data["deleted"] == []
+        assert data["next_token"] == token
+
+    def test_returns_only_changed_products(self, client):
+        a = _create(client, "A")
+        _create(client, "B")
+        token = _changes(client)["next_token"]
+
+        client.patch(f"/productos/{a}", json={"precio": 20.0})
+        c = _create(client, "C")
+        data = _changes(client, token)
+
+        assert [p["id"] for p in data["items"]] == [a, c]
+        assert data["items"][0]["precio"] == 20.0
+
+    def test_stock_adjust_and_bulk_update_are_changes(self, client):
+        a = _create(client, "A")
+        b = _create(client, "B")
+        token = _changes(client)["next_token"]
+
+        client.post(f"/productos/{a}/stock/adjust", json={"delta": 1})
+        client.put("/productos/bulk", json=[{"id": b, "nombre": "B2", "precio": 1.0, "stock": 1}])
+
+        assert [p["id"] for p in _changes(client, token)["items"]] == [a, b]
+
+    def test_deletes_are_reported_as_tombstones(self, client):
+        a = _create(client, "A")
+        b = _create(client, "B")
+        c = _create(client, "C")
+        token = _changes(client)["next_token"]
+
+        client.delete(f"/productos/{a}")
+        client.request("DELETE", "/productos/bulk", json={"ids": [b]})
+        data = _changes(client, token)
+
+        assert data["items"] == []
+        assert data["deleted"] == [a, b]
+        assert c not in data["deleted"]
+
+    def test_pages_with_has_more(self, client):
+        ids = [_create(client, f"P{i}") for i in range(5)]
+
+        first = _changes(client, limit=2)
+        second = _changes(client, first["next_token"], limit=2)
+        third = _changes(client, second["next_token"], limit=2)
+
+        assert first["has_more"] is True and second["has_more"] is True
+        assert third["has_more"] is False
+        assert [p["id"] for page in (first, second, third) for p in page["items"]] == ids
+
+    def test_recent_changes_do_not_advance_token(self, client, monkeypatch):
+        _create(client)
+        monkeypatch.setattr(app.changes, "CHANGES_SAFETY_LAG_SECONDS", 3600)
+
+        data = _changes(client)
+
+        assert len(data["items"]) == 1
+        assert decode_change_token(data["next_token"]) == (0, 0)
+        assert data["has_more"] is False
+
+    def test_open_write_transaction_holds_token(self, client, monkeypatch):
+        """Una escritura en curso que empezó antes frena el token"""
+        _create(client)
+
+        async def long_running_write(db):
+            return datetime(2000, 1, 1)  # SQLite: fechas sin zona horaria
+
+        monkeypatch.setattr(app.changes, "oldest_open_write", long_running_write)
+
+        data = _changes(client)
+
+        assert len(data["items"]) == 1
+        assert decode_change_token(data["next_token"]) == (0, 0)
+
+    def test_invalid_token_returns_400(self, client):
+        assert client.get("/productos/changes?since=basura").status_code == 400
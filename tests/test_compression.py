@@ -0,0 +1,149 @@
+"""
+Tests para la compresión de respuestas y los snapshots del catálogo.
+"""
+
+import brotli
+import pytest
+
+from app.cache import catalog_snapshots
+from app.compression import choose_encoding, compress, encode_body
+
+
+def _seed(client, count=30):
+    rows = [
+        {"nombre": f"Producto {i}", "precio": 10.0 + i, "descripcion": "Texto repetido " * 5, "stock": i}
+        for i in range(count)
+    ]
+    assert client.post("/productos/bulk", json=rows).status_code == 201
+
+
+class TestChooseEncoding:
+    """Tests de negociación de Accept-Encoding"""
+
+    @pytest.mark.parametrize("header, expected", [
+        (None, None),
+        ("", None),
+        ("identity", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("*;q=0.1, br;q=0", "gzip"),
+    ])
+    def test_negotiation(self, header, expected):
+        assert choose_encoding(header) == expected
+
+    def test_encode_body_respects_minimum_size(self):
+        assert encode_body(b"{}", "gzip") == (b"{}", None)
+
+        body = b"x" * 5000
+        content, encoding = encode_body(body, "br")
+        assert encoding == "br"
+        assert brotli.decompress(content) == body
+
+    def test_gzip_is_deterministic(self):
+        assert compress(b"abc" * 1000, "gzip") == compress(b"abc" * 1000, "gzip")
+
+
+class TestCompressionMiddleware:
+    """Tests de CompressionMiddleware"""
+
+    def test_large_listing_is_gzipped(self, client):
+        _seed(client)
+
+        response = client.get("/productos/?limit=30", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()["items"]) == 30
+
+    def test_brotli_preferred_when_accepted(self, client):
+        _seed(client)
+
+        response = client.get("/productos/?limit=30", headers={"Accept-Encoding": "gzip, br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert len(response.json()["items"]) == 30
+
+    def test_small_response_is_not_compressed(self, client):
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_identity_when_not_accepted(self, client):
+        _seed(client)
+
+        response = client.get("/productos/?limit=30", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert len(response.json()["items"]) == 30
+
+    def test_streaming_export_is_compressed(self, client):
+        _seed(client)
+
+        response = client.get("/productos/export", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.text.splitlines()) == 30
+
+    def test_compressed_response_has_weak_etag(self, client):
+        _seed(client)
+
+        plain = client.get("/productos/?limit=30", headers={"Accept-Encoding": "identity"})
+        gzipped = client.get("/productos/?limit=30", headers={"Accept-Encoding": "gzip"})
+
+        assert not plain.headers["etag"].startswith("W/")
+        assert gzipped.headers["etag"] == f"W/{plain.headers['etag']}"
+        revalidated = client.get(
+            "/productos/?limit=30", headers={"If-None-Match": gzipped.headers["etag"], "Accept-Encoding": "gzip"}
+        )
+        assert revalidated.status_code == 304
+
+    def test_not_modified_is_not_compressed(self, client):
+        _seed(client)
+        etag = client.get("/productos/?limit=30").headers["etag"]
+
+        response = client.get("/productos/?limit=30", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+
+        assert response.status_code == 304
+        assert "content-encoding" not in response.headers
+
+
+class TestCatalogSnapshots:
+    """Tests de los snapshots comprimidos de ?all=true"""
+
+    def test_snapshot_is_compressed_once_per_version(self, client):
+        _seed(client)
+        headers = {"Accept-Encoding": "gzip"}
+
+        first = client.get("/productos/?all=true", headers=headers)
+        hits = catalog_snapshots.hits
+        second = client.get("/productos/?all=true", headers=headers)
+
+        assert first.headers["content-encoding"] == "gzip"
+        assert second.content == first.content
+        assert catalog_snapshots.hits == hits + 1
+        assert len(second.json()) == 30
+
+    def test_snapshot_per_encoding(self, client):
+        _seed(client)
+
+        br = client.get("/productos/?all=true", headers={"Accept-Encoding": "br"})
+        plain = client.get("/productos/?all=true", headers={"Accept-Encoding": "identity"})
+
+        assert br.headers["content-encoding"] == "br"
+        assert "content-encoding" not in plain.headers
+        assert br.headers["etag"] == f"W/{plain.headers['etag']}"
+        assert br.json() == plain.json()
+        assert len(catalog_snapshots) == 2
+
+    def test_write_produces_new_snapshot(self, client):
+        _seed(client)
+        headers = {"Accept-Encoding": "gzip"}
+        client.get("/productos/?all=true", headers=headers)
+
+        client.patch("/productos/1", json={"nombre": "Cambiado"})
+        response = client.get("/productos/?all=true", headers=headers)
+
+        assert response.json()[0]["nombre"] == "Cambiado"
@@ -0,0 +1,203 @@
+"""
+Tests para ETags y peticiones condicionales.
+"""
+
+from fastapi import Request
+from sqlalchemy import text
+
+from app.etags import if_match_versions, parse_etags
+
+
+def _create(client, nombre="Producto", stock=5):
+    return client.post("/productos/", json={"nombre": nombre, "precio": 10.0, "stock": stock})
+
+
+def _request(headers):
+    raw = [(k.lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+
+class TestEtagHelpers:
+    """Tests de las funciones de app.etags"""
+
+    def test_parse_etags_strips_weak_prefix(self):
+        assert parse_etags('W/"1-2", "1-3"') == ['"1-2"', '"1-3"']
+        assert parse_etags(None) is None
+
+    def test_if_match_versions_only_for_same_product(self):
+        request = _request({"If-Match": '"7-2", "8-5", "7-x"'})
+
+        assert if_match_versions(request, 7) == {2}
+        assert if_match_versions(request, 9) == set()
+
+    def test_if_match_star_means_any_version(self):
+        assert if_match_versions(_request({"If-Match": "*"}), 1) is None
+        assert if_match_versions(_request({}), 1) is None
+
+
+class TestProductEtag:
+    """Tests de ETag / If-None-Match / If-Modified-Since en GET /productos/{id}"""
+
+    def test_get_returns_etag_and_last_modified(self, client):
+        product_id = _create(client).json()["id"]
+
+        response = client.get(f"/productos/{product_id}")
+
+        assert response.headers["etag"] == f'"{product_id}-1"'
+        assert "last-modified" in response.headers
+
+    def test_create_returns_etag(self, client):
+        response = _create(client)
+
+        assert response.headers["etag"] == f'"{response.json()["id"]}-1"'
+
+    def test_matching_if_none_match_returns_304(self, client):
+        product_id = _create(client).json()["id"]
+        etag = client.get(f"/productos/{product_id}").headers["etag"]
+
+        response = client.get(f"/productos/{product_id}", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_update_changes_etag(self, client):
+        product_id = _create(client).json()["id"]
+        etag = client.get(f"/productos/{product_id}").headers["etag"]
+
+        updated = client.patch(f"/productos/{product_id}", json={"precio": 12.0})
+        response = client.get(f"/productos/{product_id}", headers={"If-None-Match": etag})
+
+        assert updated.headers["etag"] == f'"{product_id}-2"'
+        assert response.status_code == 200
+        assert response.headers["etag"] == f'"{product_id}-2"'
+
+    def test_stock_adjust_changes_etag(self, client):
+        product_id = _create(client).json()["id"]
+
+        response = client.post(f"/productos/{product_id}/stock/adjust", json={"delta": -1})
+
+        assert response.headers["etag"] == f'"{product_id}-2"'
+        assert client.get(f"/productos/{product_id}").headers["etag"] == f'"{product_id}-2"'
+
+    def test_bulk_update_changes_etag(self, client):
+        product_id = _create(client).json()["id"]
+
+        client.put("/productos/bulk", json=[
+            {"id": product_id, "nombre": "Nuevo", "precio": 1.0, "stock": 1}
+        ])
+
+        assert client.get(f"/productos/{product_id}").headers["etag"] == f'"{product_id}-2"'
+
+    def test_if_modified_since_returns_304(self, client):
+        product_id = _create(client).json()["id"]
+        last_modified = client.get(f"/productos/{product_id}").headers["last-modified"]
+
+        response = client.get(f"/productos/{product_id}", headers={"If-Modified-Since": last_modified})
+
+        assert response.status_code == 304
+
+
+class TestListEtag:
+    """Tests de ETag en los listados"""
+
+    def test_page_returns_304_when_unchanged(self, client):
+        _create(client, "A")
+        etag = client.get("/productos/").headers["etag"]
+
+        assert client.get("/productos/", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_page_etag_changes_after_update(self, client):
+        product_id = _create(client, "A").json()["id"]
+        etag = client.get("/productos/").headers["etag"]
+
+        client.patch(f"/productos/{product_id}", json={"stock": 0})
+
+        assert client.get("/productos/", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_full_catalog_returns_304_when_unchanged(self, client):
+        _create(client, "A")
+        etag = client.get("/productos/?all=true").headers["etag"]
+
+        assert client.get("/productos/?all=true", headers={"If-None-Match": etag}).status_code == 304
+
+    def test_full_catalog_etag_changes_after_delete(self, client):
+        _create(client, "A")
+        product_id = _create(client, "B").json()["id"]
+        etag = client.get("/productos/?all=true").headers["etag"]
+
+        client.delete(f"/productos/{product_id}")
+
+        response = client.get("/productos/?all=true", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+
+    def test_full_catalog_etag_changes_on_late_lower_change_seq(self, client, db_session):
+        """Una transacción que confirma un change_seq menor que el máximo visible"""
+        _create(client, "A")
+        _create(client, "B")
+        etag = client.get("/productos/?all=true").headers["etag"]
+
+        db_session.execute(text(
+            "INSERT INTO products (nombre, precio, stock, version, change_seq) VALUES ('Tarde', 1, 1, 1, 1)"
+        ))
+        db_session.commit()
+
+        response = client.get("/productos/?all=true", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+
+    def test_full_catalog_etag_depends_on_filters(self, client):
+        _create(client, "A")
+
+        assert (client.get("/productos/?all=true").headers["etag"]
+                != client.get("/productos/?all=true&en_stock=true").headers["etag"])
+
+
+class TestIfMatch:
+    """Tests de concurrencia optimista con If-Match"""
+
+    def test_put_with_current_etag_succeeds(self, client):
+        product_id = _create(client).json()["id"]
+
+        response = client.put(
+            f"/productos/{product_id}",
+            json={"nombre": "Nuevo", "precio": 1.0, "stock": 1},
+            headers={"If-Match": f'"{product_id}-1"'}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == f'"{product_id}-2"'
+
+    def test_patch_with_stale_etag_returns_412(self, client):
+        product_id = _create(client).json()["id"]
+        client.patch(f"/productos/{product_id}", json={"precio": 2.0})
+
+        response = client.patch(
+            f"/productos/{product_id}", json={"precio": 3.0},
+            headers={"If-Match": f'"{product_id}-1"'}
+        )
+
+        assert response.status_code == 412
+        assert client.get(f"/productos/{product_id}").json()["precio"] == 2.0
+
+    def test_delete_with_stale_etag_returns_412(self, client):
+        product_id = _create(client).json()["id"]
+        client.patch(f"/productos/{product_id}", json={"precio": 2.0})
+
+        response = client.delete(f"/productos/{product_id}", headers={"If-Match": f'"{product_id}-1"'})
+
+        assert response.status_code == 412
+        assert client.get(f"/productos/{product_id}").status_code == 200
+
+    def test_delete_with_current_etag_succeeds(self, client):
+        product_id = _create(client).json()["id"]
+
+        response = client.delete(f"/productos/{product_id}", headers={"If-Match": f'"{product_id}-1"'})
+
+        assert response.status_code == 204
+
+    def test_if_match_on_missing_product_returns_404(self, client):
+        response = client.patch("/productos/999", json={"precio": 3.0}, headers={"If-Match": '"999-1"'})
+
+        assert response.status_code == 404
@@ -0,0 +1,50 @@
+"""
+Tests para la exportación en streaming del catálogo.
+"""
+import csv
+import io
+import json
+
+
+def _seed(client, count):
+    items = [
+        {"nombre": f"Producto, \"{i}\"", "precio": 1.5 + i, "stock": i, "descripcion": None if i % 2 else "desc"}
+        for i in range(count)
+    ]
+    return client.post("/productos/bulk", json=items).json()["results"]
+
+
+class TestExport:
+    """Tests de GET /productos/export"""
+    
+    def test_ndjson_export_streams_every_product(self, client, monkeypatch):
+        monkeypatch.setattr("app.routes.products.EXPORT_BATCH_SIZE", 3)
+        _seed(client, 10)
+        
+        response = client.get("/productos/export")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 10
+        assert lines[0] == client.get(f"/productos/{lines[0]['id']}").json()
+        assert [p["id"] for p in lines] == sorted(p["id"] for p in lines)
+    
+    def test_csv_export_has_header_and_escapes_fields(self, client):
+        _seed(client, 4)
+        
+        response = client.get("/productos/export", params={"format": "csv"})
+        
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 4
+        assert rows[0]["nombre"] == 'Producto, "0"'
+        assert rows[1]["descripcion"] == ""
+    
+    def test_csv_export_of_empty_catalog_has_header(self, client):
+        response = client.get("/productos/export", params={"format": "csv"})
+        
+        assert response.text == "id,nombre,precio,descripcion,stock\n"
+    
+    def test_unknown_format_returns_422(self, client):
+        assert client.get("/productos/export", params={"format": "xml"}).status_code == 422
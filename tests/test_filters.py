@@ -0,0 +1,90 @@
+"""
+Tests para los filtros del listado de productos y sus índices.
+"""
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from app.filters import escape_like
+from app.models.product import ProductDB
+
+
+def _seed(client):
+    items = [
+        {"nombre": "Laptop HP", "precio": 899.99, "stock": 10},
+        {"nombre": "laptop Dell", "precio": 1200.0, "stock": 0},
+        {"nombre": "Mouse 100%", "precio": 25.5, "stock": 3},
+        {"nombre": "Teclado", "precio": 45.0, "stock": 0},
+    ]
+    client.post("/productos/bulk", json=items)
+
+
+def _names(response):
+    body = response.json()
+    items = body["items"] if isinstance(body, dict) else body
+    return [p["nombre"] for p in items]
+
+
+class TestListFilters:
+    """Tests de los parámetros de filtrado en GET /productos/"""
+    
+    def test_substring_is_case_insensitive(self, client):
+        _seed(client)
+        
+        response = client.get("/productos/", params={"nombre": "LAPTOP"})
+        
+        assert _names(response) == ["Laptop HP", "laptop Dell"]
+    
+    def test_prefix_matches_only_start_of_name(self, client):
+        _seed(client)
+        
+        assert _names(client.get("/productos/", params={"nombre_prefijo": "Tec"})) == ["Teclado"]
+        assert _names(client.get("/productos/", params={"nombre_prefijo": "clado"})) == []
+    
+    def test_like_wildcards_are_literal(self, client):
+        _seed(client)
+        
+        assert _names(client.get("/productos/", params={"nombre": "0%"})) == ["Mouse 100%"]
+        assert _names(client.get("/productos/", params={"nombre": "_"})) == []
+    
+    def test_price_range_and_stock(self, client):
+        _seed(client)
+        
+        response = client.get("/productos/", params={
+            "precio_min": 40, "precio_max": 1000, "en_stock": "true"
+        })
+        
+        assert _names(response) == ["Laptop HP"]
+    
+    def test_out_of_stock(self, client):
+        _seed(client)
+        
+        response = client.get("/productos/", params={"en_stock": "false", "all": "true"})
+        
+        assert _names(response) == ["laptop Dell", "Teclado"]
+    
+    def test_filters_combine_with_pagination(self, client):
+        _seed(client)
+        
+        first = client.get("/productos/", params={"nombre": "laptop", "limit": 1}).json()
+        second = client.get("/productos/", params={
+            "nombre": "laptop", "limit": 1, "cursor": first["next_cursor"]
+        }).json()
+        
+        assert [p["nombre"] for p in first["items"] + second["items"]] == ["Laptop HP", "laptop Dell"]
+        assert second["next_cursor"] is None
+
+
+class TestFilterIndexes:
+    """Los índices de los filtros se generan correctamente para PostgreSQL"""
+    
+    def _ddl(self, name):
+        index = next(i for i in ProductDB.__table__.indexes if i.name == name)
+        return str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    
+    def test_postgres_index_definitions(self):
+        assert "gin (nombre gin_trgm_ops)" in self._ddl("ix_products_nombre_trgm")
+        assert "nombre text_pattern_ops" in self._ddl("ix_products_nombre_prefix")
+        assert "WHERE stock > 0" in self._ddl("ix_products_in_stock")
+    
+    def test_escape_like(self):
+        assert escape_like("50%_a\\b") == "50\\%\\_a\\\\b"
@@ -0,0 +1,129 @@
+"""
+Tests para los health checks (vida, preparación y chequeo en segundo plano).
+"""
+
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import app.main as main
+from app.health import DatabaseStatus, HealthChecker, readiness_problems
+
+BROKEN_URL = "sqlite+aiosqlite:////nonexistent/dir/health.db"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class HangingChecker(HealthChecker):
+    """Checker cuya consulta nunca responde"""
+
+    async def _ping(self):
+        await asyncio.sleep(60)
+
+
+class TestHealthChecker:
+    """Tests del chequeo de la base en segundo plano"""
+
+    def test_successful_check(self):
+        checker = HealthChecker(create_async_engine("sqlite+aiosqlite://"))
+
+        status = asyncio.run(checker.check())
+
+        assert status.ok
+        assert checker.database()["status"] == "connected"
+        assert readiness_problems(checker, None) == []
+
+    def test_unreachable_database(self):
+        checker = HealthChecker(create_async_engine(BROKEN_URL))
+
+        status = asyncio.run(checker.check())
+
+        assert not status.ok
+        assert checker.database()["status"] == "disconnected"
+        assert readiness_problems(checker, None) == ["base de datos no disponible"]
+
+    def test_slow_database_times_out(self):
+        checker = HangingChecker(create_async_engine("sqlite+aiosqlite://"), timeout=0.05)
+
+        status = asyncio.run(checker.check())
+
+        assert not status.ok
+        assert "sin respuesta" in status.error
+
+    def test_stale_result_is_not_ready(self):
+        clock = FakeClock()
+        checker = HealthChecker(create_async_engine("sqlite+aiosqlite://"), interval=5, clock=clock)
+        checker.status = DatabaseStatus(True, 0.0, 1.0)
+
+        clock.now = 15
+        assert readiness_problems(checker, None) == []
+        clock.now = 15.1
+        assert readiness_problems(checker, None) == ["chequeo de base de datos desactualizado"]
+
+    def test_saturated_pool_is_not_ready(self):
+        checker = HealthChecker(create_async_engine("sqlite+aiosqlite://"))
+        checker.status = DatabaseStatus(True, checker._clock(), 1.0)
+
+        assert readiness_problems(checker, 0.5, threshold=0.9) == []
+        assert len(readiness_problems(checker, 0.9, threshold=0.9)) == 1
+
+
+class TestHealthEndpoints:
+    """Tests de /health/live, /health/ready y /health"""
+
+    def test_liveness(self, client):
+        response = client.get("/health/live")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "alive"}
+
+    def test_ready_after_startup(self, client):
+        response = client.get("/health/ready")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert response.json()["database"]["status"] == "connected"
+
+    def test_not_ready_when_database_check_failed(self, client, monkeypatch):
+        monkeypatch.setattr(
+            main.health_checker, "status", DatabaseStatus(False, main.health_checker._clock(), 2000.0, "timeout")
+        )
+
+        response = client.get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["reasons"] == ["base de datos no disponible"]
+        assert client.get("/health/live").status_code == 200
+        assert client.get("/health").json()["status"] == "unhealthy"
+
+    def test_not_ready_when_pool_is_saturated(self, client, monkeypatch):
+        monkeypatch.setattr(main, "pool_saturation", lambda: 0.95)
+
+        response = client.get("/health/ready")
+
+        assert response.status_code == 503
+        assert response.json()["pool_saturation"] == 0.95
+
+    def test_health_reports_cached_status(self, client):
+        data = client.get("/health").json()
+
+        assert data["status"] == "healthy"
+        assert data["database"] == "connected"
+        assert "latency_ms" in data["database_check"]
+        assert "pool" in data
+
+    def test_health_reports_cache_counters(self, client):
+        product_id = client.post("/productos/", json={"nombre": "A", "precio": 1.0, "stock": 1}).json()["id"]
+        before = client.get("/health").json()["cache"]["products"]
+
+        client.get(f"/productos/{product_id}")
+
+        after = client.get("/health").json()["cache"]["products"]
+        assert after["hits"] + after["misses"] == before["hits"] + before["misses"] + 1
+        assert {"size", "evictions", "expirations", "hit_ratio"} <= set(after)
@@ -0,0 +1,109 @@
+"""
+Tests para la importación en streaming de productos.
+"""
+import json
+
+
+def _ndjson(rows):
+    return "".join(json.dumps(r) + "\n" for r in rows)
+
+
+class TestImport:
+    """Tests de POST /productos/import"""
+    
+    def test_ndjson_import_in_batches(self, client, monkeypatch):
+        monkeypatch.setattr("app.routes.products.IMPORT_BATCH_SIZE", 4)
+        rows = [{"nombre": f"P{i}", "precio": 1.0 + i, "stock": i} for i in range(10)]
+        
+        response = client.post("/productos/import", content=_ndjson(rows),
+                               headers={"content-type": "application/x-ndjson"})
+        
+        assert response.status_code == 200
+        report = response.json()
+        assert report["accepted"] == 10
+        assert report["rejected"] == 0
+        assert report["batches"] == 3
+        assert len(client.get("/productos/?all=true").json()) == 10
+    
+    def test_invalid_rows_are_reported_with_line_numbers(self, client):
+        body = "\n".join([
+            json.dumps({"nombre": "Bueno", "precio": 5, "stock": 1}),
+            "{no es json",
+            json.dumps({"nombre": "", "precio": 5, "stock": 1}),
+            "",
+            json.dumps([1, 2]),
+            json.dumps({"nombre": "Otro", "precio": 2.5, "stock": 0}),
+        ])
+        
+        report = client.post("/productos/import", content=body).json()
+        
+        assert report["accepted"] == 2
+        assert report["rejected"] == 3
+        assert [e["line"] for e in report["errors"]] == [2, 3, 5]
+        assert "nombre" in report["errors"][1]["error"]
+    
+    def test_csv_import_with_quoted_multiline_field(self, client):
+        body = (
+            "nombre,precio,descripcion,stock\n"
+            'Lámpara,19.90,"Luz cálida,\nbase de madera",3\n'
+            "Foco,2.5,,10\n"
+            "Roto,abc,,1\n"
+        )
+        
+        response = client.post("/productos/import", params={"format": "csv"},
+                               content=body.encode("utf-8"))
+        report = response.json()
+        
+        assert report["accepted"] == 2
+        assert report["errors"][0]["line"] == 5
+        products = client.get("/productos/?all=true").json()
+        assert products[0]["descripcion"] == "Luz cálida,\nbase de madera"
+        assert products[1]["descripcion"] is None
+    
+    def test_csv_stray_quote_is_a_literal_character(self, client):
+        """Una comilla en medio de un campo sin comillas no abre un campo"""
+        body = "nombre,precio,stock\n" + 'Monitor 27",199,2\n' + "".join(f"P{i},1,1\n" for i in range(50))
+        
+        report = client.post("/productos/import", params={"format": "csv"}, content=body).json()
+        
+        assert report["accepted"] == 51
+        assert report["rejected"] == 0
+        assert client.get("/productos/1").json()["nombre"] == 'Monitor 27"'
+    
+    def test_csv_unclosed_quote_rejects_only_its_line(self, client, monkeypatch):
+        """Un registro con comillas abiertas se acota y la lectura continúa"""
+        monkeypatch.setattr("app.routes.products.IMPORT_MAX_LINE_BYTES", 64)
+        rows = "".join(f"P{i},1,1\n" for i in range(20))
+        body = "nombre,precio,stock\n" + '"Roto,1,1\n' + rows + '"Final,1,1\n' + "Ultimo,1,1\n"
+        
+        report = client.post("/productos/import", params={"format": "csv"}, content=body).json()
+        
+        assert report["accepted"] == 21
+        assert [e["line"] for e in report["errors"]] == [2, 23]
+    
+    def test_format_is_inferred_from_content_type(self, client):
+        body = "nombre,precio,stock\nSilla,10,1\n"
+        
+        report = client.post("/productos/import", content=body,
+                             headers={"content-type": "text/csv"}).json()
+        
+        assert report["accepted"] == 1
+    
+    def test_line_too_long_returns_413(self, client, monkeypatch):
+        monkeypatch.setattr("app.routes.products.IMPORT_MAX_LINE_BYTES", 10)
+        
+        response = client.post("/productos/import", content='{"nombre": "demasiado largo"}\n')
+        
+        assert response.status_code == 413
+    
+    def test_line_limit_counts_bytes_not_characters(self, client, monkeypatch):
+        monkeypatch.setattr("app.routes.products.IMPORT_MAX_LINE_BYTES", 20)
+        
+        response = client.post("/productos/import", content="ñ" * 15 + "\n")
+        
+        assert response.status_code == 413
+    
+    def test_non_utf8_body_returns_400(self, client):
+        response = client.post("/productos/import", content=b"\xff\xfe\xfa\n")
+        
+        assert response.status_code == 400
@@ -0,0 +1,106 @@
+"""
+Tests para las métricas Prometheus.
+"""
+
+import asyncio
+
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.metrics import instrument_engine, metrics_payload, statement_operation
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestStatementOperation:
+    """Tests de la etiqueta de tipo de sentencia"""
+
+    def test_known_operations(self):
+        assert statement_operation("  select * from products") == "SELECT"
+        assert statement_operation("UPDATE products SET stock = 1") == "UPDATE"
+
+    def test_other_statements(self):
+        assert statement_operation("PRAGMA foreign_keys") == "OTHER"
+        assert statement_operation("") == "OTHER"
+
+
+class TestHTTPMetrics:
+    """Tests de las métricas por ruta"""
+
+    def test_requests_are_labelled_by_route_template(self, client):
+        product_id = client.post("/productos/", json={"nombre": "A", "precio": 1.0, "stock": 1}).json()["id"]
+        labels = {"method": "GET", "route": "/productos/{product_id}"}
+        before = _sample("http_requests_total", status="200", **labels)
+        before_count = _sample("http_request_duration_seconds_count", **labels)
+
+        client.get(f"/productos/{product_id}")
+
+        assert _sample("http_requests_total", status="200", **labels) == before + 1
+        assert _sample("http_request_duration_seconds_count", **labels) == before_count + 1
+
+    def test_unknown_paths_share_one_series(self, client):
+        before = _sample("http_requests_total", method="GET", route="unmatched", status="404")
+
+        client.get("/no-existe/1")
+        client.get("/no-existe/2")
+
+        assert _sample("http_requests_total", method="GET", route="unmatched", status="404") == before + 2
+
+    def test_metrics_endpoint_exposes_text_format(self, client):
+        client.get("/")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_requests_total{method="GET",route="/",status="200"}' in response.text
+        assert "http_requests_in_progress" in response.text
+
+
+class TestDatabaseMetrics:
+    """Tests de la instrumentación del engine"""
+
+    def test_statement_durations_are_recorded(self):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        instrument_engine(engine.sync_engine, "test-metrics")
+        before = _sample("db_query_duration_seconds_count", database="test-metrics", operation="SELECT")
+
+        async def run():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+            await engine.dispose()
+
+        asyncio.run(run())
+
+        assert _sample("db_query_duration_seconds_count", database="test-metrics", operation="SELECT") == before + 2
+
+    def test_pool_gauges_follow_checkouts(self):
+        engine = create_async_engine("sqlite+aiosqlite://", poolclass=AsyncAdaptedQueuePool)
+        instrument_engine(engine.sync_engine, "test-pool")
+        in_use = []
+
+        async def run():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                in_use.append(_sample("db_pool_checked_out", database="test-pool"))
+            await engine.dispose()
+
+        asyncio.run(run())
+
+        assert in_use == [1.0]
+        assert _sample("db_pool_checked_out", database="test-pool") == 0.0
+
+
+class TestMultiprocess:
+    """Tests de la agregación entre workers"""
+
+    def test_payload_reads_multiprocess_directory(self, tmp_path):
+        content, media_type = metrics_payload(str(tmp_path))
+
+        assert media_type.startswith("text/plain")
+        assert content == b""
@@ -0,0 +1,74 @@
+"""
+Tests para la invalidación de caché entre workers (LISTEN/NOTIFY).
+Usa el canal en memoria para no depender de PostgreSQL.
+"""
+import pytest
+from app.cache import product_cache
+from app.notifications import (
+    InMemoryNotificationChannel,
+    MAX_PAYLOAD_BYTES,
+    decode_payload,
+    encode_payloads,
+    handle_product_notification,
+    set_notification_channel,
+)
+
+
+class TestPayloads:
+    """Tests de codificación de payloads"""
+    
+    def test_round_trip(self):
+        payloads = encode_payloads([1, 2, 3], origin="host:1")
+        
+        assert payloads == ["host:1|1,2,3"]
+        assert decode_payload(payloads[0]) == ("host:1", [1, 2, 3])
+    
+    def test_large_id_sets_are_split(self):
+        ids = list(range(1, 5000))
+        payloads = encode_payloads(ids, origin="host:1")
+        
+        assert len(payloads) > 1
+        assert all(len(p) <= MAX_PAYLOAD_BYTES for p in payloads)
+        decoded = [i for p in payloads for i in decode_payload(p)[1]]
+        assert decoded == ids
+    
+    def test_malformed_payload_raises(self):
+        with pytest.raises(ValueError):
+            decode_payload("sin-separador")
+
+
+class TestCacheCoherence:
+    """Tests de invalidación por notificaciones de otros workers"""
+    
+    def test_notification_from_other_worker_evicts_entry(self):
+        product_cache.set(42, "cached")
+        
+        handle_product_notification("otro-host:999|42")
+        
+        assert product_cache.get(42) is None
+    
+    def test_own_notifications_are_ignored(self):
+        product_cache.set(43, "cached")
+        
+        for payload in encode_payloads([43]):
+            handle_product_notification(payload)
+        
+        assert product_cache.get(43) == "cached"
+        product_cache.invalidate(43)
+    
+    def test_writes_publish_changed_ids(self, client):
+        channel = InMemoryNotificationChannel()
+        set_notification_channel(channel)
+        try:
+            product_id = client.post("/productos/", json={
+                "nombre": "Silla", "precio": 80.0, "stock": 1
+            }).json()["id"]
+            client.put(f"/productos/{product_id}", json={
+                "nombre": "Silla", "precio": 70.0, "stock": 1
+            })
+            client.delete(f"/productos/{product_id}")
+        finally:
+            set_notification_channel(None)
+        
+        published_ids = [decode_payload(p)[1] for p in channel.published]
+        assert published_ids == [[product_id]] * 3
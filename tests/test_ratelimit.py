@@ -0,0 +1,184 @@
+"""
+Tests para el límite de peticiones por cliente.
+"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.main import app
+from app.ratelimit import (
+    MemoryRateLimitStore,
+    PostgresRateLimitStore,
+    RateLimiter,
+    RateLimitStore,
+    RateLimitMiddleware,
+    client_key,
+)
+from app.database import create_rate_limit_engine
+from tests.conftest import TestingAsyncSessionLocal
+
+# PostgreSQL real para probar el almacén compartido (se omite si no está definida)
+POSTGRES_TEST_URL = os.getenv("POSTGRES_TEST_URL")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scope(headers=None, client=("10.0.0.1", 1234)):
+    return {
+        "type": "http",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+        "client": client,
+    }
+
+
+class TestMemoryStore:
+    """Tests del token bucket en memoria"""
+
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        limiter = RateLimiter(MemoryRateLimitStore(clock=clock), rate=2, burst=3)
+
+        async def take(n):
+            return [(await limiter.check("c")).allowed for _ in range(n)]
+
+        assert asyncio.run(take(4)) == [True, True, True, False]
+        clock.now = 0.5
+        assert asyncio.run(take(2)) == [True, False]
+
+    def test_retry_after_reflects_refill_rate(self):
+        limiter = RateLimiter(MemoryRateLimitStore(clock=FakeClock()), rate=2, burst=1)
+
+        async def run():
+            await limiter.check("c")
+            return await limiter.check("c")
+
+        decision = asyncio.run(run())
+        assert not decision.allowed
+        assert decision.retry_after == 0.5
+        assert limiter.limited == 1
+
+    def test_clients_have_separate_buckets(self):
+        limiter = RateLimiter(MemoryRateLimitStore(clock=FakeClock()), rate=1, burst=1)
+
+        async def run():
+            return [(await limiter.check(key)).allowed for key in ("a", "b", "a")]
+
+        assert asyncio.run(run()) == [True, True, False]
+
+    def test_idle_buckets_expire(self):
+        clock = FakeClock()
+        store = MemoryRateLimitStore(clock=clock)
+        asyncio.run(store.take("a", 1, 5))
+        asyncio.run(store.take("b", 1, 5))
+
+        clock.now = 5
+        asyncio.run(store.take("c", 1, 5))
+
+        assert len(store) == 1
+
+    def test_store_is_bounded(self):
+        store = MemoryRateLimitStore(max_keys=2, clock=FakeClock())
+
+        for key in ("a", "b", "c"):
+            asyncio.run(store.take(key, 1, 5))
+
+        assert len(store) == 2
+
+
+class TestSharedStore:
+    """Varios workers con un mismo almacén comparten el balde de cada cliente"""
+
+    def test_workers_share_bucket(self):
+        store = MemoryRateLimitStore(clock=FakeClock())
+        workers = [RateLimiter(store, rate=1, burst=3) for _ in range(3)]
+
+        async def run():
+            return [(await worker.check("c")).allowed for worker in workers + workers]
+
+        assert asyncio.run(run()) == [True, True, True, False, False, False]
+
+
+class TestPostgresStore:
+    """Tests del almacén compartido"""
+
+    def test_fails_open_when_database_errors(self):
+        # SQLite no admite tablas UNLOGGED: la consulta falla
+        store = PostgresRateLimitStore(TestingAsyncSessionLocal)
+        errors = REGISTRY.get_sample_value("rate_limit_store_errors_total") or 0.0
+
+        assert asyncio.run(store.take("c", 1, 5)) == (True, 5)
+        assert store.errors == 1
+        assert REGISTRY.get_sample_value("rate_limit_store_errors_total") == errors + 1
+
+    @pytest.mark.skipif(not POSTGRES_TEST_URL, reason="POSTGRES_TEST_URL no definida")
+    def test_upsert_shares_fractional_bucket_across_workers(self):
+        key = f"test:{uuid.uuid4()}"
+
+        async def run():
+            engines = [create_rate_limit_engine(POSTGRES_TEST_URL) for _ in range(2)]
+            stores = [PostgresRateLimitStore(async_sessionmaker(bind=e, expire_on_commit=False)) for e in engines]
+            try:
+                return [await stores[i % 2].take(key, 0.001, 2.5) for i in range(3)], stores
+            finally:
+                for engine in engines:
+                    await engine.dispose()
+
+        results, stores = asyncio.run(run())
+
+        assert [allowed for allowed, _ in results] == [True, True, False]
+        assert results[0][1] == pytest.approx(1.5, abs=0.01)
+        assert results[1][1] == pytest.approx(0.5, abs=0.01)
+        assert all(store.errors == 0 for store in stores)
+
+    def test_store_interface_is_abstract(self):
+        with pytest.raises(TypeError):
+            RateLimitStore()
+
+
+class TestClientKey:
+    """Tests de la identificación del cliente"""
+
+    def test_uses_client_ip(self):
+        assert client_key(_scope()) == "ip:10.0.0.1"
+
+    def test_api_key_only_when_configured(self):
+        scope = _scope({"X-API-Key": "secreta"})
+
+        assert client_key(scope, key_header="") == "ip:10.0.0.1"
+        key = client_key(scope, key_header="X-API-Key")
+        assert key.startswith("key:")
+        assert "secreta" not in key
+
+    def test_trusted_proxy_uses_rightmost_forwarded_ip(self):
+        scope = _scope({"X-Forwarded-For": "1.1.1.1, 203.0.113.7"})
+
+        assert client_key(scope, trusted_proxies=1) == "ip:203.0.113.7"
+        assert client_key(scope, trusted_proxies=0) == "ip:10.0.0.1"
+
+
+class TestRateLimitMiddleware:
+    """Tests del 429 en la API"""
+
+    def test_exceeding_limit_returns_429(self, client):
+        limiter = RateLimiter(MemoryRateLimitStore(), rate=0.5, burst=2)
+        # Sin `with`: el lifespan ya lo ejecutó el cliente del fixture
+        limited_client = TestClient(RateLimitMiddleware(app, limiter))
+
+        statuses = [limited_client.get("/productos/").status_code for _ in range(3)]
+
+        assert statuses == [200, 200, 429]
+        response = limited_client.get("/productos/")
+        assert response.headers["retry-after"] == "2"
+        assert limited_client.get("/health/live").status_code == 200
@@ -0,0 +1,156 @@
+"""
+Tests para el enrutamiento de lecturas a réplicas.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.cache import product_cache
+from app.main import app
+from app.replicas import (
+    READ_PRIMARY_COOKIE,
+    ReadYourWritesMiddleware,
+    Replica,
+    ReplicaSet,
+    get_read_db,
+    replica_set,
+)
+from tests.conftest import async_engine
+
+BROKEN_URL = "sqlite+aiosqlite:////nonexistent/dir/replica.db"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _replica(name, clock=None, url="sqlite+aiosqlite://"):
+    engine = create_async_engine(url, poolclass=NullPool)
+    return Replica(name, engine, eject_seconds=10, clock=clock or FakeClock())
+
+
+class TestReplicaSet:
+    """Tests de la selección y expulsión de réplicas"""
+
+    def test_round_robin_cycles_replicas(self):
+        replicas = ReplicaSet([_replica("a"), _replica("b"), _replica("c")])
+
+        names = [replicas.choose().name for _ in range(6)]
+
+        assert names == ["a", "b", "c", "a", "b", "c"]
+
+    def test_least_connections_prefers_idle_replica(self):
+        a, b = _replica("a"), _replica("b")
+        a.in_use = 3
+        replicas = ReplicaSet([a, b], strategy="least_connections")
+
+        assert [replicas.choose().name for _ in range(3)] == ["b", "b", "b"]
+
+    def test_unknown_strategy_is_rejected(self):
+        with pytest.raises(ValueError):
+            ReplicaSet([], strategy="random")
+
+    def test_ejected_replica_is_skipped_until_cooldown_ends(self):
+        clock = FakeClock()
+        a, b = _replica("a", clock), _replica("b", clock)
+        replicas = ReplicaSet([a, b])
+
+        a.eject("caída")
+        assert {replicas.choose().name for _ in range(4)} == {"b"}
+
+        b.eject("caída")
+        assert replicas.choose() is None
+
+        clock.now = 10
+        assert replicas.choose() is not None
+        assert a.ejections == 1
+
+    def test_connection_error_ejects_replica(self):
+        replica = _replica("rota", url=BROKEN_URL)
+
+        async def run():
+            async with replica() as db:
+                await db.execute(text("SELECT 1"))
+
+        with pytest.raises(OperationalError):
+            asyncio.run(run())
+        assert not replica.healthy
+        assert replica.in_use == 0
+
+    def test_check_readmits_recovered_replica(self):
+        replica = _replica("a")
+        replica.eject("caída")
+
+        asyncio.run(replica.check())
+
+        assert replica.healthy
+        assert replica.lag_seconds == 0.0
+
+    def test_failed_check_ejects_replica(self):
+        replica = _replica("rota", url=BROKEN_URL)
+
+        asyncio.run(replica.check())
+
+        assert not replica.healthy
+
+
+class TestReadRouting:
+    """Las rutas de lectura usan la réplica; las escrituras, el primario"""
+
+    @pytest.fixture
+    def replica(self, client, monkeypatch):
+        replica = Replica("test", async_engine)
+        monkeypatch.setattr(replica_set, "replicas", [replica])
+        # get_read_db real, que elige la réplica
+        app.dependency_overrides.pop(get_read_db)
+        return replica
+
+    def _create(self, client, nombre="Teclado"):
+        return client.post("/productos/", json={"nombre": nombre, "precio": 10.0, "stock": 1}).json()["id"]
+
+    def test_reads_use_replica(self, client, replica):
+        product_id = self._create(client)
+
+        assert client.get("/productos/").json()["items"][0]["id"] == product_id
+        assert client.get(f"/productos/batch?ids={product_id}").status_code == 200
+        assert replica.sessions == 2
+
+    def test_recently_written_product_is_read_from_primary(self, client, replica, monkeypatch):
+        monkeypatch.setattr(product_cache, "write_window", 60)
+        product_id = self._create(client)
+        product_cache.invalidate(product_id)
+
+        assert client.get(f"/productos/{product_id}").status_code == 200
+        assert replica.sessions == 0
+
+        monkeypatch.setattr(product_cache, "write_window", 0)
+        product_cache.invalidate(product_id)
+        assert client.get(f"/productos/{product_id}").status_code == 200
+        assert replica.sessions == 1
+
+    def test_client_reads_its_writes_from_primary(self, client, replica):
+        # Sin `with`: el lifespan ya lo ejecutó el cliente del fixture
+        rw_client = TestClient(ReadYourWritesMiddleware(app, seconds=5))
+        rw_client.get("/productos/")
+        assert replica.sessions == 1
+
+        response = rw_client.post("/productos/", json={"nombre": "A", "precio": 1.0, "stock": 1})
+        assert READ_PRIMARY_COOKIE in response.cookies
+
+        rw_client.get("/productos/")
+        assert replica.sessions == 1
+
+    def test_failed_writes_and_batch_reads_do_not_set_cookie(self, client):
+        rw_client = TestClient(ReadYourWritesMiddleware(app, seconds=5))
+        assert READ_PRIMARY_COOKIE not in rw_client.post("/productos/", json={"nombre": "A"}).cookies
+        assert READ_PRIMARY_COOKIE not in rw_client.post("/productos/batch", json={"ids": [1]}).cookies
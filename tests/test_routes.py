@@ -148,7 +148,7 @@ class TestProductEndpointsProperties:
             created_products.append(created_product)
         
         # Listar todos los productos via GET
-        response = client.get("/productos/")
+        response = client.get("/productos/?all=true")
         
         # Verificar código de estado exitoso
         assert response.status_code == 200, \
@@ -339,7 +339,7 @@ class TestProductEndpointsProperties:
         
         # Verificar que el sistema sigue funcionando correctamente
         # Listar todos los productos debe retornar solo los válidos creados
-        response = client.get("/productos/")
+        response = client.get("/productos/?all=true")
         assert response.status_code == 200, \
             f"System unstable after errors. GET failed with status {response.status_code}"
         
@@ -355,3 +355,174 @@ class TestProductEndpointsProperties:
         response = client.post("/productos/", json=final_test_product)
         assert response.status_code == 201, \
             f"System unable to create valid product after error sequence. Status: {response.status_code}"
+
+
+class TestProductPagination:
+    """Tests para la paginación por cursor de GET /productos/"""
+    
+    def _create_products(self, client, count):
+        ids = []
+        for i in range(count):
+            response = client.post("/productos/", json={
+                "nombre": f"Producto_{i}",
+                "precio": 10.0 + i,
+                "stock": i
+            })
+            assert response.status_code == 201
+            ids.append(response.json()["id"])
+        return ids
+    
+    def test_pages_cover_all_products_in_order(self, client):
+        """Recorrer todas las páginas retorna cada producto una sola vez, ordenados por ID"""
+        created_ids = self._create_products(client, 7)
+        
+        seen_ids = []
+        cursor = None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/productos/", params=params)
+            assert response.status_code == 200
+            page = response.json()
+            assert page["limit"] == 3
+            assert len(page["items"]) <= 3
+            seen_ids.extend(p["id"] for p in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert seen_ids == sorted(created_ids)
+    
+    def test_last_page_has_no_next_cursor(self, client):
+        """Una página que contiene el final del catálogo no retorna cursor"""
+        self._create_products(client, 3)
+        
+        response = client.get("/productos/", params={"limit": 3})
+        page = response.json()
+        
+        assert len(page["items"]) == 3
+        assert page["next_cursor"] is None
+    
+    def test_invalid_cursor_returns_400(self, client):
+        """Un cursor mal formado retorna 400"""
+        response = client.get("/productos/", params={"cursor": "no-es-un-cursor"})
+        
+        assert response.status_code == 400
+    
+    def test_out_of_range_cursor_returns_400(self, client):
+        """Un ID fuera del rango de la columna retorna 400, no 500"""
+        from app.pagination import encode_cursor
+        
+        for last_id in (2**31, 2**70, -1):
+            response = client.get("/productos/", params={"cursor": encode_cursor(last_id)})
+            
+            assert response.status_code == 400
+            assert response.json()["detail"] == "Cursor inválido"
+    
+    def test_limit_above_maximum_returns_422(self, client):
+        """Un limit mayor al máximo configurado es rechazado"""
+        from app.config import PAGE_SIZE_MAX
+        
+        response = client.get("/productos/", params={"limit": PAGE_SIZE_MAX + 1})
+        
+        assert response.status_code == 422
+    
+    def test_all_returns_full_list(self, client):
+        """all=true mantiene el listado completo sin paginar"""
+        created_ids = self._create_products(client, 5)
+        
+        response = client.get("/productos/", params={"all": "true", "limit": 2})
+        
+        assert response.status_code == 200
+        assert [p["id"] for p in response.json()] == sorted(created_ids)
+
+
+class TestProductCrud:
+    """Tests del ciclo completo de CRUD sobre la sesión asíncrona"""
+    
+    def test_get_update_delete_round_trip(self, client):
+        """Un producto creado puede leerse, actualizarse y eliminarse"""
+        created = client.post("/productos/", json={
+            "nombre": "Teclado", "precio": 30.0, "stock": 4
+        }).json()
+        product_id = created["id"]
+        
+        response = client.get(f"/productos/{product_id}")
+        assert response.status_code == 200
+        assert response.json()["nombre"] == "Teclado"
+        
+        response = client.put(f"/productos/{product_id}", json={
+            "nombre": "Teclado mecánico", "precio": 45.0, "stock": 2
+        })
+        assert response.status_code == 200
+        assert response.json()["nombre"] == "Teclado mecánico"
+        assert response.json()["stock"] == 2
+        
+        response = client.delete(f"/productos/{product_id}")
+        assert response.status_code == 204
+        
+        assert client.get(f"/productos/{product_id}").status_code == 404
+    
+    def test_missing_product_returns_404(self, client):
+        """GET, PUT y DELETE sobre un ID inexistente retornan 404"""
+        body = {"nombre": "X", "precio": 1.0, "stock": 0}
+        
+        assert client.get("/productos/999").status_code == 404
+        assert client.put("/productos/999", json=body).status_code == 404
+        assert client.delete("/productos/999").status_code == 404
+    
+    def test_out_of_range_product_id_returns_422(self, client):
+        """IDs fuera del rango de la columna se rechazan antes de consultar"""
+        body = {"nombre": "X", "precio": 1.0, "stock": 0}
+        for product_id in (2**31, 2**70, 0):
+            assert client.get(f"/productos/{product_id}").status_code == 422
+            assert client.put(f"/productos/{product_id}", json=body).status_code == 422
+            assert client.patch(f"/productos/{product_id}", json={"stock": 1}).status_code == 422
+            assert client.delete(f"/productos/{product_id}").status_code == 422
+            assert client.post(f"/productos/{product_id}/stock/adjust", json={"delta": 1}).status_code == 422
+
+
+class TestProductPatch:
+    """Tests de actualización parcial con PATCH"""
+    
+    def _create(self, client):
+        return client.post("/productos/", json={
+            "nombre": "Lámpara", "precio": 20.0, "descripcion": "LED", "stock": 3
+        }).json()["id"]
+    
+    def test_patch_changes_only_sent_fields(self, client):
+        product_id = self._create(client)
+        
+        response = client.patch(f"/productos/{product_id}", json={"precio": 15.0})
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "id": product_id, "nombre": "Lámpara", "precio": 15.0, "descripcion": "LED", "stock": 3
+        }
+        assert client.get(f"/productos/{product_id}").json()["precio"] == 15.0
+    
+    def test_patch_can_clear_descripcion(self, client):
+        product_id = self._create(client)
+        
+        response = client.patch(f"/productos/{product_id}", json={"descripcion": None})
+        
+        assert response.json()["descripcion"] is None
+    
+    def test_patch_rejects_null_required_fields_and_unknown_fields(self, client):
+        product_id = self._create(client)
+        
+        assert client.patch(f"/productos/{product_id}", json={"nombre": None}).status_code == 422
+        assert client.patch(f"/productos/{product_id}", json={"precio": -1}).status_code == 422
+        assert client.patch(f"/productos/{product_id}", json={"id": 5}).status_code == 422
+    
+    def test_empty_patch_returns_current_product(self, client):
+        product_id = self._create(client)
+        
+        response = client.patch(f"/productos/{product_id}", json={})
+        
+        assert response.status_code == 200
+        assert response.json()["nombre"] == "Lámpara"
+    
+    def test_patch_missing_product_returns_404(self, client):
+        assert client.patch("/productos/999", json={"stock": 1}).status_code == 404
@@ -0,0 +1,77 @@
+"""
+Tests para la búsqueda de texto completo (índice invertido de respaldo en SQLite).
+"""
+
+from app.models.product import SEARCH_VECTOR_SQL
+from app.search import InvertedIndex, tokenize
+
+
+class TestInvertedIndex:
+    """Tests unitarios del índice invertido"""
+    
+    def test_tokenize_normalizes_case_and_accents(self):
+        assert tokenize("Cámara FOTOGRÁFICA, 4K") == ["camara", "fotografica", "4k"]
+    
+    def test_all_terms_must_match(self):
+        index = InvertedIndex()
+        index.add(1, "Laptop HP", "15 pulgadas")
+        index.add(2, "Laptop Dell", "14 pulgadas")
+        
+        assert [i for i, _ in index.search("laptop dell")] == [2]
+        assert index.search("laptop lenovo") == []
+    
+    def test_name_matches_rank_above_description_matches(self):
+        index = InvertedIndex()
+        index.add(1, "Funda", "Para laptop")
+        index.add(2, "Laptop", "Con funda")
+        
+        assert [i for i, _ in index.search("laptop")] == [2, 1]
+    
+    def test_search_vector_weights_nombre_over_descripcion(self):
+        assert "coalesce(nombre, '')), 'A'" in SEARCH_VECTOR_SQL
+        assert "coalesce(descripcion, '')), 'B'" in SEARCH_VECTOR_SQL
+
+
+class TestSearchEndpoint:
+    """Tests de GET /productos/search"""
+    
+    def _seed(self, client):
+        client.post("/productos/bulk", json=[
+            {"nombre": "Cámara réflex", "precio": 500, "stock": 1, "descripcion": "Lente 18-55"},
+            {"nombre": "Trípode", "precio": 40, "stock": 5, "descripcion": "Para cámara"},
+            {"nombre": "Mochila", "precio": 30, "stock": 2, "descripcion": "Porta laptop"},
+        ])
+    
+    def test_results_are_ranked(self, client):
+        self._seed(client)
+        
+        response = client.get("/productos/search", params={"q": "camara"})
+        
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [p["nombre"] for p in items] == ["Cámara réflex", "Trípode"]
+        assert items[0]["rank"] > items[1]["rank"]
+    
+    def test_pagination_by_offset(self, client):
+        self._seed(client)
+        
+        first = client.get("/productos/search", params={"q": "camara", "limit": 1}).json()
+        second = client.get("/productos/search", params={
+            "q": "camara", "limit": 1, "offset": first["next_offset"]
+        }).json()
+        
+        assert first["next_offset"] == 1
+        assert [p["nombre"] for p in second["items"]] == ["Trípode"]
+        assert second["next_offset"] is None
+    
+    def test_index_reflects_writes(self, client):
+        self._seed(client)
+        assert client.get("/productos/search", params={"q": "tablet"}).json()["items"] == []
+        
+        client.post("/productos/", json={"nombre": "Tablet", "precio": 300, "stock": 1})
+        
+        items = client.get("/productos/search", params={"q": "tablet"}).json()["items"]
+        assert [p["nombre"] for p in items] == ["Tablet"]
+    
+    def test_missing_query_returns_422(self, client):
+        assert client.get("/productos/search").status_code == 422
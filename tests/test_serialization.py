@@ -0,0 +1,62 @@
+"""
+Tests para la serialización rápida de productos.
+"""
+
+import json
+
+from app.models.product import Product
+from app.serialization import FastJSONResponse, dumps, product_dicts
+
+
+ROWS = [
+    (1, "Café", 10.5, "Descripción con acentos", 3),
+    (2, "Mesa", 100.0, None, 0),
+]
+
+
+class TestProductDicts:
+    """Tests de product_dicts / dumps"""
+
+    def test_matches_pydantic_model_dump(self):
+        expected = [
+            Product(id=i, nombre=n, precio=p, descripcion=d, stock=s).model_dump()
+            for i, n, p, d, s in ROWS
+        ]
+
+        assert product_dicts(ROWS) == expected
+
+    def test_extra_trailing_columns_are_ignored(self):
+        assert product_dicts([ROWS[0] + (7, "extra")]) == product_dicts([ROWS[0]])
+
+    def test_dumps_matches_pydantic_json(self):
+        product = Product(id=1, nombre="Café", precio=10.5, descripcion=None, stock=3)
+
+        assert dumps(product_dicts([(1, "Café", 10.5, None, 3)])[0]) == product.model_dump_json().encode()
+
+    def test_response_renders_utf8_json(self):
+        response = FastJSONResponse(product_dicts(ROWS))
+
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == product_dicts(ROWS)
+
+
+class TestListUsesFastPath:
+    """El listado mantiene la forma de ProductPage / List[Product]"""
+
+    def test_page_shape(self, client):
+        client.post("/productos/", json={"nombre": "Café", "precio": 10.5, "stock": 3})
+
+        data = client.get("/productos/").json()
+
+        assert data == {
+            "items": [{"id": 1, "nombre": "Café", "precio": 10.5, "descripcion": None, "stock": 3}],
+            "next_cursor": None,
+            "limit": 100,
+        }
+
+    def test_full_catalog_shape(self, client):
+        client.post("/productos/", json={"nombre": "Café", "precio": 10.5, "stock": 3})
+
+        assert client.get("/productos/?all=true").json() == [
+            {"id": 1, "nombre": "Café", "precio": 10.5, "descripcion": None, "stock": 3}
+        ]
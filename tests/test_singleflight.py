@@ -0,0 +1,166 @@
+"""
+Tests para la coalescencia de peticiones (single-flight).
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.cache import product_cache
+from app.database import get_sessionmaker
+from app.main import app
+from app.routes.products import catalog_loads, product_loads
+from app.singleflight import SingleFlight
+from tests.conftest import TestingAsyncSessionLocal
+
+
+class _SlowSession:
+    def __init__(self, session):
+        self.session = session
+
+    async def __aenter__(self):
+        await asyncio.sleep(0.05)
+        return await self.session.__aenter__()
+
+    async def __aexit__(self, *exc):
+        return await self.session.__aexit__(*exc)
+
+
+class CountingSessionmaker:
+    """Fábrica de sesiones lenta que cuenta cuántas sesiones se abren"""
+
+    def __init__(self):
+        self.opened = 0
+
+    def __call__(self):
+        self.opened += 1
+        return _SlowSession(TestingAsyncSessionLocal())
+
+
+async def _concurrent_get(url, count, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        return await asyncio.gather(*[client.get(url, headers=headers) for _ in range(count)])
+
+
+class TestSingleFlight:
+    """Tests de SingleFlight"""
+
+    def test_concurrent_calls_share_one_load(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "valor"
+
+        async def run():
+            return await asyncio.gather(*[flight.do("k", load) for _ in range(10)])
+
+        assert asyncio.run(run()) == ["valor"] * 10
+        assert len(calls) == 1
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 9}
+
+    def test_different_keys_load_separately(self):
+        flight = SingleFlight()
+
+        async def run():
+            return await asyncio.gather(
+                flight.do(1, lambda: asyncio.sleep(0, "a")),
+                flight.do(2, lambda: asyncio.sleep(0, "b")),
+            )
+
+        assert asyncio.run(run()) == ["a", "b"]
+        assert flight.leaders == 2
+
+    def test_exception_reaches_all_waiters_and_is_not_cached(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("falla")
+
+        async def run():
+            results = await asyncio.gather(*[flight.do("k", failing) for _ in range(3)], return_exceptions=True)
+            await flight.do("k", lambda: asyncio.sleep(0, "ok"))
+            return results
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert len(calls) == 1
+        assert len(flight) == 0
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        flight = SingleFlight()
+
+        async def load():
+            await asyncio.sleep(0.05)
+            return 42
+
+        async def run():
+            leader = asyncio.ensure_future(flight.do("k", load))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("k", load))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert asyncio.run(run()) == 42
+
+
+class TestRouteCoalescing:
+    """Las rutas de lectura comparten una consulta entre peticiones simultáneas"""
+
+    @pytest.fixture
+    def sessionmaker(self, client):
+        counting = CountingSessionmaker()
+        app.dependency_overrides[get_sessionmaker] = lambda: counting
+        return counting
+
+    def test_concurrent_get_product_issues_one_query(self, client, sessionmaker):
+        product_id = client.post("/productos/", json={"nombre": "Popular", "precio": 1.0, "stock": 1}).json()["id"]
+        product_cache.clear()
+        leaders = product_loads.leaders
+
+        responses = asyncio.run(_concurrent_get(f"/productos/{product_id}", 20))
+
+        assert all(r.status_code == 200 and r.json()["nombre"] == "Popular" for r in responses)
+        assert sessionmaker.opened == 1
+        assert product_loads.leaders == leaders + 1
+
+    def test_write_to_other_product_keeps_shared_load(self, client, sessionmaker):
+        product_id = client.post("/productos/", json={"nombre": "Popular", "precio": 1.0, "stock": 1}).json()["id"]
+        product_cache.clear()
+
+        async def run():
+            first = asyncio.ensure_future(_concurrent_get(f"/productos/{product_id}", 5))
+            await asyncio.sleep(0.01)
+            product_cache.invalidate(product_id + 1)
+            second = await _concurrent_get(f"/productos/{product_id}", 5)
+            return await first + second
+
+        responses = asyncio.run(run())
+
+        assert all(r.status_code == 200 for r in responses)
+        assert sessionmaker.opened == 1
+        assert product_cache.get(product_id) is not None
+
+    def test_concurrent_missing_product_all_404(self, client, sessionmaker):
+        responses = asyncio.run(_concurrent_get("/productos/999", 5))
+
+        assert all(r.status_code == 404 for r in responses)
+        assert sessionmaker.opened == 1
+
+    def test_concurrent_full_catalog_builds_once(self, client, sessionmaker):
+        client.post("/productos/", json={"nombre": "A", "precio": 1.0, "stock": 1})
+        leaders = catalog_loads.leaders
+
+        responses = asyncio.run(_concurrent_get("/productos/?all=true", 10, {"Accept-Encoding": "gzip"}))
+
+        assert all(len(r.json()) == 1 for r in responses)
+        assert sessionmaker.opened == 1
+        assert catalog_loads.leaders == leaders + 1
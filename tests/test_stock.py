@@ -0,0 +1,89 @@
+"""
+Tests para los ajustes atómicos de stock.
+"""
+
+
+def _create(client, stock, nombre="Producto"):
+    return client.post("/productos/", json={"nombre": nombre, "precio": 10.0, "stock": stock}).json()["id"]
+
+
+class TestStockAdjust:
+    """Tests de POST /productos/{id}/stock/adjust"""
+    
+    def test_reserve_decrements_stock(self, client):
+        product_id = _create(client, 5)
+        
+        response = client.post(f"/productos/{product_id}/stock/adjust", json={"delta": -3})
+        
+        assert response.status_code == 200
+        assert response.json()["stock"] == 2
+        assert client.get(f"/productos/{product_id}").json()["stock"] == 2
+    
+    def test_restock_increments_stock(self, client):
+        product_id = _create(client, 0)
+        
+        response = client.post(f"/productos/{product_id}/stock/adjust", json={"delta": 4})
+        
+        assert response.json()["stock"] == 4
+    
+    def test_insufficient_stock_returns_409_and_keeps_stock(self, client):
+        product_id = _create(client, 2)
+        
+        response = client.post(f"/productos/{product_id}/stock/adjust", json={"delta": -3})
+        
+        assert response.status_code == 409
+        assert client.get(f"/productos/{product_id}").json()["stock"] == 2
+    
+    def test_reserving_exact_stock_reaches_zero(self, client):
+        product_id = _create(client, 2)
+        
+        assert client.post(f"/productos/{product_id}/stock/adjust", json={"delta": -2}).json()["stock"] == 0
+        assert client.post(f"/productos/{product_id}/stock/adjust", json={"delta": -1}).status_code == 409
+    
+    def test_missing_product_returns_404(self, client):
+        assert client.post("/productos/999/stock/adjust", json={"delta": -1}).status_code == 404
+
+
+class TestStockAdjustBatch:
+    """Tests de POST /productos/stock/adjust"""
+    
+    def test_batch_applies_all_adjustments(self, client):
+        a = _create(client, 5, "A")
+        b = _create(client, 1, "B")
+        
+        response = client.post("/productos/stock/adjust", json={"items": [
+            {"id": b, "delta": -1},
+            {"id": a, "delta": -2},
+            {"id": a, "delta": -1},
+        ]})
+        
+        assert response.status_code == 200
+        assert [(p["id"], p["stock"]) for p in response.json()] == [(b, 0), (a, 2)]
+    
+    def test_batch_is_all_or_nothing(self, client):
+        a = _create(client, 5, "A")
+        b = _create(client, 1, "B")
+        
+        response = client.post("/productos/stock/adjust", json={"items": [
+            {"id": a, "delta": -2},
+            {"id": b, "delta": -2},
+            {"id": 999, "delta": -1},
+        ]})
+        
+        assert response.status_code == 409
+        assert response.json()["detail"] == [
+            {"id": b, "error": "stock_insuficiente"},
+            {"id": 999, "error": "no_encontrado"},
+        ]
+        assert client.get(f"/productos/{a}").json()["stock"] == 5
+    
+    def test_out_of_range_id_returns_422(self, client):
+        a = _create(client, 5, "A")
+        
+        response = client.post("/productos/stock/adjust", json={"items": [
+            {"id": a, "delta": -1},
+            {"id": 2**31, "delta": -1},
+        ]})
+        
+        assert response.status_code == 422
+        assert client.get(f"/productos/{a}").json()["stock"] == 5